@@ -0,0 +1,150 @@
+import time
+import random
+import asyncio
+import metrics
+from http_cache import get_http_cache
+from http_client import HEADERS, TIMEOUT, RETRIES, BACKOFF
+
+# 上流（hero_list.js / hero_rank_list_v2 / ddragon）へのリクエストを asyncio でまとめて同時に出す
+#   - 全体の同時リクエスト数の上限、1リクエストのタイムアウト、5xx / 429 / 接続エラー時の再試行
+#   - httpx があれば httpx.AsyncClient、なければ requests をスレッドで動かす（同じように同時に出る）
+#   - 条件付きGET・ディスクキャッシュは http_cache と共通。取得したレスポンスは http_cache に先読みとして渡し、
+#     各スクリプトの cached_get はネットワークに出ずにそれを使う
+# 使い方:
+#   async def ddragon(fetcher):
+#       version = (await fetcher.get(VERSIONS_URL)).json()[0]
+#       return await fetcher.get(CHAMPION_URL.format(version=version), ttl=...)
+#   results = run_jobs({"hero_list": lambda f: f.get(URL_HERO_LIST), "ddragon": ddragon})
+
+MAX_CONCURRENCY = 8                          # 同時に出すリクエスト数の上限
+RETRY_STATUS = (429, 500, 502, 503, 504)     # 再試行するステータス
+
+
+class FetchError(Exception):
+    pass
+
+
+def _status_of(exc):
+    response = getattr(exc, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def _retryable(exc):
+    # タイムアウト・接続エラー・RETRY_STATUS の応答なら再試行する
+    if isinstance(exc, (asyncio.TimeoutError, ConnectionError, TimeoutError)):
+        return True
+    status = _status_of(exc)
+    if status is not None:
+        return status in RETRY_STATUS
+    try:
+        import httpx
+        if isinstance(exc, httpx.TransportError):
+            return True
+    except ImportError:
+        pass
+    try:
+        import requests
+        if isinstance(exc, (requests.ConnectionError, requests.Timeout)):
+            return True
+    except ImportError:
+        pass
+    return False
+
+
+class AsyncFetcher:
+    # 同時数の上限・タイムアウト・再試行付きで GET する（結果は http_cache の CachedResponse）
+
+    def __init__(self, concurrency=MAX_CONCURRENCY, timeout=TIMEOUT, retries=RETRIES, backoff=BACKOFF,
+                 cache=None, use_httpx=None):
+        self.concurrency = concurrency
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.cache = cache or get_http_cache()
+        self.client = None
+        self.session = None
+        self.use_httpx = use_httpx
+
+    async def __aenter__(self):
+        if self.use_httpx is None:
+            try:
+                import httpx  # noqa: F401
+                self.use_httpx = True
+            except ImportError:
+                self.use_httpx = False
+
+        if self.use_httpx:
+            import httpx
+            self.client = httpx.AsyncClient(headers=HEADERS, timeout=self.timeout, follow_redirects=True)
+        else:
+            from http_client import create_session
+            # 再試行はこちらで行うので、セッション側では再試行しない
+            self.session = create_session(pool_size=self.concurrency, retries=0)
+        return self
+
+    async def __aexit__(self, *exc):
+        if self.client is not None:
+            await self.client.aclose()
+        if self.session is not None:
+            self.session.close()
+
+    async def _fetch_once(self, url, ttl):
+        cached, meta, body, headers = self.cache.lookup(url, ttl)
+        if cached is not None:
+            return cached
+
+        start = time.perf_counter()
+        try:
+            if self.use_httpx:
+                response = await self.client.get(url, headers=headers)
+            else:
+                # タイムアウトは requests 側で切る（外側で打ち切るとスレッドが動いたまま枠だけ空いてしまう）
+                response = await asyncio.to_thread(self.session.get, url, headers=headers, timeout=self.timeout)
+        except Exception:
+            metrics.record_http(url, time.perf_counter() - start, 0)
+            raise
+        return self.cache.receive(url, meta, body, response, time.perf_counter() - start)
+
+    async def get(self, url, ttl=0):
+        for attempt in range(self.retries + 1):
+            try:
+                async with self.semaphore:
+                    return await self._fetch_once(url, ttl)
+            except Exception as e:
+                if attempt >= self.retries or not _retryable(e):
+                    raise FetchError(f"{url}: {e}") from e
+                metrics.count("http_retries")
+            # 待っている間は枠を空ける。0.5, 1, 2 ... 秒（同時に再試行しないよう少しずらす）
+            await asyncio.sleep(self.backoff * (2 ** attempt) * (0.5 + random.random() / 2))
+
+
+async def gather_jobs(jobs, **options):
+    # jobs: {名前: async def job(fetcher)}。すべて同時に始め、{名前: 結果 または 例外} を返す
+    async with AsyncFetcher(**options) as fetcher:
+        names = list(jobs)
+        results = await asyncio.gather(*(jobs[name](fetcher) for name in names), return_exceptions=True)
+    return dict(zip(names, results))
+
+
+def run_jobs(jobs, **options):
+    # 同期のコードから呼ぶ入口
+    return asyncio.run(gather_jobs(jobs, **options))
+
+
+def prefetch(jobs, **options):
+    # jobs を同時に実行し、取得したレスポンスを http_cache に先読みとして登録する
+    # 失敗したものは表示だけして続ける（各スクリプトが通常どおり取り直してエラーを出す）
+    cache = options.setdefault("cache", get_http_cache())
+    start = time.perf_counter()
+    with metrics.stage("prefetch"):
+        results = run_jobs(jobs, **options)
+
+    for name, result in results.items():
+        if isinstance(result, BaseException):
+            print(f"先読みに失敗しました ({name}): {result}")
+            continue
+        for response in result if isinstance(result, (list, tuple)) else [result]:
+            cache.prefetch(response.url, response)
+    print(f"{len(jobs)} 件の上流データを同時に取得しました ({time.perf_counter() - start:.2f} s)")
+    return results
@@ -0,0 +1,109 @@
+import sys
+import time
+import random
+import argparse
+
+import make_ai_input
+from modeule import load_json
+
+# make_ai_input.TopRanking（(lane, rank) ごとの heap）が、全件を並べて選んだ結果と同じかを確かめる
+#   - 実際の diff_input.json と、それを --scale 倍に増やした合成データ
+#   - top_n / min_score / max_per_champion / レーン・ランクの上限をランダムに変えて --trials 回
+# 使い方: python scraper/bench_ai_ranking.py [--trials 200] [--scale 50]
+
+LANES = ["TOP", "JG", "MID", "ADC", "SUP"]
+RANKS = list(make_ai_input.rank_weight)
+
+
+def full_sort(diff_input, options):
+    # 比較用：全行を score の高い順に並べて上限を守って選ぶ（ファイル名順 = diff_input の順）
+    config = dict(make_ai_input.ranking_config, **options)
+    rows = []
+    for champ_id, diff in diff_input.items():
+        champ_rows = [row for row in diff["diff_data"] if row["score"] >= config["min_score"]]
+        champ_rows = sorted(champ_rows, key=lambda row: -row["score"])[:config["max_per_champion"]]
+        rows.extend((row["score"], len(rows), champ_id, row) for row in champ_rows)
+    rows.sort(key=lambda x: (-x[0], x[1]))
+
+    lane_count, rank_count, selected = {}, {}, []
+    for _, _, champ_id, row in rows:
+        if len(selected) >= config["top_n"]:
+            break
+        if lane_count.get(row["lane"], 0) >= config["lane_quota"].get(row["lane"], config["top_n"]):
+            continue
+        if rank_count.get(row["rank"], 0) >= config["rank_quota"].get(row["rank"], config["top_n"]):
+            continue
+        lane_count[row["lane"]] = lane_count.get(row["lane"], 0) + 1
+        rank_count[row["rank"]] = rank_count.get(row["rank"], 0) + 1
+        selected.append((champ_id, row["lane"], row["rank"]))
+    return selected
+
+
+def synthetic(diff_input, scale, rng):
+    # 実データのチャンピオンを scale 倍に複製し、score を少し揺らす（同じ score も残す）
+    result = {}
+    for n in range(scale):
+        for champ_id, diff in diff_input.items():
+            rows = [dict(row, score=round(row["score"] * rng.choice([1, 1, 0.5, 1.5]), 2)) for row in diff["diff_data"]]
+            result[f"{champ_id}{n:04d}"] = dict(diff, diff_data=rows)
+    return result
+
+
+def random_options(rng):
+    return {
+        "top_n": rng.choice([1, 5, 15, 30]),
+        "min_score": rng.choice([0.0, 0.0, 10.0, 30.0]),
+        "max_per_champion": rng.choice([1, 1, 2, 5]),
+        "lane_quota": {lane: rng.randint(0, 5) for lane in rng.sample(LANES, rng.randint(0, 5))},
+        "rank_quota": {rank: rng.randint(0, 5) for rank in rng.sample(RANKS, rng.randint(0, 3))},
+    }
+
+
+def run_heap(diff_input, options):
+    ranking = make_ai_input.TopRanking(**options)
+    for champ_id, diff in diff_input.items():
+        ranking.push(champ_id, diff)
+    return [(c["champ_id"], c["row"]["lane"], c["row"]["rank"]) for c in ranking.ranked()]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trials", type=int, default=200)
+    parser.add_argument("--scale", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    diff_input = load_json(make_ai_input.OUTPUT_JSON) or {}
+    if not diff_input:
+        print("diff_input.json がありません")
+        sys.exit(1)
+    datasets = [("実データ", diff_input), (f"{args.scale} 倍", synthetic(diff_input, args.scale, rng))]
+
+    failed = False
+    for name, data in datasets:
+        mismatches = 0
+        heap_time = sort_time = 0.0
+        for _ in range(args.trials):
+            options = random_options(rng)
+            start = time.perf_counter()
+            actual = run_heap(data, options)
+            heap_time += time.perf_counter() - start
+            start = time.perf_counter()
+            expected = full_sort(data, options)
+            sort_time += time.perf_counter() - start
+            if actual != expected:
+                mismatches += 1
+                if mismatches == 1:
+                    print("不一致:", options)
+        rows = sum(len(diff["diff_data"]) for diff in data.values())
+        print(f"{'○' if not mismatches else '×'} {name}（{rows} 行）: 不一致 {mismatches}/{args.trials}、"
+              f"heap {heap_time / args.trials * 1000:.2f} ms / 全件ソート {sort_time / args.trials * 1000:.2f} ms")
+        failed = failed or mismatches > 0
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
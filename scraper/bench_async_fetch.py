@@ -0,0 +1,179 @@
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import metrics
+from http_cache import HttpCache
+from async_fetch import FetchError, gather_jobs, prefetch
+
+# async_fetch をローカルのモックサーバーで確かめる（ネットワークには出ない）
+#   - 同時に出したリクエストの合計時間が、一番遅いリクエストの時間に近いか
+#   - 5xx の再試行、タイムアウト、同時数の上限、先読みしたレスポンスを cached_get が使うか
+# 使い方: python scraper/bench_async_fetch.py [--delay 0.3] [--backend auto|httpx|threads]
+
+
+class MockServer:
+    # /delay/<秒>/<名前>   指定秒待ってから JSON を返す
+    # /flaky/<名前>/<回数> 最初の <回数> 回は 503、その後は 200
+    # /versions           ddragon の versions.json の形
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.hits = {}
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with server.lock:
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                    server.hits[self.path] = server.hits.get(self.path, 0) + 1
+                    count = server.hits[self.path]
+                try:
+                    parts = self.path.strip("/").split("/")
+                    status, body = 200, {"path": self.path}
+                    if parts[0] == "delay":
+                        time.sleep(float(parts[1]))
+                    elif parts[0] == "flaky" and count <= int(parts[2]):
+                        status = 503
+                    elif parts[0] == "versions":
+                        body = ["9.9.1", "9.9.0"]
+                    payload = json.dumps(body).encode("utf-8")
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json; charset=utf-8")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    with server.lock:
+                        server.in_flight -= 1
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def reset(self, wait=5):
+        # 前の確認で打ち切ったリクエストがサーバー側で終わるのを待ってから数え直す
+        deadline = time.perf_counter() + wait
+        while self.in_flight and time.perf_counter() < deadline:
+            time.sleep(0.05)
+        with self.lock:
+            self.max_in_flight = 0
+
+    def close(self):
+        self.httpd.shutdown()
+
+
+def fetch(url):
+    return lambda fetcher: fetcher.get(url)
+
+
+def check_latency(server, options, delay):
+    # 独立した3件 + 依存する2件（versions → champion）を同時に始める
+    async def ddragon(fetcher):
+        versions = await fetcher.get(f"{server.url}/versions")
+        return [versions, await fetcher.get(f"{server.url}/delay/{delay}/champion-{versions.json()[0]}")]
+
+    jobs = {
+        "hero_list": fetch(f"{server.url}/delay/{delay}/hero_list"),
+        "hero_rank_list": fetch(f"{server.url}/delay/{delay * 1.5}/hero_rank_list"),
+        "ddragon": ddragon,
+    }
+    start = time.perf_counter()
+    results = asyncio.run(gather_jobs(jobs, **options))
+    elapsed = time.perf_counter() - start
+    slowest = delay * 1.5
+    ok = all(not isinstance(r, BaseException) for r in results.values()) and elapsed < slowest + delay * 0.8
+    return ok, f"{elapsed:.2f} s（一番遅いリクエスト {slowest:.2f} s、順番に取ると {delay * 3.5:.2f} s）"
+
+
+def check_retry(server, options):
+    metrics.reset()
+    results = asyncio.run(gather_jobs({"flaky": fetch(f"{server.url}/flaky/a/2")}, **dict(options, backoff=0.05)))
+    retries = metrics.snapshot()["counters"].get("http_retries", 0)
+    ok = not isinstance(results["flaky"], BaseException) and retries == 2
+    return ok, f"503 を2回返した後に成功（再試行 {retries} 回）"
+
+
+def check_give_up(server, options):
+    results = asyncio.run(gather_jobs({"flaky": fetch(f"{server.url}/flaky/b/10")}, **dict(options, retries=2, backoff=0.05)))
+    ok = isinstance(results["flaky"], FetchError)
+    return ok, f"再試行の上限で失敗: {type(results['flaky']).__name__}"
+
+
+def check_timeout(server, options):
+    start = time.perf_counter()
+    results = asyncio.run(gather_jobs({"slow": fetch(f"{server.url}/delay/2/slow")},
+                                      **dict(options, timeout=0.3, retries=1, backoff=0.05)))
+    elapsed = time.perf_counter() - start
+    ok = isinstance(results["slow"], FetchError) and elapsed < 1.5
+    return ok, f"0.3 s のタイムアウト x 2回で {elapsed:.2f} s で失敗"
+
+
+def check_concurrency(server, options, delay):
+    server.reset()
+    jobs = {f"r{i}": fetch(f"{server.url}/delay/{delay / 3:.3f}/cap{i}") for i in range(12)}
+    start = time.perf_counter()
+    asyncio.run(gather_jobs(jobs, **dict(options, concurrency=4)))
+    elapsed = time.perf_counter() - start
+    ok = server.max_in_flight <= 4
+    return ok, f"上限 4 で同時 {server.max_in_flight} 件、12 件で {elapsed:.2f} s"
+
+
+def check_prefetch(server, options):
+    url = f"{server.url}/delay/0.05/prefetched"
+    prefetch({"prefetched": fetch(url)}, **options)
+    before = server.hits.get("/delay/0.05/prefetched", 0)
+    response = options["cache"].get(url)
+    ok = server.hits.get("/delay/0.05/prefetched", 0) == before and response.json()["path"] == "/delay/0.05/prefetched"
+    return ok, "先読み後の cached_get はサーバーに出ない"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--delay", type=float, default=0.3, help="模擬する上流の応答時間（秒）")
+    parser.add_argument("--backend", choices=["auto", "httpx", "threads"], default="auto")
+    args = parser.parse_args()
+
+    use_httpx = {"auto": None, "httpx": True, "threads": False}[args.backend]
+    server = MockServer()
+    failures = []
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            options = {"cache": HttpCache(cache_dir), "use_httpx": use_httpx}
+            # httpx の読み込み・SSL の準備は最初の1回だけかかるので、測る前に済ませておく
+            asyncio.run(gather_jobs({}, **options))
+            checks = [
+                ("同時取得", lambda: check_latency(server, options, args.delay)),
+                ("再試行", lambda: check_retry(server, options)),
+                ("再試行の上限", lambda: check_give_up(server, options)),
+                ("タイムアウト", lambda: check_timeout(server, options)),
+                ("同時数の上限", lambda: check_concurrency(server, options, args.delay)),
+                ("先読み", lambda: check_prefetch(server, options)),
+            ]
+            for name, check in checks:
+                ok, detail = check()
+                print(f"{'○' if ok else '×'} {name:<10} {detail}")
+                if not ok:
+                    failures.append(name)
+    finally:
+        server.close()
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
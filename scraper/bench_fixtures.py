@@ -0,0 +1,255 @@
+import os
+import json
+import random
+import shutil
+from datetime import datetime, timedelta
+
+# ベンチマーク用の合成データとローカルのフィクスチャ
+#   - champions.json / patch_notes.json / patch_contents.json / champion_data/ を任意の規模で作る
+#   - hero_list.js / hero_rank_list_v2 / パッチノートのページは fixtures/ に置き、
+#     install_fixtures() で requests の通信をすべてそこへ向ける（ネットワークには出ない）
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+LANES = {1: "MID", 2: "TOP", 3: "ADC", 4: "SUP", 5: "JG"}
+RANKS = {0: "Emerald", 1: "Diamond", 2: "Master", 3: "Challenger", 4: "Legendary_rank"}
+
+URL_HERO_LIST = "https://game.gtimg.cn/images/lgamem/act/lrlib/js/heroList/hero_list.js"
+URL_STATS = "https://mlol.qt.qq.com/go/lgame_battle_info/hero_rank_list_v2"
+PATCH_BASE_URL = "https://wildrift.leagueoflegends.com/ja-jp/news/game-updates/"
+PATCH_INDEX_URL = "https://wildrift.leagueoflegends.com/ja-jp/news/tags/patch-notes/"
+INDEX_PAGE_SIZE = 12  # パッチノート一覧の1ページのカード数
+
+FIRST_PATCH_DATE = datetime(2021, 9, 1)
+PATCH_INTERVAL_DAYS = 14
+ABILITIES = ["パッシブ", "Q", "W", "E", "R", "基本ステータス"]
+
+
+def make_champions(count):
+    champions = []
+    for i in range(count):
+        champions.append({
+            "id": f"Champ{i:04d}",
+            "name_ja": f"チャンピオン{i}",
+            "img_url": f"https://example.invalid/champion/{i}.png",
+            "kana": f"ちゃんぴおん{i}",
+            "name_cn": f"英雄{i}",
+            "lanes": [],
+        })
+    return champions
+
+
+def champion_lanes(rng, count):
+    # 1人あたり 1〜2 レーン
+    return {i: rng.sample(sorted(LANES), rng.choice([1, 1, 2])) for i in range(count)}
+
+
+def patch_name(index):
+    return f"ワイルドリフト パッチノート {index // 10 + 1}.{index % 10}"
+
+
+def patch_date(index):
+    return FIRST_PATCH_DATE + timedelta(days=index * PATCH_INTERVAL_DAYS)
+
+
+def make_patch_notes(count):
+    return [{"patch_name": patch_name(i), "patch_link": f"{PATCH_BASE_URL}patch-{i}/"} for i in range(count)]
+
+
+def make_changes(rng, champions):
+    # 1パッチ分の変更: チャンピオン名 → [{ability_title, change_details}]
+    changes = {}
+    for champ in rng.sample(champions, min(len(champions), rng.randint(3, 12))):
+        entries = []
+        for ability in rng.sample(ABILITIES, rng.randint(1, 3)):
+            before = [rng.randint(20, 120) + 15 * level for level in range(4)]
+            delta = rng.choice([-10, -5, 5, 10])
+            after = [value + delta for value in before]
+            entries.append({
+                "ability_title": ability,
+                "change_details": (
+                    f"<li>ダメージ: {'/'.join(map(str, before))} → {'/'.join(map(str, after))}</li>"
+                    f"<li>クールダウン: {rng.randint(6, 14)}秒 → {rng.randint(6, 14)}秒</li>"
+                ),
+            })
+        changes[champ["name_ja"]] = entries
+    return changes
+
+
+def patch_html(name, date, changes):
+    # patch_scraper.parse_patch_contents が読む形のパッチノートのページ
+    blocks = []
+    for champion_name, entries in changes.items():
+        items = "".join(
+            f'<div class="character-change"><h4 class="character-ability-title">{e["ability_title"]}</h4>'
+            f'<div class="character-change-body"><ul>{e["change_details"]}</ul></div></div>'
+            for e in entries
+        )
+        blocks.append(
+            f'<div class="character-changes-container"><h3 class="character-name">{champion_name}</h3>{items}</div>'
+        )
+    return (
+        f'<!DOCTYPE html><html><head><title>{name}</title></head><body><header><nav>menu</nav></header>'
+        f'<article><h1>{name}</h1><time datetime="{date.strftime("%Y-%m-%dT09:00:00.000Z")}">{date:%Y/%m/%d}</time>'
+        f'<section class="patch-notes">{"".join(blocks)}</section></article><footer>footer</footer></body></html>'
+    )
+
+
+def index_page_url(page):
+    return PATCH_INDEX_URL if page == 1 else f"{PATCH_INDEX_URL}?page={page}"
+
+
+def patch_index_html(notes, page, has_next):
+    # patch_scraper.parse_patch_index が読む形の一覧ページ（新しい順のカードと rel="next"）
+    cards = "".join(
+        f'<a data-testid="articlefeaturedcard-component" href="{note["patch_link"].replace("https://wildrift.leagueoflegends.com", "")}">'
+        f'<div data-testid="card-title">{note["patch_name"]}</div><div data-testid="card-date">2024</div></a>'
+        for note in notes
+    )
+    next_link = f'<link rel="next" href="{index_page_url(page + 1)}">' if has_next else ""
+    return (
+        f'<!DOCTYPE html><html><head><title>patch notes</title>{next_link}</head><body>'
+        f'<header><nav><a href="/ja-jp/">home</a></nav></header><main>{cards}</main></body></html>'
+    )
+
+
+def make_rank_payload(rng, champions, lanes, date):
+    # hero_rank_list_v2 の形 {"result": 0, "data": {rank: {lane: [hero, ...]}}}
+    data = {}
+    for rank in RANKS:
+        data[str(rank)] = {str(lane): [] for lane in LANES}
+        for i, champ_lanes in lanes.items():
+            for lane in champ_lanes:
+                data[str(rank)][str(lane)].append({
+                    "hero_id": str(10000 + i),
+                    "dtstatdate": date.strftime("%Y%m%d"),
+                    "win_rate": f"{rng.uniform(0.42, 0.58):.4f}",
+                    "appear_rate": f"{rng.uniform(0.001, 0.12):.4f}",
+                    "forbid_rate": f"{rng.uniform(0.0, 0.3):.4f}",
+                })
+    return {"result": 0, "data": data}
+
+
+def make_champion_data(rng, champ, champ_lanes, patches):
+    # champion_data/{id}.json（古い → 新しい順のスナップショット。行のキーは champion_snapshots.upsert と同じ）
+    snapshots = []
+    for index in patches:
+        updatetime = patch_date(index).strftime("%Y/%m/%d")
+        snapshots.append({
+            "patch_name": patch_name(index),
+            "updatetime": updatetime,
+            "data": [
+                {
+                    "lane": LANES[lane],
+                    "rank": RANKS[rank],
+                    "winrate": round(rng.uniform(42, 58), 4),
+                    "pickrate": round(rng.uniform(0.1, 12), 4),
+                    "banrate": round(rng.uniform(0, 30), 4),
+                }
+                for rank in RANKS for lane in champ_lanes
+            ],
+        })
+    return {"id": champ["id"], "name_ja": champ["name_ja"], "patches": snapshots}
+
+
+def write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def build_workspace(root, champions=130, patches=5, history=6, missing_patches=1, seed=0, scraper_dir=BASE_DIR):
+    # root/scraper（スクリプトのコピー）と root/wrgg-frontend/public/data（合成データ）、root/fixtures を作る
+    rng = random.Random(seed)
+    missing_patches = max(0, min(missing_patches, patches - 1))
+    shutil.rmtree(root, ignore_errors=True)
+    shutil.copytree(scraper_dir, os.path.join(root, "scraper"),
+                    ignore=shutil.ignore_patterns("__pycache__", ".http_cache", "*.sqlite3*", ".*.json"))
+    data_dir = os.path.join(root, "wrgg-frontend", "public", "data")
+    fixtures_dir = os.path.join(root, "fixtures")
+    os.makedirs(fixtures_dir, exist_ok=True)
+
+    roster = make_champions(champions)
+    lanes = champion_lanes(rng, champions)
+    write_json(os.path.join(data_dir, "champions.json"), roster)
+
+    notes = make_patch_notes(patches)
+    write_json(os.path.join(data_dir, "patch_notes.json"), notes)
+
+    # patch_contents.json は最後の missing_patches 件を除いて取得済みにし、残りはフィクスチャから取る
+    urls = {}
+    contents = {}
+    for index, note in enumerate(notes):
+        changes = make_changes(rng, roster)
+        if index < patches - missing_patches:
+            contents[note["patch_name"]] = {"update_date": patch_date(index).strftime("%Y/%m/%d"), "champions": changes}
+        file_name = f"patch-{index}.html"
+        with open(os.path.join(fixtures_dir, file_name), "w", encoding="utf-8") as f:
+            f.write(patch_html(note["patch_name"], patch_date(index), changes))
+        urls[note["patch_link"]] = file_name
+    write_json(os.path.join(data_dir, "patch_contents.json"), contents)
+
+    # パッチノート一覧（新しい順に INDEX_PAGE_SIZE 件ずつ）
+    newest_first = list(reversed(notes))
+    page_count = max(1, -(-len(newest_first) // INDEX_PAGE_SIZE))
+    for page in range(1, page_count + 1):
+        file_name = f"index-{page}.html"
+        chunk = newest_first[(page - 1) * INDEX_PAGE_SIZE:page * INDEX_PAGE_SIZE]
+        with open(os.path.join(fixtures_dir, file_name), "w", encoding="utf-8") as f:
+            f.write(patch_index_html(chunk, page, page < page_count))
+        urls[index_page_url(page)] = file_name
+
+    # champion_data は取得済みのパッチのうち新しい方から history 件
+    known = list(range(max(0, patches - missing_patches)))[-history:]
+    for i, champ in enumerate(roster):
+        write_json(os.path.join(data_dir, "champion_data", f"{champ['id']}.json"),
+                   make_champion_data(rng, champ, lanes[i], known))
+
+    hero_list = {"heroList": {str(10000 + i): {"name": champ["name_cn"]} for i, champ in enumerate(roster)}}
+    write_json(os.path.join(fixtures_dir, "hero_list.json"), hero_list)
+    urls[URL_HERO_LIST] = "hero_list.json"
+
+    # 統計は最新パッチの3日後の日付にする（patch ステージで最新パッチが取り込まれる前提）
+    stats_date = patch_date(patches - 1) + timedelta(days=3)
+    write_json(os.path.join(fixtures_dir, "hero_rank_list_v2.json"), make_rank_payload(rng, roster, lanes, stats_date))
+    urls[URL_STATS] = "hero_rank_list_v2.json"
+
+    write_json(os.path.join(fixtures_dir, "urls.json"), urls)
+    return {"root": root, "data_dir": data_dir, "fixtures_dir": fixtures_dir}
+
+
+def install_fixtures(fixtures_dir):
+    # requests のすべての Session（requests.get も含む）で、URL をフィクスチャのファイルに差し替える
+    import requests
+    from requests.adapters import BaseAdapter
+
+    with open(os.path.join(fixtures_dir, "urls.json"), encoding="utf-8") as f:
+        urls = json.load(f)
+
+    class FixtureAdapter(BaseAdapter):
+        def send(self, request, stream=False, **kwargs):
+            response = requests.Response()
+            response.url = request.url
+            response.request = request
+            file_name = urls.get(request.url)
+            if file_name is None:
+                response.status_code = 404
+                response.reason = "Not Found (fixture)"
+                response._content = b""
+            else:
+                with open(os.path.join(fixtures_dir, file_name), "rb") as f:
+                    body = f.read()
+                response.status_code = 200
+                response.headers["Content-Type"] = "text/html; charset=utf-8" if file_name.endswith(".html") else "application/json; charset=utf-8"
+                response.headers["Content-Length"] = str(len(body))
+                response.encoding = "utf-8"
+                response._content = body
+            response._content_consumed = True  # iter_content(stream=True) でも _content から返す
+            return response
+
+        def close(self):
+            pass
+
+    adapter = FixtureAdapter()
+    requests.Session.get_adapter = lambda self, url: adapter
+    return urls
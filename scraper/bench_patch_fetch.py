@@ -0,0 +1,141 @@
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import http_cache
+from http_cache import HttpCache
+from bench_fixtures import make_champions, make_changes, patch_date, patch_name, patch_html
+from http_client import PER_HOST_LIMIT
+from patch_scraper import fetch_missing_patch_contents, parse_patch_contents
+
+# patch_scraper.fetch_missing_patch_contents をローカルのモックサーバーで確かめる（ネットワークには出ない）
+#   - 前のパッチほど応答を遅くして、終わる順番を入力と逆にしても結果が patches と同じ順か
+#   - 同名パッチは patches で前にある方が残るか（update_patch_contents のマージ順）
+#   - 404 / リンクなしのパッチは飛ばされるか
+#   - 同じホストへの同時接続が per_host 件以内で、順番に取るより速いか
+# 使い方: python scraper/bench_patch_fetch.py [--patches 12] [--delay 0.2]
+
+
+class PatchServer:
+    # /patch-<番号>/ で pages[番号] を返す（delays[番号] 秒待ってから）。ないページは 404
+    def __init__(self, pages, delays):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with server.lock:
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                try:
+                    index = int(self.path.strip("/").split("-")[-1])
+                    time.sleep(delays.get(index, 0))
+                    body = pages.get(index)
+                    payload = (body or "not found").encode("utf-8")
+                    self.send_response(200 if body else 404)
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    with server.lock:
+                        server.in_flight -= 1
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+
+
+def make_patches(count, server_url, rng):
+    # 記事のページと patch_notes.json の行（2番目は1番目と同名・別内容、最後の2つは 404 とリンクなし）
+    champions = make_champions(30)
+    pages, patches = {}, []
+    for i in range(count):
+        name = patch_name(0) if i == 1 else patch_name(i)
+        pages[i] = patch_html(name, patch_date(i), make_changes(rng, champions))
+        patches.append({"patch_name": name, "patch_link": f"{server_url}/patch-{i}/"})
+    pages.pop(count - 2)
+    patches[-1]["patch_link"] = ""
+    return pages, patches
+
+
+def merge(results):
+    # update_patch_contents と同じマージ（同名パッチは先にある方を使う）
+    merged = {}
+    for patch_result in results:
+        for name, contents in patch_result.items():
+            merged.setdefault(name, contents)
+    return merged
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--patches", type=int, default=12)
+    parser.add_argument("--delay", type=float, default=0.2, help="一番遅いページの応答時間（秒）")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pages, delays = {}, {}
+    server = PatchServer(pages, delays)
+    failures = []
+    try:
+        built_pages, patches = make_patches(args.patches, server.url, rng)
+        pages.update(built_pages)
+        # 前のパッチほど遅い → 取得が終わる順番は入力と逆になる
+        delays.update({i: args.delay * (args.patches - i) / args.patches for i in range(args.patches)})
+
+        # 期待値: 取得できるページを patches の順に1つずつパースしたもの
+        expected = [
+            parse_patch_contents(patch["patch_name"], pages[i])
+            for i, patch in enumerate(patches) if i in pages and patch["patch_link"]
+        ]
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            http_cache._http_cache = HttpCache(cache_dir)
+            start = time.perf_counter()
+            results = fetch_missing_patch_contents(patches, parse_workers=1)
+            elapsed = time.perf_counter() - start
+        sequential = sum(delays[i] for i, patch in enumerate(patches) if patch["patch_link"])
+
+        merged = merge(results)
+        first = patches[0]["patch_name"]
+        checks = [
+            ("順番", json.dumps(results, ensure_ascii=False) == json.dumps(expected, ensure_ascii=False),
+             f"{len(results)} 件が patches と同じ順（404 とリンクなしの 2 件は除く）"),
+            ("マージ", merged[first] == expected[0][first],
+             "同名パッチは patches で前にある方が残る"),
+            ("同時接続", 1 < server.max_in_flight <= PER_HOST_LIMIT,
+             f"同じホストへ同時 {server.max_in_flight} 件（上限 {PER_HOST_LIMIT}）"),
+            ("速さ", elapsed < sequential,
+             f"{elapsed:.2f} s（順番に取ると {sequential:.2f} s）"),
+        ]
+        for name, ok, detail in checks:
+            print(f"{'○' if ok else '×'} {name:<6} {detail}")
+            if not ok:
+                failures.append(name)
+    finally:
+        server.close()
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
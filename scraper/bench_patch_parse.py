@@ -0,0 +1,135 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from datetime import datetime
+
+from bench_fixtures import make_champions, make_changes, patch_date, patch_name
+from modeule import load_json
+from patch_scraper import (
+    PATCH_CONTENTS_JSON, PARSE_WORKERS, parse_patch_contents, parse_patch_pages, patch_strainer,
+)
+
+# パッチ記事のパースの速さと、元のパース（html.parser・全体）と結果が同じかを確かめる
+#   - patch_contents.json の取得済みの内容を実際の記事に近い形のページに戻したもの
+#   - bench_fixtures の合成ページ
+#   - --corpus で指定したディレクトリの *.html（保存した実際の記事）
+# パーサー / strainer / プロセスプールの組み合わせごとに、出力の JSON がバイト単位で一致するかを見る
+# 使い方: python scraper/bench_patch_parse.py [--synthetic 200] [--corpus DIR] [--repeat 3]
+
+
+def real_page(name, contents):
+    # 実際の記事と同じように、対象の部分の外にもスクリプト・ナビ・コメント・空白などを置く
+    blocks = []
+    for champion_name, entries in contents["champions"].items():
+        items = "\n".join(
+            f'<div class="character-change">\n  <h4 class="character-ability-title"> {e["ability_title"]} </h4>\n'
+            f'  <div class="character-change-body"><ul>{e["change_details"]}</ul></div>\n</div>'
+            for e in entries
+        )
+        blocks.append(
+            f'<div class="character-changes-container patch-block"><div class="header">'
+            f'<h3 class="character-name">{champion_name}</h3></div>\n{items}\n</div>'
+        )
+    date = datetime.strptime(contents["update_date"], "%Y/%m/%d") if contents["update_date"] else None
+    time_tag = f'<time datetime="{date:%Y-%m-%dT00:00:00.000Z}">{date:%Y/%m/%d}</time>' if date else ""
+    return (
+        '<!DOCTYPE html>\n<html lang="ja-jp"><head><meta charset="utf-8"><title>' + name + '</title>'
+        '<script>window.__data = {"a": "<div class=\\"character-changes-container\\">"};</script>'
+        '<style>.character-name{color:red}</style></head>\n<body>'
+        '<header><nav><ul><li><a href="/ja-jp/">ホーム</a></li><li>ニュース &amp; 更新</li></ul></nav></header>\n'
+        f'<main><article><h1>{name}</h1><div class="meta">{time_tag}</div><!-- patch body -->\n'
+        + "\n".join(blocks) +
+        '\n</article></main><footer><p>&copy; Riot Games<br>footer</p></footer></body></html>'
+    )
+
+
+def build_corpus(synthetic=200, corpus_dir=None, seed=0):
+    # [(patch_name, html), ...]
+    pages = []
+    contents = load_json(PATCH_CONTENTS_JSON) or {}
+    for name, patch in contents.items():
+        pages.append((name, real_page(name, patch)))
+
+    rng = random.Random(seed)
+    from bench_fixtures import patch_html
+    roster = make_champions(130)
+    for i in range(synthetic):
+        pages.append((patch_name(i), patch_html(patch_name(i), patch_date(i), make_changes(rng, roster))))
+
+    if corpus_dir:
+        for file_name in sorted(os.listdir(corpus_dir)):
+            if file_name.endswith(".html"):
+                with open(os.path.join(corpus_dir, file_name), encoding="utf-8") as f:
+                    pages.append((file_name, f.read()))
+    return pages
+
+
+def parsers():
+    available = ["html.parser"]
+    try:
+        import lxml  # noqa: F401
+        available.append("lxml")
+    except ImportError:
+        print("lxml がないので html.parser だけ測ります")
+    return available
+
+
+def dump(results):
+    return json.dumps(results, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def measure(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--synthetic", type=int, default=200, help="合成ページの数")
+    parser.add_argument("--corpus", help="保存した記事（*.html）のディレクトリ")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=PARSE_WORKERS)
+    args = parser.parse_args()
+
+    pages = build_corpus(args.synthetic, args.corpus)
+    print(f"{len(pages)} ページ, {sum(len(html.encode('utf-8')) for _, html in pages) / 1024 / 1024:.1f} MB")
+
+    # 元の処理: html.parser で全体をパースする
+    reference, base = measure(lambda: [parse_patch_contents(name, html) for name, html in pages], args.repeat)
+    expected = dump(reference)
+    print(f"{'パーサー':<14}{'strainer':<10}{'プロセス':>8}{'時間[s]':>10}{'速さ':>8}  一致")
+    print(f"{'html.parser':<14}{'-':<10}{1:>8}{base:10.3f}{1.0:8.2f}  基準")
+
+    failures = []
+    patches = [({"patch_name": name}, html) for name, html in pages]
+    for backend in parsers():
+        for use_strainer in (False, True):
+            strainer = patch_strainer() if use_strainer else None
+            if use_strainer and strainer is None:
+                continue
+            configs = [(1, lambda: [parse_patch_contents(name, html, backend, strainer) for name, html in pages])]
+            if args.workers > 1:
+                configs.append((args.workers, lambda: parse_patch_pages(patches, backend, use_strainer, args.workers)))
+            for workers, func in configs:
+                result, elapsed = measure(func, args.repeat)
+                same = dump(result) == expected
+                if not same:
+                    failures.append(f"{backend} strainer={use_strainer} workers={workers}")
+                print(f"{backend:<14}{str(use_strainer):<10}{workers:>8}{elapsed:10.3f}{base / elapsed:8.2f}  {'○' if same else '×'}")
+
+    for failure in failures:
+        print("⚠️ 元のパースと結果が違います:", failure)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+import contextlib
+
+# 合成データで各処理を規模別に測るベンチマーク
+#   - bench_fixtures で champions / patch_contents / champion_data / 通信のフィクスチャを作る
+#   - 処理ごとに別プロセスで実行し、実行時間・最大メモリ(RSS)・読み書きしたバイト数を記録する
+#   - 基準（--save-baseline）と比べて遅く・重くなっていたら --compare で終了コード 1
+# 使い方: python scraper/bench_pipeline.py --scale 130x5 --scale 500x50 --scale 2000x500
+#         python scraper/bench_pipeline.py --save-baseline
+#         python scraper/bench_pipeline.py --compare
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_JSON = os.path.join(BASE_DIR, '.bench_pipeline.json')  # 環境ごとに違うのでコミットしない
+
+DEFAULT_SCALES = ["130x5", "500x50", "2000x500"]  # チャンピオン数 x パッチ数
+STAGES = ["patch", "championdata", "delete", "lane", "ai_input"]
+
+# 基準との比較で許容する範囲
+TIME_TOLERANCE, TIME_SLACK = 1.5, 0.05                 # 倍, 秒
+RSS_TOLERANCE, RSS_SLACK = 1.25, 10 * 1024 * 1024      # 倍, bytes
+IO_TOLERANCE, IO_SLACK = 1.1, 4096                     # 倍, bytes
+
+
+def run_stage(name):
+    # 子プロセス側: 1つの処理を実行する（通信はフィクスチャに差し替え済み）
+    if name == "patch":
+        from patch_scraper import update_patch_data, update_patch_contents
+        update_patch_data()
+        update_patch_contents()
+    elif name == "championdata":
+        from championdata_scraper import champion_data_scrape
+        champion_data_scrape()
+    elif name == "delete":
+        from delete_champion_data import delete_champion_data
+        delete_champion_data()
+    elif name == "lane":
+        from champion_lane import champion_lane, add_manual_lanes_bulk, CHAMPIONS_JSON
+        from modeule import get_champion_registry
+        champion_lane(save=False)
+        add_manual_lanes_bulk(save=False)
+        get_champion_registry(CHAMPIONS_JSON).save()
+    elif name == "ai_input":
+        import make_ai_input
+        from modeule import save_json
+        os.makedirs(make_ai_input.OUTPUT_DIR, exist_ok=True)
+        ranking = make_ai_input.TopRanking()
+        diff_input, _ = make_ai_input.build_diff_input(ranking=ranking)
+        save_json(make_ai_input.OUTPUT_JSON, diff_input)
+        save_json(make_ai_input.RANKING_JSON, ranking.result())
+    else:
+        raise ValueError(f"不明な処理です: {name}")
+
+
+def read_proc_io():
+    # Linux の /proc/self/io（read/write システムコールで読み書きしたバイト数）
+    try:
+        with open("/proc/self/io") as f:
+            values = dict(line.split(": ") for line in f.read().splitlines())
+        return int(values["rchar"]), int(values["wchar"])
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+def child_main(name, workspace):
+    import resource
+    from bench_fixtures import install_fixtures
+    import modeule
+
+    install_fixtures(os.path.join(workspace, "fixtures"))
+    read0, write0 = read_proc_io()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        run_stage(name)
+    elapsed = time.perf_counter() - start
+    read1, write1 = read_proc_io()
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    peak_rss = usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)  # Linux は KB 単位
+    print(json.dumps({
+        "seconds": round(elapsed, 4),
+        "peak_rss": peak_rss,
+        "bytes_read": read1 - read0 if read0 is not None else None,
+        "bytes_written": write1 - write0 if write0 is not None else modeule.write_stats["bytes_written"],
+        "json_written": modeule.write_stats["written"],
+    }))
+
+
+def parse_scale(text):
+    champions, patches = text.lower().split("x")
+    return int(champions), int(patches)
+
+
+def bench_scale(scale, seed, keep=None):
+    from bench_fixtures import build_workspace
+
+    champions, patches = parse_scale(scale)
+    root = keep or tempfile.mkdtemp(prefix=f"wrgg_bench_{scale}_")
+    start = time.perf_counter()
+    build_workspace(root, champions=champions, patches=patches, seed=seed)
+    print(f"[{scale}] 合成データを作成しました ({time.perf_counter() - start:.1f} s): {root}")
+
+    results = {}
+    try:
+        for name in STAGES:
+            script = os.path.join(root, "scraper", "bench_pipeline.py")
+            proc = subprocess.run(
+                [sys.executable, script, "--run-stage", name, "--workspace", root],
+                cwd=os.path.join(root, "scraper"), capture_output=True, text=True,
+                env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1"),
+            )
+            if proc.returncode != 0:
+                raise RuntimeError(f"[{scale}] {name} が失敗しました:\n{proc.stderr}")
+            results[name] = json.loads(proc.stdout.strip().splitlines()[-1])
+    finally:
+        if keep is None:
+            import shutil
+            shutil.rmtree(root, ignore_errors=True)
+    return results
+
+
+def compare(current, baseline):
+    # 基準より悪化した項目のメッセージ
+    failures = []
+    for scale, stages in current.items():
+        for name, result in stages.items():
+            base = baseline.get(scale, {}).get(name)
+            if not base:
+                continue
+            checks = [
+                ("seconds", TIME_TOLERANCE, TIME_SLACK),
+                ("peak_rss", RSS_TOLERANCE, RSS_SLACK),
+                ("bytes_written", IO_TOLERANCE, IO_SLACK),
+                ("bytes_read", IO_TOLERANCE, IO_SLACK),
+            ]
+            for key, tolerance, slack in checks:
+                if result.get(key) is None or base.get(key) is None:
+                    continue
+                if result[key] > base[key] * tolerance + slack:
+                    failures.append(f"{scale} {name}: {key} {base[key]:,} → {result[key]:,}")
+    return failures
+
+
+def print_results(results):
+    print(f"{'規模':<10}{'処理':<14}{'時間[s]':>9}{'最大RSS[MB]':>13}{'読込[KB]':>11}{'書込[KB]':>11}{'JSON書込':>9}")
+    for scale, stages in results.items():
+        for name, r in stages.items():
+            read = f"{r['bytes_read'] / 1024:11.0f}" if r["bytes_read"] is not None else f"{'-':>11}"
+            print(f"{scale:<10}{name:<14}{r['seconds']:9.3f}{r['peak_rss'] / 1024 / 1024:13.1f}{read}"
+                  f"{r['bytes_written'] / 1024:11.0f}{r['json_written']:9d}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", action="append", help="チャンピオン数xパッチ数（複数指定可）")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=BASELINE_JSON)
+    parser.add_argument("--save-baseline", action="store_true", help="今回の結果を基準として保存する")
+    parser.add_argument("--compare", action="store_true", help="基準より悪化していたら終了コード 1")
+    parser.add_argument("--keep", help="合成データをこのディレクトリに作って残す（1規模のみ）")
+    parser.add_argument("--run-stage", help=argparse.SUPPRESS)
+    parser.add_argument("--workspace", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_stage:
+        child_main(args.run_stage, args.workspace)
+        return
+
+    scales = args.scale or DEFAULT_SCALES
+    results = {scale: bench_scale(scale, args.seed, args.keep) for scale in scales}
+    print_results(results)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=2)
+        print(f"基準を {args.baseline} に保存しました")
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"基準がありません: {args.baseline}")
+            sys.exit(1)
+        with open(args.baseline, encoding="utf-8") as f:
+            failures = compare(results, json.load(f))
+        for failure in failures:
+            print("⚠️", failure)
+        if failures:
+            sys.exit(1)
+        print("基準からの悪化はありません")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+
+import metrics
+import response_ai
+from modeule import load_json
+
+# response_ai を偽の Gemini クライアントで確かめる（API キー・ネットワークは使わない）
+#   - 同じ ai_ranking ならキャッシュを使い、Gemini を呼ばないか
+#   - 上位だけを送るプロンプトが diff_input.json 全体より小さいか
+#   - --per-lane のリクエストが同時に出て、まとめた結果が ai_ranking の順か
+#   - 渡した順位と違うチャンピオンの応答を再試行するか
+# 使い方: python scraper/bench_response_ai.py [--latency 0.3]
+
+
+class FakeModels:
+    def __init__(self, client):
+        self.client = client
+
+    def generate_content(self, model, contents, config):
+        return self.client.respond(contents)
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGeminiClient:
+    # genai.Client と同じ client.models.generate_content(...).text の形
+    # プロンプトの RANKING の順に正しい CSV を作って返す（bad_responses 回までは1位のチャンピオンが違う応答）
+    def __init__(self, latency=0.0, bad_responses=0):
+        self.models = FakeModels(self)
+        self.latency = latency
+        self.bad_responses = bad_responses
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.prompt_sizes = []
+
+    def respond(self, prompt):
+        with self.lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self.prompt_sizes.append(len(prompt.encode("utf-8")))
+            bad = self.calls <= self.bad_responses
+        try:
+            time.sleep(self.latency)
+            ranking = json.loads(prompt.split("RANKING:\n", 1)[1])
+            rows = [(item["champion"], item["lane"]) for item in ranking]
+            if bad:
+                rows = [("存在しないチャンピオン", "TOP")] + rows[1:]
+            lines = ['"ranking","champion","reason"']
+            lines += [f'"{i}","{name}","{lane}でwin↑。他ランクでも同じ傾向"' for i, (name, lane) in enumerate(rows, start=1)]
+            return FakeResponse("```csv\n" + "\n".join(lines) + "\n```")
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+def check_cache(items, cache_path, latency):
+    first = FakeGeminiClient(latency)
+    raw = response_ai.generate(items, lambda: first, cache_path=cache_path)
+    second = FakeGeminiClient(latency)
+    start = time.perf_counter()
+    cached = response_ai.generate(items, lambda: second, cache_path=cache_path)
+    elapsed = time.perf_counter() - start
+    ok = first.calls == 1 and second.calls == 0 and cached == raw
+    return ok, f"1回目 {first.calls} 回、2回目 {second.calls} 回呼び出し（{elapsed * 1000:.1f} ms）"
+
+
+def check_prompt_size(items, diff_input, cache_path):
+    client = FakeGeminiClient()
+    response_ai.generate(items, lambda: client, cache_path=cache_path)
+    # 以前は diff_input.json 全体（indent=2）をプロンプトに入れていた
+    whole = len(json.dumps(diff_input, ensure_ascii=False, indent=2).encode("utf-8"))
+    ranked = client.prompt_sizes[0]
+    return ranked < whole, f"diff_input {whole / 1024:.1f} KB → プロンプト全体 {ranked / 1024:.1f} KB"
+
+
+def check_per_lane(items, cache_path, latency):
+    client = FakeGeminiClient(latency)
+    start = time.perf_counter()
+    raw = response_ai.generate(items, lambda: client, per_lane=True, cache_path=cache_path)
+    elapsed = time.perf_counter() - start
+    rows = response_ai.validate_csv(raw, items)
+    ok = client.max_in_flight == client.calls and elapsed < latency * 2
+    return ok, f"{client.calls} レーンを同時 {client.max_in_flight} 件で {elapsed:.2f} s、まとめて {len(rows)} 件"
+
+
+def check_retry(items, cache_path):
+    client = FakeGeminiClient(bad_responses=2)
+    raw = response_ai.generate(items, lambda: client, cache_path=cache_path)
+    ok = client.calls == 3 and "存在しないチャンピオン" not in raw
+    return ok, f"違うチャンピオンを2回返した後に成功（{client.calls} 回呼び出し）"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.3, help="模擬する Gemini の応答時間（秒）")
+    args = parser.parse_args()
+
+    diff_input = load_json(response_ai.DIFF_PATH) or {}
+    items = response_ai.load_ranking()
+    if not items:
+        print("ai_ranking.json / diff_input.json がありません")
+        sys.exit(1)
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        checks = [
+            ("キャッシュ", lambda: check_cache(items, os.path.join(tmp, "cache.json"), args.latency)),
+            ("プロンプト", lambda: check_prompt_size(items, diff_input, os.path.join(tmp, "size.json"))),
+            ("レーンごと", lambda: check_per_lane(items, os.path.join(tmp, "lane.json"), args.latency)),
+            ("再試行", lambda: check_retry(items, os.path.join(tmp, "retry.json"))),
+        ]
+        for name, check in checks:
+            metrics.reset()
+            ok, detail = check()
+            print(f"{'○' if ok else '×'} {name:<8} {detail}")
+            if not ok:
+                failures.append(name)
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import argparse
+import random
+import time
+from champion_snapshots import ChampionSnapshots
+
+# (lane, rank) の upsert が ランク数・レーン数・日付（パッチ）数に対して
+# 1行あたり一定コストで済むかを、従来のリスト走査と比べる
+# 使い方: python scraper/bench_snapshot_upsert.py
+
+
+def legacy_upsert(champ_data, patch_name, row):
+    # 変更前の championdata_scraper と同じリスト走査
+    snapshots = [s for s in champ_data["patches"] if s["patch_name"] == patch_name]
+    if snapshots:
+        snapshot = snapshots[0]
+    else:
+        snapshot = {"patch_name": patch_name, "updatetime": row["updatetime"], "data": []}
+        champ_data["patches"].append(snapshot)
+
+    for entry in snapshot["data"]:
+        if entry["lane"] == row["lane"] and entry["rank"] == row["rank"]:
+            entry["winrate"] = row["winrate"]
+            entry["pickrate"] = row["pickrate"]
+            entry["banrate"] = row["banrate"]
+            return
+    snapshot["data"].append({
+        "lane": row["lane"],
+        "rank": row["rank"],
+        "winrate": row["winrate"],
+        "pickrate": row["pickrate"],
+        "banrate": row["banrate"],
+    })
+
+
+def legacy_seen(all_rows, row):
+    # 変更前の all_champion_data 重複チェック（any によるリスト走査）
+    if not any(
+        d["updatetime"] == row["updatetime"] and d["rank"] == row["rank"] and d["lane"] == row["lane"]
+        for d in all_rows
+    ):
+        all_rows.append(row)
+
+
+def make_rows(ranks, lanes, dates):
+    rows = []
+    for d in range(dates):
+        for r in range(ranks):
+            for l in range(lanes):
+                rows.append({
+                    "patch_name": f"patch{d}",
+                    "updatetime": f"2026/{d // 28 % 12 + 1:02d}/{d % 28 + 1:02d}",
+                    "lane": f"L{l}",
+                    "rank": f"R{r}",
+                    "winrate": random.uniform(40, 60),
+                    "pickrate": random.uniform(0, 10),
+                    "banrate": random.uniform(0, 10),
+                })
+    return rows
+
+
+def run_legacy(rows):
+    champ_data = {"patches": []}
+    all_rows = []
+    start = time.perf_counter()
+    for row in rows:
+        legacy_upsert(champ_data, row["patch_name"], row)
+        legacy_seen(all_rows, row)
+    return time.perf_counter() - start
+
+
+def run_indexed(rows):
+    snapshots = ChampionSnapshots({"patches": []})
+    seen_keys = set()
+    all_rows = []
+    start = time.perf_counter()
+    for row in rows:
+        snapshots.upsert(row["patch_name"], row)
+        key = (row["updatetime"], row["rank"], row["lane"])
+        if key not in seen_keys:
+            seen_keys.add(key)
+            all_rows.append(row)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    random.seed(0)
+    scales = [
+        (5, 5, 5),
+        (20, 5, 5),
+        (5, 20, 5),
+        (5, 5, 50),
+        (20, 20, 50),
+    ]
+
+    print(f"{'ranks':>5} {'lanes':>5} {'dates':>5} {'rows':>7} {'legacy us/row':>14} {'indexed us/row':>15}")
+    for ranks, lanes, dates in scales:
+        rows = make_rows(ranks, lanes, dates)
+        legacy = min(run_legacy(rows) for _ in range(args.repeat))
+        indexed = min(run_indexed(rows) for _ in range(args.repeat))
+        print(f"{ranks:>5} {lanes:>5} {dates:>5} {len(rows):>7} "
+              f"{legacy / len(rows) * 1e6:>14.2f} {indexed / len(rows) * 1e6:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
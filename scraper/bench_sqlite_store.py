@@ -0,0 +1,102 @@
+import os
+import time
+import random
+import shutil
+import argparse
+import tempfile
+from modeule import load_json, save_json
+from champion_snapshots import ChampionSnapshots
+import sqlite_store
+
+# 1回分の取り込み（全チャンピオン × レーン × ランク）を
+# 従来の「チャンピオンごとに JSON を読んで書き直す」方式と SQLite の一括 upsert で比べる
+# 使い方: python scraper/bench_sqlite_store.py --data-dir docs/data --runs 5
+
+LANES = ["MID", "TOP", "ADC", "SUP", "JG"]
+RANKS = ["Emerald", "Diamond", "Master", "Challenger", "Legendary_rank"]
+
+
+def make_rows(champion_ids, run):
+    rows_by_champ = {}
+    for champ_id in champion_ids:
+        rows_by_champ[champ_id] = [
+            {
+                "updatetime": f"2030/01/{run % 28 + 1:02d}",
+                "lane": lane,
+                "rank": rank,
+                "winrate": round(random.uniform(40, 60), 4),
+                "pickrate": round(random.uniform(0, 10), 4),
+                "banrate": round(random.uniform(0, 10), 4),
+            }
+            for rank in RANKS
+            for lane in LANES
+        ]
+    return rows_by_champ
+
+
+def ingest_files(champion_dir, patch_name, rows_by_champ):
+    for champ_id, rows in rows_by_champ.items():
+        champ_file = os.path.join(champion_dir, f"{champ_id}.json")
+        champ_data = load_json(champ_file) if os.path.exists(champ_file) else {"id": champ_id, "name_ja": None, "patches": []}
+        champ_data.setdefault("patches", [])
+        snapshots = ChampionSnapshots(champ_data)
+        changed = False
+        for row in rows:
+            changed = snapshots.upsert(patch_name, row) or changed
+        if changed:
+            save_json(champ_file, champ_data)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data-dir", default=sqlite_store.DATA_DIR)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    random.seed(0)
+    work = tempfile.mkdtemp(prefix="wrgg_bench_")
+    try:
+        file_dir = os.path.join(work, "champion_data")
+        shutil.copytree(os.path.join(args.data_dir, "champion_data"), file_dir)
+        champion_ids = sorted(name[:-len(".json")] for name in os.listdir(file_dir) if name.endswith(".json"))
+
+        conn = sqlite_store.connect(os.path.join(work, "bench.sqlite3"))
+        start = time.perf_counter()
+        sqlite_store.import_json(conn, args.data_dir)
+        import_time = time.perf_counter() - start
+
+        file_times, db_times, export_times = [], [], []
+        for run in range(args.runs):
+            patch_name = f"bench patch {run}"
+            rows_by_champ = make_rows(champion_ids, run)
+
+            start = time.perf_counter()
+            ingest_files(file_dir, patch_name, rows_by_champ)
+            file_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            sqlite_store.upsert_stats(conn, patch_name, rows_by_champ)
+            db_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            sqlite_store.export_all_champion_data(conn, patch_name, os.path.join(work, "all_champion_data.json"))
+            export_times.append(time.perf_counter() - start)
+
+        # 両方の結果が一致するか確認
+        for champ_id in champion_ids:
+            expected = load_json(os.path.join(file_dir, f"{champ_id}.json"))
+            assert sqlite_store.champion_json(conn, champ_id) == expected, f"{champ_id} が一致しません"
+        conn.close()
+
+        rows = len(champion_ids) * len(LANES) * len(RANKS)
+        print(f"チャンピオン {len(champion_ids)} / 1回 {rows} 行 / {args.runs} 回")
+        print(f"SQLite 初回取り込み:          {import_time * 1000:8.1f} ms")
+        print(f"JSON ファイル方式（1回平均）:  {sum(file_times) / args.runs * 1000:8.1f} ms")
+        print(f"SQLite upsert（1回平均）:      {sum(db_times) / args.runs * 1000:8.1f} ms")
+        print(f"SQLite → all_champion_data:    {sum(export_times) / args.runs * 1000:8.1f} ms")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+# 各処理のモジュールを import するだけの時間（コールドスタート）を python -X importtime で測る
+# 使い方: python scraper/bench_startup.py --repeat 5
+#         python scraper/bench_startup.py --save-baseline   # 今の結果を基準として保存
+#         python scraper/bench_startup.py --check           # 基準より遅くなっていたら終了コード 1
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_JSON = os.path.join(BASE_DIR, '.bench_startup.json')  # 環境ごとに違うのでコミットしない
+
+MODULES = [
+    "champion_scraper",
+    "patch_scraper",
+    "championdata_scraper",
+    "champion_lane",
+    "delete_champion_data",
+    "make_ai_input",
+    "response_ai",
+    "pipeline",
+]
+
+# import しただけで読み込まれてはいけない重いライブラリ
+HEAVY_PACKAGES = ["requests", "urllib3", "bs4", "lxml", "selenium", "chromedriver_autoinstaller", "google", "dotenv", "numpy"]
+
+SLACK_US = 5000     # 基準との比較で許容する誤差（マイクロ秒）
+TOLERANCE = 1.5     # 基準の何倍までを許容するか
+
+
+def measure(module):
+    # 1回分: (モジュール自体の累積時間[us], 読み込まれたトップレベルのパッケージ名)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BASE_DIR, capture_output=True, text=True,
+        env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1"),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{module} の import に失敗しました:\n{result.stderr.strip().splitlines()[-1]}")
+
+    total = None
+    packages = set()
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        if name == module:
+            total = int(cumulative)
+        packages.add(name.split(".")[0])
+    return total, packages
+
+
+def run(repeat):
+    results = {}
+    for module in MODULES:
+        times = []
+        packages = set()
+        for _ in range(repeat):
+            total, packages = measure(module)
+            times.append(total)
+        heavy = sorted(p for p in HEAVY_PACKAGES if p in packages)
+        results[module] = {"us": min(times), "heavy": heavy}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5, help="各モジュールを測る回数（最小値を使う）")
+    parser.add_argument("--baseline", default=BASELINE_JSON)
+    parser.add_argument("--save-baseline", action="store_true", help="今回の結果を基準として保存する")
+    parser.add_argument("--check", action="store_true", help="基準より遅い・重いライブラリを読み込んでいたら失敗にする")
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    failures = []
+    print(f"{'モジュール':<22}{'import 時間':>12}{'基準':>12}  重いライブラリ")
+    for module, result in results.items():
+        base = baseline.get(module, {}).get("us")
+        base_text = f"{base / 1000:9.1f} ms" if base else "           -"
+        print(f"{module:<22}{result['us'] / 1000:9.1f} ms{base_text}  {', '.join(result['heavy']) or '-'}")
+
+        if result["heavy"]:
+            failures.append(f"{module} が import 時に {', '.join(result['heavy'])} を読み込んでいます")
+        if base and result["us"] > base * TOLERANCE + SLACK_US:
+            failures.append(f"{module} の import が基準より遅くなっています ({base / 1000:.1f} ms → {result['us'] / 1000:.1f} ms)")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"基準を {args.baseline} に保存しました")
+
+    for failure in failures:
+        print("⚠️", failure)
+    if args.check and failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
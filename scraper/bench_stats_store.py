@@ -0,0 +1,90 @@
+import os
+import copy
+import time
+import argparse
+from modeule import load_json
+from patch_timeline import load_patch_timeline
+from stats_store import StatsStore, CHAMPION_DIR, PATCH_CONTENTS_JSON
+import make_ai_input
+
+# make_ai_input の dict ループと StatsStore（構築 + 一括計算）を比べる
+# パイプラインでは毎回 JSON から StatsStore を作ることになるので、構築の時間も含めて比べる
+# 使い方: python scraper/bench_stats_store.py --scale 10
+
+
+def load_champions(champion_dir, scale):
+    champ_datas = []
+    for file_name in sorted(os.listdir(champion_dir)):
+        if file_name.endswith(".json"):
+            champ_data = load_json(os.path.join(champion_dir, file_name))
+            champ_data.setdefault("id", file_name[:-len(".json")])
+            champ_datas.append(champ_data)
+
+    # ロスターを scale 倍に複製する（id だけ変える）
+    scaled = []
+    for i in range(scale):
+        for champ_data in champ_datas:
+            copied = copy.deepcopy(champ_data)
+            if i:
+                copied["id"] = f"{copied['id']}_{i}"
+            scaled.append(copied)
+    return scaled
+
+
+def run_dict_loop(champ_datas):
+    diff_input = {}
+    for champ_data in champ_datas:
+        diff = make_ai_input.champion_diff(champ_data, f"{champ_data['id']}.json")
+        if diff:
+            diff_input[champ_data["id"]] = diff
+    return diff_input
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--champion-dir", default=CHAMPION_DIR)
+    parser.add_argument("--patch-contents", default=PATCH_CONTENTS_JSON)
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    timeline = load_patch_timeline(args.patch_contents)
+    champ_datas = load_champions(args.champion_dir, args.scale)
+    params = (make_ai_input.rank_weight, make_ai_input.threshold_win, make_ai_input.threshold)
+
+    loop_times, build_times, store_times = [], [], []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        expected = run_dict_loop(champ_datas)
+        loop_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        store = StatsStore.from_champion_data(champ_datas, timeline)
+        build_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        result = store.diff(*params)
+        store.top_n(result["score"], result["selected"], 15)
+        store_times.append(time.perf_counter() - start)
+
+    # 結果が一致するか（diff_weight を変えても同じ重みを使うか）・JSON に戻せるかを確認
+    assert store.diff_input(*params) == expected, "StatsStore の差分が make_ai_input と一致しません"
+    default_weight = dict(make_ai_input.diff_weight)
+    try:
+        make_ai_input.diff_weight.update({"win": 0.5, "pick": 2.0, "ban": 1.5})
+        assert store.diff_input(*params) == run_dict_loop(champ_datas), "diff_weight を変えると make_ai_input と一致しません"
+    finally:
+        make_ai_input.diff_weight.update(default_weight)
+    for champ_data in champ_datas[:len(champ_datas) // args.scale]:
+        assert store.to_champion_json(champ_data["id"]) == champ_data, f"{champ_data['id']} の往復変換が一致しません"
+
+    print(f"チャンピオン {len(champ_datas)} / パッチ {len(store.patch_names)} / 差分 {len(expected)} 件")
+    loop_time, build_time, store_time = min(loop_times), min(build_times), min(store_times)
+    print(f"dict ループ:              {loop_time * 1000:8.2f} ms")
+    print(f"StatsStore 構築:          {build_time * 1000:8.2f} ms")
+    print(f"StatsStore 一括計算:      {store_time * 1000:8.2f} ms")
+    print(f"StatsStore 構築 + 計算:   {(build_time + store_time) * 1000:8.2f} ms（dict ループの {(build_time + store_time) / loop_time:.1f} 倍）")
+
+
+if __name__ == "__main__":
+    main()
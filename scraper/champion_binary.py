@@ -0,0 +1,188 @@
+import os
+import json
+import struct
+import argparse
+import numpy as np
+from modeule import save_json
+from stats_store import StatsStore, date_key, METRICS, CHAMPION_DIR
+
+# champion_data の固定レイアウトのバイナリ形式
+#   先頭: MAGIC(8 byte) + ヘッダー長(uint64)
+#   ヘッダー: JSON（チャンピオン / パッチ / レーン / ランクの索引と各配列の位置）
+#   本体: 64 byte 境界に揃えた配列
+#     values    (champion, patch, lane, rank, metric)  float32（または float64）
+#     patch_seq (champion, patch)                      int32
+#     entry_seq (champion, patch, lane, rank)          int32
+# 読む側は np.memmap で必要な所だけ参照でき、ファイル全体をパースしない
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT_BIN = os.path.join(BASE_DIR, 'champion_history.bin')  # 手元で使う変換結果（公開・デプロイしないので public の外）
+
+MAGIC = b"WRGGSNAP"
+VERSION = 1
+ALIGN = 64
+FLOAT32_DECIMALS = 4  # API の値は小数4桁（0.577719 * 100）なので float32 でも4桁で戻せる
+
+
+def _align(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def write_snapshots(store, path=SNAPSHOT_BIN, dtype="float32"):
+    arrays = {
+        "values": store.values.astype(dtype),
+        "patch_seq": store.patch_seq.astype(np.int32),
+        "entry_seq": store.entry_seq.astype(np.int32),
+    }
+
+    offset = 0
+    layout = {}
+    for name, array in arrays.items():
+        layout[name] = {"offset": offset, "dtype": array.dtype.str, "shape": list(array.shape)}
+        offset = _align(offset + array.nbytes)
+
+    header = {
+        "version": VERSION,
+        "metrics": METRICS,
+        "decimals": FLOAT32_DECIMALS if np.dtype(dtype) == np.float32 else None,
+        "champ_docs": store.champ_docs,
+        "patch_names": store.patch_names,
+        "lanes": store.lanes,
+        "ranks": store.ranks,
+        "updatetimes": store.updatetimes.tolist(),
+        "arrays": layout,
+    }
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    data_start = _align(len(MAGIC) + 8 + len(header_bytes))
+
+    # 途中で止まっても壊れたファイルが残らないように一時ファイル経由で置き換える
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(np.ascontiguousarray(array).tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+
+
+class SnapshotFile:
+    # バイナリ形式をメモリマップで開く（配列はコピーせずに参照する）
+
+    def __init__(self, path=SNAPSHOT_BIN):
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} はスナップショット形式ではありません")
+            (header_len,) = struct.unpack("<Q", f.read(8))
+            header = json.loads(f.read(header_len).decode("utf-8"))
+        if header["version"] != VERSION:
+            raise ValueError(f"未対応のバージョンです: {header['version']}")
+
+        self.path = path
+        self.header = header
+        self.champ_docs = header["champ_docs"]
+        self.champ_ids = [doc["id"] for doc in self.champ_docs]
+        self.patch_names = header["patch_names"]
+        self.lanes = header["lanes"]
+        self.ranks = header["ranks"]
+        self.updatetimes = header["updatetimes"]
+        self.champ_index = {champ_id: i for i, champ_id in enumerate(self.champ_ids)}
+        self.patch_index = {name: i for i, name in enumerate(self.patch_names)}
+        self.lane_index = {lane: i for i, lane in enumerate(self.lanes)}
+        self.rank_index = {rank: i for i, rank in enumerate(self.ranks)}
+
+        data_start = _align(len(MAGIC) + 8 + header_len)
+        for name, spec in header["arrays"].items():
+            array = np.memmap(path, dtype=np.dtype(spec["dtype"]), mode="r",
+                              offset=data_start + spec["offset"], shape=tuple(spec["shape"]))
+            setattr(self, name, array)
+
+    def _to_float(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        decimals = self.header.get("decimals")
+        return np.round(values, decimals) if decimals is not None else values
+
+    def get(self, champ_id, patch_name, lane, rank):
+        # 1セル分の {winrate, pickrate, banrate}。データが無ければ None
+        c = self.champ_index[champ_id]
+        p = self.patch_index[patch_name]
+        l = self.lane_index[lane]
+        r = self.rank_index[rank]
+        if self.entry_seq[c, p, l, r] < 0:
+            return None
+        return dict(zip(METRICS, (float(v) for v in self._to_float(self.values[c, p, l, r]))))
+
+    def champion(self, champ_id):
+        # 1チャンピオン分の (patch, lane, rank, metric) ビュー（コピーしない）
+        return self.values[self.champ_index[champ_id]]
+
+    def to_stats_store(self):
+        store = StatsStore(self.champ_docs, self.patch_names, self.lanes, self.ranks)
+        store.values = self._to_float(self.values)
+        store.patch_seq = np.array(self.patch_seq)
+        store.entry_seq = np.array(self.entry_seq)
+        store.updatetimes = np.array(self.updatetimes, dtype=object).reshape(store.patch_seq.shape)
+        keys = np.array([[date_key(u) for u in row] for row in self.updatetimes], dtype=np.int64)
+        store.update_keys = np.where(store.patch_seq >= 0, keys.reshape(store.patch_seq.shape), -1)
+        return store
+
+
+def json_to_binary(champion_dir=CHAMPION_DIR, path=SNAPSHOT_BIN, dtype="float32"):
+    store = StatsStore.load(champion_dir)
+    write_snapshots(store, path, dtype)
+    print(f"{len(store.champ_ids)} 件のチャンピオンを {path} に変換しました")
+
+
+def binary_to_json(path=SNAPSHOT_BIN, champion_dir=CHAMPION_DIR):
+    store = SnapshotFile(path).to_stats_store()
+    store.save(champion_dir)
+    print(f"{len(store.champ_ids)} 件のチャンピオンを {champion_dir} に書き出しました")
+
+
+def export_all_champion_data(output, path=SNAPSHOT_BIN):
+    # all_champion_data.json と同じ形式（チャンピオンごとの最新パッチの全レーン・ランク）を output に書き出す
+    # 公開中の all_champion_data.json を上書きしないよう、書き出し先は毎回指定する
+    snapshots = SnapshotFile(path)
+    store = snapshots.to_stats_store()
+    _, latest_p, _ = store.latest_two()
+
+    all_champions_data = []
+    for c, champ_id in enumerate(store.champ_ids):
+        p = latest_p[c]
+        if store.patch_seq[c, p] < 0:
+            continue
+        latest = store.to_champion_json(champ_id)["patches"]
+        snapshot = next(s for s in latest if s["patch_name"] == store.patch_names[p])
+        all_champions_data.append({
+            "id": champ_id,
+            "name_ja": store.champ_docs[c].get("name_ja"),
+            "data": [dict({"updatetime": snapshot["updatetime"]}, **entry) for entry in snapshot["data"]],
+        })
+
+    save_json(output, all_champions_data)
+    print(f"{output} を {path} から書き出しました")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="champion_data の JSON とバイナリ形式の変換")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    to_bin = sub.add_parser("to-bin", help="champion_data/*.json → バイナリ")
+    to_bin.add_argument("--dtype", choices=["float32", "float64"], default="float32")
+    sub.add_parser("to-json", help="バイナリ → champion_data/*.json")
+    export = sub.add_parser("export", help="バイナリ → all_champion_data.json と同じ形式")
+    export.add_argument("--output", required=True, help="書き出すファイル（公開中の all_champion_data.json は championdata_scraper が作る）")
+
+    args = parser.parse_args()
+    if args.command == "to-bin":
+        json_to_binary(dtype=args.dtype)
+    elif args.command == "to-json":
+        binary_to_json()
+    else:
+        export_all_champion_data(args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+import os
+import argparse
+from datetime import datetime, timedelta
+from modeule import load_json, save_json, report_write_stats
+from patch_timeline import load_patch_timeline
+
+# チャンピオンごとの長期の履歴（champion_history/{id}.json）
+# champion_data/{id}.json は直近のパッチだけを残し、そこから削ったパッチをここに差分で保存する
+#   - 数パッチごとに全行を持つキーフレーム、それ以外は前のパッチから変わった (lane, rank) の行だけ
+#   - 行は [lane, rank, winrate, pickrate, banrate] の配列で持ち、空白なしの JSON で保存する（updatetime はパッチ側）
+# {
+#   "id": "Ahri", "name_ja": "アーリ", "version": 2,
+#   "patches": [
+#     {"patch_name": ..., "updatetime": ..., "key": [[lane, rank, win, pick, ban], ...]},
+#     {"patch_name": ..., "updatetime": ..., "set": [[...], ...], "del": [[lane, rank], ...]},
+#     ...
+#   ]
+# }
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # GitHub Actions対応
+DATA_DIR = os.path.join(BASE_DIR, '..', 'wrgg-frontend/public/data')
+
+CHAMPION_DIR = os.path.join(DATA_DIR, 'champion_data')
+HISTORY_DIR = os.path.join(BASE_DIR, '..', 'champion_history')  # フロントでは使わないので public の外に置く（公開・デプロイしない）
+PATCH_CONTENTS_JSON = os.path.join(DATA_DIR, 'patch_contents.json')
+
+HISTORY_VERSION = 2  # 1 は行の末尾に updatetime（常に null）を持っていた。読む時は末尾を無視する
+ROW_FIELDS = ["lane", "rank", "winrate", "pickrate", "banrate"]
+
+# champion_data/{id}.json に残す範囲（None は制限なし）
+RETENTION = {
+    "recent_patches": 5,    # 新しい方から何パッチ残すか
+    "recent_days": None,    # 最新のスナップショットから何日以内を残すか
+}
+
+# champion_history/{id}.json の保存方法（None は制限なし）
+ARCHIVE = {
+    "enabled": True,
+    "keyframe_interval": 10,  # 何パッチごとに全行を持つか
+    "max_patches": None,      # 最大何パッチ分残すか
+    "max_days": None,         # 最新から何日前まで残すか
+    "compact_after": 50,      # 新しい方からこのパッチ数より古いものは間引く
+    "compact_every": 2,       # 間引く範囲では何パッチに1つ残すか
+}
+
+
+def date_key(updatetime):
+    # updatetime が空・形式違いなら None（日数での絞り込みでは対象外にする）
+    try:
+        return datetime.strptime(updatetime, "%Y/%m/%d")
+    except (TypeError, ValueError):
+        return None
+
+
+def within_days(dates, days):
+    # dates（None は日付なし）のうち、一番新しい日付から days 日以内のものは True
+    known = [d for d in dates if d is not None]
+    if not known:
+        return [False] * len(dates)
+    oldest = max(known) - timedelta(days=days)
+    return [d is not None and d >= oldest for d in dates]
+
+
+def chronological(patches, timeline):
+    # 追加順ではなく updatetime → パッチの公開順 で並べたインデックス
+    return sorted(range(len(patches)), key=lambda i: (patches[i]["updatetime"], timeline.position(patches[i]["patch_name"]), i))
+
+
+def row_to_list(row):
+    return [row.get(field) for field in ROW_FIELDS]
+
+
+def list_to_row(values):
+    return dict(zip(ROW_FIELDS, values))
+
+
+def normalize_rows(rows):
+    # version 1 の行（末尾に updatetime）を今の長さにそろえる
+    return [r[:len(ROW_FIELDS)] for r in rows]
+
+
+def encode_patches(patches, keyframe_interval=ARCHIVE["keyframe_interval"]):
+    # 古い → 新しい順のスナップショットを キーフレーム + 差分 にする
+    entries = []
+    prev = None
+    since_key = 0
+    for snapshot in patches:
+        rows = [row_to_list(row) for row in snapshot["data"]]
+        entry = {"patch_name": snapshot["patch_name"], "updatetime": snapshot["updatetime"]}
+
+        if prev is not None and since_key < keyframe_interval - 1:
+            prev_map = {(r[0], r[1]): r for r in prev}
+            cur_keys = {(r[0], r[1]) for r in rows}
+            entry["set"] = [r for r in rows if prev_map.get((r[0], r[1])) != r]
+            entry["del"] = [list(key) for key in prev_map if key not in cur_keys]
+            # 差分から戻した行の並びが違う（並べ替え・重複など）時はキーフレームにする
+            if apply_delta(prev, entry) == rows:
+                if not entry["del"]:
+                    del entry["del"]
+                entries.append(entry)
+                prev = rows
+                since_key += 1
+                continue
+            entry.pop("set")
+            entry.pop("del")
+
+        entry["key"] = rows
+        entries.append(entry)
+        prev = rows
+        since_key = 0
+    return entries
+
+
+def apply_delta(prev_rows, entry):
+    # 前のパッチの行に差分を当てる。変わった行はその場で置き換え、新しい行は末尾に足す
+    deleted = {tuple(key) for key in entry.get("del", [])}
+    rows = [r for r in prev_rows if (r[0], r[1]) not in deleted]
+    index = {(r[0], r[1]): i for i, r in enumerate(rows)}
+    for r in normalize_rows(entry.get("set", [])):
+        i = index.get((r[0], r[1]))
+        if i is None:
+            index[(r[0], r[1])] = len(rows)
+            rows.append(r)
+        else:
+            rows[i] = r
+    return rows
+
+
+def decode_patches(entries):
+    # キーフレーム + 差分 から各パッチの全行を復元する（champion_data と同じ形式）
+    patches = []
+    rows = None
+    for entry in entries:
+        if "key" in entry:
+            rows = normalize_rows(entry["key"])
+        else:
+            rows = apply_delta(rows or [], entry)
+        patches.append({
+            "patch_name": entry["patch_name"],
+            "updatetime": entry["updatetime"],
+            "data": [list_to_row(r) for r in rows],
+        })
+    return patches
+
+
+def select_recent(patches, timeline, recent_patches=None, recent_days=None):
+    # 残すスナップショットのインデックス（元の並びのまま）
+    order = chronological(patches, timeline)
+    if recent_days is not None and order:
+        keep = within_days([date_key(patches[i]["updatetime"]) for i in order], recent_days)
+        order = [i for i, ok in zip(order, keep) if ok]
+    if recent_patches is not None:
+        order = order[-recent_patches:] if recent_patches > 0 else []
+    return sorted(order)
+
+
+def compact(patches, timeline, max_patches=None, max_days=None, compact_after=None, compact_every=1):
+    # 古い → 新しい順のスナップショットに 保存期間・間引き を適用する
+    if max_days is not None and patches:
+        keep = within_days([date_key(p["updatetime"]) for p in patches], max_days)
+        patches = [p for p, ok in zip(patches, keep) if ok]
+    if compact_after is not None and compact_every > 1 and len(patches) > compact_after:
+        old, recent = patches[:-compact_after], patches[-compact_after:]
+        # パッチの公開順の番号で間引く（毎回同じパッチが残るので、実行を重ねても減り続けない）
+        old = [p for p in old if timeline.position(p["patch_name"]) % compact_every == 0 or timeline.position(p["patch_name"]) < 0]
+        patches = old + recent
+    if max_patches is not None:
+        patches = patches[-max_patches:] if max_patches > 0 else []
+    return patches
+
+
+def history_path(champ_id, history_dir=HISTORY_DIR):
+    return os.path.join(history_dir, f"{champ_id}.json")
+
+
+def load_history(champ_id, history_dir=HISTORY_DIR):
+    # 履歴に入っているパッチのスナップショット（champion_data と同じ形式。古い → 新しい）
+    history = load_json(history_path(champ_id, history_dir))
+    if not history:
+        return []
+    return decode_patches(history.get("patches", []))
+
+
+def archive_champion(champ_data, timeline, history_dir=HISTORY_DIR, policy=ARCHIVE, snapshots=None):
+    # snapshots（省略時は champion_data の全パッチ）を履歴に取り込む。同じパッチは champion_data 側を正とする
+    # 履歴に同じ内容で入っているものばかりなら読み込むだけで書き込まない
+    champ_id = champ_data.get("id")
+    if not champ_id:
+        return False
+    if snapshots is None:
+        snapshots = champ_data.get("patches", [])
+
+    merged = {p["patch_name"]: p for p in load_history(champ_id, history_dir)}
+    if all(merged.get(snapshot["patch_name"]) == snapshot for snapshot in snapshots):
+        return False
+    for snapshot in snapshots:
+        merged[snapshot["patch_name"]] = snapshot
+
+    patches = list(merged.values())
+    patches = [patches[i] for i in chronological(patches, timeline)]
+    patches = compact(patches, timeline, policy["max_patches"], policy["max_days"], policy["compact_after"], policy["compact_every"])
+
+    os.makedirs(history_dir, exist_ok=True)
+    return save_json(history_path(champ_id, history_dir), {
+        "id": champ_id,
+        "name_ja": champ_data.get("name_ja"),
+        "version": HISTORY_VERSION,
+        "patches": encode_patches(patches, policy["keyframe_interval"]),
+    }, compact=True)
+
+
+def full_history(champ_id, timeline, history_dir=HISTORY_DIR, champion_dir=CHAMPION_DIR):
+    # 履歴 + champion_data に残っている直近のパッチ（古い → 新しい。同じパッチは champion_data 側を正とする）
+    merged = {p["patch_name"]: p for p in load_history(champ_id, history_dir)}
+    champ_data = load_json(os.path.join(champion_dir, f"{champ_id}.json")) or {}
+    for snapshot in champ_data.get("patches", []):
+        merged[snapshot["patch_name"]] = snapshot
+    patches = list(merged.values())
+    return [patches[i] for i in chronological(patches, timeline)]
+
+
+def trend(champ_id, lane, rank, metric="winrate", history_dir=HISTORY_DIR):
+    # 長期の推移: [(patch_name, updatetime, 値), ...]
+    result = []
+    for snapshot in full_history(champ_id, load_patch_timeline(PATCH_CONTENTS_JSON), history_dir):
+        for row in snapshot["data"]:
+            if row["lane"] == lane and row["rank"] == rank:
+                result.append((snapshot["patch_name"], snapshot["updatetime"], row[metric]))
+                break
+    return result
+
+
+def rebuild_history(champion_dir=CHAMPION_DIR, history_dir=HISTORY_DIR, policy=ARCHIVE):
+    # champion_data の全ファイルを履歴に取り込む
+    timeline = load_patch_timeline(PATCH_CONTENTS_JSON)
+    updated = 0
+    for filename in sorted(os.listdir(champion_dir)):
+        if filename.endswith(".json"):
+            updated += archive_champion(load_json(os.path.join(champion_dir, filename)), timeline, history_dir, policy)
+    print(f"{updated} 件のチャンピオンの履歴を更新しました")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="チャンピオンの長期履歴（差分形式）")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("rebuild", help="champion_data から履歴を取り込む")
+    show = sub.add_parser("trend", help="レーン・ランクの推移を表示する")
+    show.add_argument("champ_id")
+    show.add_argument("lane")
+    show.add_argument("rank")
+    show.add_argument("--metric", default="winrate", choices=["winrate", "pickrate", "banrate"])
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        rebuild_history()
+        report_write_stats()
+    else:
+        for patch_name, updatetime, value in trend(args.champ_id, args.lane, args.rank, args.metric):
+            print(f"{updatetime}  {value:8.4f}  {patch_name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import os
+import hashlib
+import tempfile
+import time
+import metrics
+from modeule import load_json, save_json
+from http_client import create_session, fetch_all, TIMEOUT, MAX_WORKERS, PER_HOST_LIMIT
+
+# チャンピオン画像のダウンロード
+#   - 複数スレッド + コネクションを使い回すセッションで並列に取得する
+#   - manifest に img_url と中身のハッシュを記録し、URL が変わった画像と、ファイルの中身が記録と違う画像だけ取り直す
+#   - レスポンスはメモリに溜めずにそのままファイルへ書き出す
+#   - Pillow があれば、フロントエンド用の WebP / サムネイルも作れる
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__)) #githubactionsでの実行を考慮して、絶対パスを取得
+DATA_DIR = os.path.join(BASE_DIR, '..', 'wrgg-frontend/public/data')
+
+IMAGE_DIR = os.path.join(DATA_DIR, 'champion_images')
+IMAGE_MANIFEST_JSON = os.path.join(BASE_DIR, '.image_manifest.json')  # チャンピオンID → {img_url, sha256, size}（公開しないので public の外）
+
+CHUNK_SIZE = 64 * 1024
+WEBP_QUALITY = 80
+THUMBNAIL_SIZE = (96, 96)
+
+
+def image_path(champ_id, save_dir=IMAGE_DIR):
+    return os.path.join(save_dir, f"{champ_id}.png")
+
+
+def plan_downloads(champions, manifest, save_dir=IMAGE_DIR):
+    # 取得が必要なチャンピオンを選ぶ。URL もファイルも変わっていなければリクエストしない
+    todo = []
+    for champ in champions:
+        champ_id = champ["id"]
+        img_url = champ.get("img_url")
+        if not img_url:
+            continue
+
+        path = image_path(champ_id, save_dir)
+        entry = manifest.get(champ_id)
+        if not os.path.exists(path):
+            todo.append(champ)
+        elif entry is None:
+            # manifest ができる前に保存した画像は、そのまま今の URL のものとして登録する
+            manifest[champ_id] = {"img_url": img_url, **file_info(path)}
+        elif entry.get("img_url") != img_url or entry.get("size") != os.path.getsize(path):
+            todo.append(champ)
+        elif entry.get("sha256") != file_info(path)["sha256"]:
+            # 大きさが同じでも中身が書き換わっていれば取り直す
+            todo.append(champ)
+    return todo
+
+
+def file_info(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            h.update(chunk)
+    return {"sha256": h.hexdigest(), "size": os.path.getsize(path)}
+
+
+def download_image(url, save_path, session=None):
+    # ストリーミングで一時ファイルに書き、最後に置き換える。(sha256, size) を返す
+    if session is None:
+        import requests
+        session = requests
+
+    save_dir = os.path.dirname(save_path) or "."
+    h = hashlib.sha256()
+    size = 0
+    start = time.perf_counter()
+    with session.get(url, stream=True, timeout=TIMEOUT) as response:
+        if response.status_code >= 400:
+            metrics.record_http(url, time.perf_counter() - start, 0, response.status_code)
+        response.raise_for_status()  # エラーがあれば例外発生
+        fd, tmp_path = tempfile.mkstemp(dir=save_dir, prefix=".tmp_", suffix=".png")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    f.write(chunk)
+                    h.update(chunk)
+                    size += len(chunk)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, save_path)
+            metrics.record_http(url, time.perf_counter() - start, size, response.status_code)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    return h.hexdigest(), size
+
+
+def make_variants(champ_id, save_dir=IMAGE_DIR, force=False):
+    # {id}.webp（同じ大きさ）と {id}_thumb.webp（サムネイル）を作る。Pillow がなければ何もしない
+    try:
+        from PIL import Image
+    except ImportError:
+        return False
+
+    src = image_path(champ_id, save_dir)
+    webp_path = os.path.join(save_dir, f"{champ_id}.webp")
+    thumb_path = os.path.join(save_dir, f"{champ_id}_thumb.webp")
+    if not force and os.path.exists(webp_path) and os.path.exists(thumb_path):
+        return False
+
+    with Image.open(src) as image:
+        image.save(webp_path, "WEBP", quality=WEBP_QUALITY, method=6)
+        thumb = image.copy()
+        thumb.thumbnail(THUMBNAIL_SIZE)
+        thumb.save(thumb_path, "WEBP", quality=WEBP_QUALITY, method=6)
+    return True
+
+
+def download_champion_images(champions, save_dir=IMAGE_DIR, manifest_path=IMAGE_MANIFEST_JSON,
+                             max_workers=MAX_WORKERS, per_host=PER_HOST_LIMIT, webp=False):
+    os.makedirs(save_dir, exist_ok=True)
+    manifest = load_json(manifest_path)
+    if not isinstance(manifest, dict):
+        manifest = {}
+
+    if webp:
+        try:
+            import PIL  # noqa: F401
+        except ImportError:
+            print("Pillow がインストールされていないため WebP は作りません")
+            webp = False
+
+    todo = plan_downloads(champions, manifest, save_dir)
+    session = create_session(pool_size=max_workers)
+
+    def fetch(champ):
+        champ_id = champ["id"]
+        try:
+            sha256, size = download_image(champ["img_url"], image_path(champ_id, save_dir), session)
+        except Exception as e:
+            print(f"{champ_id} の画像取得に失敗しました: {e}")
+            return None
+        print(f"{champ_id} の画像を保存しました。")
+        return {"img_url": champ["img_url"], "sha256": sha256, "size": size}
+
+    try:
+        results = fetch_all(todo, fetch, lambda champ: champ["img_url"], max_workers=max_workers, per_host=per_host)
+    finally:
+        session.close()
+
+    downloaded = 0
+    for champ, entry in zip(todo, results):
+        if entry is None:
+            continue
+        downloaded += 1
+        changed = manifest.get(champ["id"], {}).get("sha256") != entry["sha256"]
+        manifest[champ["id"]] = entry
+        if webp:
+            make_variants(champ["id"], save_dir, force=changed)
+
+    if webp:
+        # 取り直さなかった画像も、WebP がまだなければ作る
+        for champ_id in manifest:
+            if os.path.exists(image_path(champ_id, save_dir)):
+                make_variants(champ_id, save_dir)
+
+    save_json(manifest_path, dict(sorted(manifest.items())))
+    print(f"画像: {downloaded} 件取得 / {len(todo) - downloaded} 件失敗 / {len(manifest)} 件登録済み")
+    return {"success": True, "downloaded": downloaded, "failed": len(todo) - downloaded}
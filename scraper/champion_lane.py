@@ -1,5 +1,6 @@
 import os
-from modeule import load_json, save_json
+import metrics
+from modeule import load_json, get_champion_registry, report_write_stats
 
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__)) #githubactionsでの実行を考慮して、絶対パスを取得
@@ -8,13 +9,16 @@ DATA_DIR = os.path.join(BASE_DIR, '..', 'wrgg-frontend/public/data')
 CHAMPIONS_JSON = os.path.join(DATA_DIR, 'champions.json') # チャンピオン一覧のJSON
 CHAMPION_DIR = os.path.join(DATA_DIR,'champion_data')    # チャンピオン個別のディレクト
 
-def champion_lane():
-    champions = load_json(CHAMPIONS_JSON)
+@metrics.timed()
+def champion_lane(load=load_json, save=True):
+    # load はチャンピオンファイルの読み込み関数（パイプラインでは読み込み済みの中身を返す）
+    # save=False なら champions.json は書き戻さない（呼び出し側で最後にまとめて save() する）
+    champions = get_champion_registry(CHAMPIONS_JSON)
 
     for champ in champions:
         champ_id = champ.get("id")
         champ_file = os.path.join(CHAMPION_DIR, f"{champ_id}.json")
-        champ_json = load_json(champ_file)
+        champ_json = load(champ_file)
 
         lanes = set()
         for patch in champ_json.get("patches", []):
@@ -25,39 +29,44 @@ def champion_lane():
 
         # lanes が空でなければ追加
         if lanes:
-            champ["lanes"] = sorted(list(lanes))  # ソートして配列にする
+            champions.update(champ, lanes=sorted(list(lanes)))  # ソートして配列にする
 
-    # champions.json を上書き
-    save_json(CHAMPIONS_JSON, champions)
+    # champions.json を上書き（変更があった時だけ）
+    if save:
+        champions.save()
     print("champions.json に lanes を追加しました")
 
 
-def add_manual_lanes_bulk():
+def add_manual_lanes_bulk(save=True):
     # 使い方例
     lanes_dict = {
         "Nilah": ["ADC"]
     }
-    champions = load_json(CHAMPIONS_JSON)
+    champions = get_champion_registry(CHAMPIONS_JSON)
 
     for champion_id, lanes in lanes_dict.items():
         # 対象チャンピオンを探す
-        target = next((c for c in champions if c.get("id") == champion_id), None)
+        target = champions.get(champion_id)
         if not target:
             print(f"{champion_id} が champions.json に見つかりません")
             continue
 
         # lanes を追加
-        target["lanes"] = sorted(list(set(lanes)))
+        champions.update(target, lanes=sorted(list(set(lanes))))
         print(f"{champion_id} に lanes を追加しました: {target['lanes']}")
 
-    # champions.json を上書き
-    save_json(CHAMPIONS_JSON, champions)
+    # champions.json を上書き（変更があった時だけ）
+    if save:
+        champions.save()
     print("複数チャンピオンの lanes 追加が完了しました")
 
 
 def main():
-    champion_lane()
-    add_manual_lanes_bulk()
+    champion_lane(save=False)
+    add_manual_lanes_bulk(save=False)
+    # champions.json は変更があった時だけ最後に1回書き戻す
+    get_champion_registry(CHAMPIONS_JSON).save()
+    report_write_stats()
 
 if __name__ =="__main__":
     main()
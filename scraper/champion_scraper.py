@@ -1,11 +1,9 @@
-import requests
-from bs4 import BeautifulSoup
 import os
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-import time
-import chromedriver_autoinstaller
-from modeule import load_json, save_json
+import argparse
+import champion_images
+import metrics
+from modeule import load_json, save_json, get_champion_registry, report_write_stats
+from http_cache import cached_get, get_http_cache
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__)) #githubactionsでの実行を考慮して、絶対パスを取得
 DATA_DIR = os.path.join(BASE_DIR, '..', 'wrgg-frontend/public/data')
@@ -14,29 +12,92 @@ CHAMPIONS_JSON = os.path.join(DATA_DIR, 'champions.json')# チャンピオンの
 ID_MAP = os.path.join(DATA_DIR, "id_map.json") # 例外のチャンピオンに名前付け
 WR_EXTRA = os.path.join(DATA_DIR, "wr_exclusive.json") #WR限定チャンピオン
 
-# チャンピオン名の取得と保存
-def fetch_champion_names():
+DDRAGON_DATA_TTL = 7 * 24 * 60 * 60  # バージョン付きの ddragon データは変わらないので1週間キャッシュ
+DDRAGON_VERSIONS_URL = "https://ddragon.leagueoflegends.com/api/versions.json"
+DDRAGON_CHAMPION_URL = "https://ddragon.leagueoflegends.com/cdn/{version}/data/zh_CN/champion.json"
+
+CHAMPIONS_URL = "https://wildrift.leagueoflegends.com/ja-jp/champions/"
+CARD_SELECTOR = 'a[href^="/ja-jp/champions/"][href$="/"]'  # チャンピオン1人分のカード
+PAGE_TIMEOUT = 30      # カードが揃うまで待つ最大秒数
+POLL_INTERVAL = 0.5    # カードの数を確認する間隔（秒）
+
+_browser = None  # 使い回すブラウザ（1プロセスで1つ）
+
+
+def get_browser():
+    # headless Chrome を1回だけ起動して使い回す。画像・フォントは読み込まない
+    global _browser
+    if _browser is not None:
+        return _browser
+
+    # selenium などは重いので、ブラウザを使う時だけ読み込む
+    import atexit
+    import chromedriver_autoinstaller
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
     options = Options()
     options.add_argument("--headless")
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--blink-settings=imagesEnabled=false")
 
-    prefs = {"profile.managed_default_content_settings.images": 1}
+    # img の src は DOM に残るので、画像自体はダウンロードしなくてよい
+    prefs = {"profile.managed_default_content_settings.images": 2}
     options.add_experimental_option("prefs", prefs)
+    options.page_load_strategy = "eager"  # DOMContentLoaded で戻り、あとはカードの表示を待つ
 
     chromedriver_autoinstaller.install()
 
-    driver = webdriver.Chrome(options=options)
+    _browser = webdriver.Chrome(options=options)
+    try:
+        _browser.execute_cdp_cmd("Network.enable", {})
+        _browser.execute_cdp_cmd("Network.setBlockedURLs", {"urls": ["*.woff", "*.woff2", "*.ttf", "*.otf"]})
+    except Exception as e:
+        print(f"フォントのブロックに失敗しました（続行します）: {e}")
+    atexit.register(close_browser)
+    return _browser
+
+
+def close_browser():
+    global _browser
+    if _browser is not None:
+        _browser.quit()
+        _browser = None
+
+
+def wait_for_cards(driver, timeout=PAGE_TIMEOUT, poll=POLL_INTERVAL):
+    # カードが表示され、数が増えなくなるまで待つ（固定の sleep の代わり）
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
 
-    url = "https://wildrift.leagueoflegends.com/ja-jp/champions/"
+    counts = []
+
+    def cards_ready(d):
+        counts.append(len(d.find_elements(By.CSS_SELECTOR, CARD_SELECTOR)))
+        return counts[-1] > 0 and len(counts) >= 2 and counts[-1] == counts[-2]
+
+    WebDriverWait(driver, timeout, poll_frequency=poll).until(cards_ready)
+    return counts[-1]
+
+
+def fetch_champion_page_browser(url=CHAMPIONS_URL):
+    # JavaScript で描画された後の HTML をブラウザで取得する
+    driver = get_browser()
     driver.get(url)
-    time.sleep(10)  # ページが完全に読み込まれるまで待機
-    soup = BeautifulSoup(driver.page_source, "html.parser")
-    driver.quit()
+    count = wait_for_cards(driver)
+    print(f"ブラウザでチャンピオンカードを {count} 件確認しました")
+    return driver.page_source
+
+
+def parse_champion_cards(html):
+    # チャンピオン一覧ページの HTML からカードを読み取る
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
 
     #スクレイピング
     # elements = soup.select('div[data-testid="character-card"]')
-    elements = soup.select('a[href^="/ja-jp/champions/"][href$="/"]')
+    elements = soup.select(CARD_SELECTOR)
     champions = []
     id_map = load_json(ID_MAP)# ウーコン、ヌヌ＆ウィルンプの名前を例外的に置き換え
 
@@ -60,31 +121,116 @@ def fetch_champion_names():
 
     return champions
 
+
+def parse_embedded_champions(html):
+    # サーバーが埋め込んだ JSON（Next.js の __NEXT_DATA__）からカードと同じ情報を探す
+    import re
+    import json
+
+    match = re.search(r'<script[^>]*id="__NEXT_DATA__"[^>]*>(.*?)</script>', html, re.S)
+    if not match:
+        return []
+    try:
+        data = json.loads(match.group(1))
+    except ValueError:
+        return []
+
+    id_map = load_json(ID_MAP)
+    href_pattern = re.compile(r"^/ja-jp/champions/([^/]+)/$")
+    champions = []
+    seen = set()
+
+    def strings(node):
+        if isinstance(node, dict):
+            for value in node.values():
+                yield from strings(value)
+        elif isinstance(node, list):
+            for value in node:
+                yield from strings(value)
+        elif isinstance(node, str):
+            yield node
+
+    def walk(node):
+        if isinstance(node, list):
+            for value in node:
+                walk(value)
+            return
+        if not isinstance(node, dict):
+            return
+        title = node.get("title")
+        if isinstance(title, str) and title.strip():
+            # カード1枚分: タイトル + チャンピオンページへのリンク + 画像の URL
+            values = list(strings({k: v for k, v in node.items() if k != "title"}))
+            href = next((v for v in values if href_pattern.match(v)), None)
+            img_url = next((v for v in values if v.startswith("http") and re.search(r"\.(png|jpe?g|webp)(\?|$)", v)), None)
+            if href and img_url:
+                raw_id = href_pattern.match(href).group(1)
+                if raw_id not in seen:
+                    seen.add(raw_id)
+                    champions.append({
+                        "id": id_map.get(raw_id, raw_id.replace("-", "").title()),
+                        "name_ja": title.strip(),
+                        "img_url": img_url
+                    })
+                return
+        for value in node.values():
+            walk(value)
+
+    walk(data)
+    return champions
+
+
+def fetch_champion_names_http(url=CHAMPIONS_URL):
+    # ブラウザを使わずに取得する。HTML にカードか埋め込み JSON があればそれを使う
+    response = cached_get(url)
+    response.raise_for_status()
+    html = response.content.decode("utf-8", errors="replace")  # charset が付いていないと latin-1 扱いになるため
+    return parse_champion_cards(html) or parse_embedded_champions(html)
+
+
+# チャンピオン名の取得と保存
+def fetch_champion_names(url=CHAMPIONS_URL, use_browser=True):
+    # まず普通の HTTP で取得し、既存の件数に足りなければブラウザで描画して取得する
+    expected = len(get_champion_registry(CHAMPIONS_JSON))
+    try:
+        champions = fetch_champion_names_http(url)
+    except Exception as e:
+        print(f"HTTP でのチャンピオン一覧の取得に失敗しました: {e}")
+        champions = []
+
+    if champions and len(champions) >= expected:
+        print(f"HTTP でチャンピオン {len(champions)} 件を取得しました")
+        return champions
+    if not use_browser:
+        return champions
+
+    return parse_champion_cards(fetch_champion_page_browser(url))
+
 def katakana_to_hiragana(text):
     return ''.join(
         chr(ord(char) - 0x60) if 'ァ' <= char <= 'ヶ' else char
         for char in text
     )
 
-def update_champion_data():
+@metrics.timed()
+def update_champion_data(save=True):
+    # save=False なら champions.json は書き戻さない（main() の最後にまとめて save() する）
     try:
         champions = fetch_champion_names()  # [{"id":..., "name_ja":...}, ...]
 
         # 既存JSONの件数をチェックしてスキップ
-        try:
-            existing = load_json(CHAMPIONS_JSON)
-            if len(existing) == len(champions):
-                print("既存JSONの件数と一致。更新をスキップします。")
-                return {"success": True, "skipped": True}
-        except FileNotFoundError:
-            # ファイルがなければ無視して進む
-            pass
+        registry = get_champion_registry(CHAMPIONS_JSON)
+        if len(registry) == len(champions):
+            print("既存JSONの件数と一致。更新をスキップします。")
+            return {"success": True, "skipped": True}
 
         # ひらがな変換を追加
         for champ in champions:
             champ['kana'] = katakana_to_hiragana(champ['name_ja'])
         
-        save_json(CHAMPIONS_JSON, champions)
+        registry.replace_all(champions)
+        if save:
+            registry.save()
         print(f"チャンピオン更新があったので修正しました")
         
         return {"success": True, "skipped": False}
@@ -92,47 +238,58 @@ def update_champion_data():
         print(f"エラーが発生しました: {e}")
         return {"success": False, "error": str(e)}
 
-def update_champion_CN():
+async def fetch_ddragon(fetcher):
+    # versions.json → 最新バージョンの champion.json（async_fetch の中で他の取得と同時に進める）
+    versions = await fetcher.get(DDRAGON_VERSIONS_URL)
+    champion = await fetcher.get(DDRAGON_CHAMPION_URL.format(version=versions.json()[0]), ttl=DDRAGON_DATA_TTL)
+    return [versions, champion]
+
+
+def upstream_jobs():
+    # async_fetch.prefetch で同時に取得するもの
+    return {"ddragon": fetch_ddragon}
+
+
+@metrics.timed()
+def update_champion_CN(save=True):
+    # save=False なら champions.json は書き戻さない（main() の最後にまとめて save() する）
     try:
-        champions = load_json(CHAMPIONS_JSON)
+        champions = get_champion_registry(CHAMPIONS_JSON)
 
         # --- 最新パッチのチャンピオン情報を取得 ---
-        versions_url = "https://ddragon.leagueoflegends.com/api/versions.json"
-        latest_patch = requests.get(versions_url).json()[0]
+        latest_patch = cached_get(DDRAGON_VERSIONS_URL).json()[0]
 
-        champion_url = f"https://ddragon.leagueoflegends.com/cdn/{latest_patch}/data/zh_CN/champion.json"
-        champions_data = requests.get(champion_url).json()["data"]
+        champion_url = DDRAGON_CHAMPION_URL.format(version=latest_patch)
+        champions_data = cached_get(champion_url, ttl=DDRAGON_DATA_TTL).json()["data"]
 
-        # --- id -> 中国語名 の辞書作成 ---
-        id_to_cn = {champ_id.lower(): info["title"] for champ_id, info in champions_data.items()}
-        
-        # WR限定例外処理
+        # WR限定例外処理（ddragon の後に適用して上書きする）
         wr_extra = load_json(WR_EXTRA)
         extra_data = wr_extra["data"]
-        extra_dict = {champ_id.lower(): info["title"] for champ_id, info in extra_data.items()}
-        id_to_cn.update(extra_dict)
 
-        # --- JSONに name_cn を追加 ---
-        for champ in champions:
-            champ_id = champ["id"].lower()
-            if champ_id in id_to_cn:
-                champ["name_cn"] = id_to_cn[champ_id]
+        # --- JSONに name_cn を追加（小文字idで直接引く） ---
+        for source in (champions_data, extra_data):
+            for champ_id, info in source.items():
+                champ = champions.get_lower(champ_id)
+                if champ:
+                    champions.update(champ, name_cn=info["title"])
+
+        # --- 保存（変更があった時だけ） ---
+        if save:
+            champions.save()
 
-        # --- 上書き保存 ---
-        save_json(CHAMPIONS_JSON, champions)
-        
         return {"success": True}
     except Exception as e:
         print(f"エラーが発生しました: {e}")
         return {"success": False, "error": str(e)}
 
+@metrics.timed()
 def create_champion_jsons():
     # 保存フォルダを作成
     champion_data_dir = os.path.join(DATA_DIR, "champion_data")
     os.makedirs(champion_data_dir, exist_ok=True)
 
     # 既存のチャンピオンJSON読み込み
-    champions = load_json(CHAMPIONS_JSON)
+    champions = get_champion_registry(CHAMPIONS_JSON)
 
     for champ in champions:
         champ_id = champ["id"]
@@ -148,38 +305,27 @@ def create_champion_jsons():
         if not os.path.exists(champ_file):
             save_json(champ_file, initial_data)
 
-def download_image(url, save_path):
-    response = requests.get(url)
-    response.raise_for_status()  # エラーがあれば例外発生
-    with open(save_path, 'wb') as f:
-        f.write(response.content)
-
-def download_champion_images():
-    champions = load_json(CHAMPIONS_JSON)
-    save_dir = os.path.join(DATA_DIR, 'champion_images')
-    os.makedirs(save_dir, exist_ok=True)
-
-    for champ in champions:
-        champ_id = champ["id"]
-        img_url = champ["img_url"]
-        save_path = os.path.join(save_dir, f"{champ_id}.png")
-
-        if os.path.exists(save_path):
-            continue
-
-        try:
-            download_image(img_url, save_path)
-            print(f"{champ_id} の画像を保存しました。")
-        except Exception as e:
-            print(f"{champ_id} の画像取得に失敗しました: {e}")
-
+@metrics.timed()
+def download_champion_images(webp=False):
+    # 並列・差分ダウンロードは champion_images にまとめてある
+    champions = get_champion_registry(CHAMPIONS_JSON)
+    return champion_images.download_champion_images(list(champions), webp=webp)
 
 
 def main():
-    update_champion_data()
-    download_champion_images()
-    update_champion_CN()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--webp", action="store_true", help="画像の WebP / サムネイルも作る（Pillow が必要）")
+    args = parser.parse_args()
+
+    update_champion_data(save=False)
+    download_champion_images(webp=args.webp)
+    update_champion_CN(save=False)
     create_champion_jsons()
+    close_browser()
+    # champions.json は変更があった時だけ最後に1回書き戻す
+    get_champion_registry(CHAMPIONS_JSON).save()
+    get_http_cache().report()
+    report_write_stats()
 
 if __name__ =="__main__":
     main()
\ No newline at end of file
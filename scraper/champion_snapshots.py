@@ -0,0 +1,66 @@
+class ChampionSnapshots:
+    # champion_data/<id>.json の中身に patch_name と (lane, rank) のインデックスを付けて扱う
+    # ファイルの形式（patches[].data[] のリスト）はそのまま、検索だけを O(1) にする
+
+    def __init__(self, champ_data):
+        self.champ_data = champ_data
+        self.snapshots = {}  # patch_name → snapshot
+        self.entries = {}    # patch_name → {(lane, rank): entry}
+
+        for snapshot in champ_data["patches"]:
+            # 同じ patch_name が複数ある場合は先頭を使う（従来の snapshots[0] と同じ）
+            if snapshot["patch_name"] in self.snapshots:
+                continue
+            self.snapshots[snapshot["patch_name"]] = snapshot
+            entries = {}
+            for entry in snapshot["data"]:
+                entries.setdefault((entry["lane"], entry["rank"]), entry)
+            self.entries[snapshot["patch_name"]] = entries
+
+    def get(self, patch_name, lane, rank):
+        return self.entries.get(patch_name, {}).get((lane, rank))
+
+    def upsert(self, patch_name, row):
+        # 1行分をスナップショットに反映する。変更があれば True を返す
+        changed = False
+        snapshot = self.snapshots.get(patch_name)
+        if snapshot is None:
+            snapshot = {
+                "patch_name": patch_name,
+                "updatetime": row["updatetime"],
+                "data": []
+            }
+            self.champ_data["patches"].append(snapshot)
+            self.snapshots[patch_name] = snapshot
+            self.entries[patch_name] = {}
+            changed = True
+
+        entries = self.entries[patch_name]
+        key = (row["lane"], row["rank"])
+        entry = entries.get(key)
+
+        # もし既存が無ければ新規追加
+        if entry is None:
+            entry = {
+                "lane": row["lane"],
+                "rank": row["rank"],
+                "winrate": row["winrate"],
+                "pickrate": row["pickrate"],
+                "banrate": row["banrate"],
+            }
+            snapshot["data"].append(entry)
+            entries[key] = entry
+            return True
+
+        # すでに全く同じ値なら、更新しない
+        if (entry["winrate"] == row["winrate"] and
+            entry["pickrate"] == row["pickrate"] and
+            entry["banrate"] == row["banrate"]):
+            return changed
+
+        # 🔥 値が違った時だけ更新
+        entry["winrate"] = row["winrate"]
+        entry["pickrate"] = row["pickrate"]
+        entry["banrate"] = row["banrate"]
+        snapshot["updatetime"] = row["updatetime"]
+        return True
@@ -1,9 +1,15 @@
-import requests
-import json
 import os
+import time
+import argparse
+import metrics
 from datetime import datetime
 from delete_champion_data import delete_champion_data
-from modeule import load_json, save_json
+from modeule import load_json, save_json, get_champion_registry, report_write_stats
+from http_cache import cached_get, get_http_cache
+from patch_timeline import load_patch_timeline
+from champion_snapshots import ChampionSnapshots
+from http_client import create_session, TIMEOUT
+from rank_stream import iter_rank_rows, iter_rank_rows_from_data
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__)) #githubactionsでの実行を考慮して、絶対パスを取得
 DATA_DIR = os.path.join(BASE_DIR, '..', 'wrgg-frontend/public/data')
@@ -12,29 +18,55 @@ CHAMPIONS_JSON = os.path.join(DATA_DIR, 'champions.json')# チャンピオンの
 ALL_CHAMPIONS_DATA_JSON = os.path.join(DATA_DIR, 'all_champion_data.json')# チャンピオンの名前を保存するJSONファイル
 PATCH_CONTENTS_JSON = os.path.join(DATA_DIR, 'patch_contents.json')# 最新のパッチ名を取得する
 
-def last_patch_name():
-    patch_data = load_json(PATCH_CONTENTS_JSON)
-
-    # update_date があるパッチだけ抽出
-    patch_dates = [
-        (name, info["update_date"])
-        for name, info in patch_data.items()
-        if info.get("update_date")
-    ]
-
-    if not patch_dates:
-        return None  # パッチがない場合は None を返す
+LANE_MAP = {1: "MID", 2: "TOP", 3: "ADC", 4: "SUP", 5: "JG"}
+RANK_MAP = {0: "Emerald", 1: "Diamond", 2: "Master", 3: "Challenger", 4: "Legendary_rank"}
 
-    # 日付でソートして最新パッチを取得
-    patch_dates.sort(key=lambda x: datetime.strptime(x[1], "%Y/%m/%d"))
-    latest_patch_name = patch_dates[-1][0]
-    return latest_patch_name
+URL_HERO_LIST = "https://game.gtimg.cn/images/lgamem/act/lrlib/js/heroList/hero_list.js"
+URL_STATS = "https://mlol.qt.qq.com/go/lgame_battle_info/hero_rank_list_v2"
+STREAM_CHUNK_SIZE = 64 * 1024
 
-def champion_data_scrape():
-    champions = load_json(CHAMPIONS_JSON)
-
-    url_hero_list = "https://game.gtimg.cn/images/lgamem/act/lrlib/js/heroList/hero_list.js"
-    res = requests.get(url_hero_list)
+def last_patch_name():
+    # patch_contents.json の日付インデックスはプロセス内で1回だけ作る
+    return load_patch_timeline(PATCH_CONTENTS_JSON).latest()
+
+def upstream_jobs(stream=False):
+    # async_fetch.prefetch で同時に取得するもの（stream の時は hero_rank_list_v2 を少しずつ読むので含めない）
+    jobs = {"hero_list": lambda fetcher: fetcher.get(URL_HERO_LIST)}
+    if not stream:
+        jobs["hero_rank_list"] = lambda fetcher: fetcher.get(URL_STATS)
+    return jobs
+
+
+def fetch_rank_rows(stream=False):
+    # hero_rank_list_v2 を (rank, lane, hero) の行として1行ずつ返す
+    # stream=True ならレスポンスを少しずつパースし、全体を dict にしない（HTTPキャッシュは使わない）
+    if stream:
+        session = create_session()
+        try:
+            start = time.perf_counter()
+            with session.get(URL_STATS, stream=True, timeout=TIMEOUT) as response:
+                response.raise_for_status()
+                received = [0]
+
+                def chunks():
+                    for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                        received[0] += len(chunk)
+                        yield chunk
+
+                yield from iter_rank_rows(chunks())
+            metrics.record_http(URL_STATS, time.perf_counter() - start, received[0], response.status_code)
+        finally:
+            session.close()
+    else:
+        data = cached_get(URL_STATS).json()["data"]
+        yield from iter_rank_rows_from_data(data)
+
+
+@metrics.timed()
+def champion_data_scrape(stream=False):
+    champions = get_champion_registry(CHAMPIONS_JSON)
+
+    res = cached_get(URL_HERO_LIST)
     hero_list = res.json()["heroList"]
     name_to_heroId = {info["name"]: hero_id for hero_id, info in hero_list.items()}
 
@@ -45,124 +77,123 @@ def champion_data_scrape():
         if hero_id:
             hero_id_map[hero_id] = champ.get("id")
 
-    url_stats = "https://mlol.qt.qq.com/go/lgame_battle_info/hero_rank_list_v2"
-    response = requests.get(url_stats)
-    data = response.json()["data"]
-
     save_dir = os.path.join(DATA_DIR, "champion_data")
     os.makedirs(save_dir, exist_ok=True)
-    lane_map = {1: "MID", 2: "TOP", 3: "ADC", 4: "SUP", 5: "JG"}
-    rank_map = {0: "Emerald", 1: "Diamond", 2: "Master", 3: "Challenger", 4: "Legendary_rank"}
+    patch_name = last_patch_name()
 
     # 最新データのみ保持する辞書
     all_champions_data = {}
-
-    for rank_num_str, lanes in data.items():
-        rank_num = int(rank_num_str)
-        for lane_num_str, champs in lanes.items():
-            lane_num = int(lane_num_str)
-            for champ in champs:
-                hero_id = champ["hero_id"]
-                update_time = champ["dtstatdate"]
-                update_time = datetime.strptime(update_time, "%Y%m%d").strftime("%Y/%m/%d")
-                winrate = float(champ.get("win_rate", 0)) * 100
-                pickrate = float(champ.get("appear_rate", 0)) * 100
-                banrate = float(champ.get("forbid_rate", 0)) * 100
-
-                champ_id = hero_id_map.get(hero_id, hero_id)
-                champ_file = os.path.join(save_dir, f"{champ_id}.json")
-                patch_name = last_patch_name()
-                # 個別ファイルは従来通り更新（過去データも保持）
-                if os.path.exists(champ_file):
-                    champ_data_existing = load_json(champ_file)
-
-                    if "patches" not in champ_data_existing or not isinstance(champ_data_existing["patches"], list):
-                        champ_data_existing["patches"] = []
-
-                else:
-                    champ_data_existing = {
-                        "id": champ_id,
-                        "name_ja": next((c["name_ja"] for c in champions if c["id"] == champ_id), None),
-                        "patches": []
-                    }
-                # updatetime ごとのスナップショットを取得、なければ新規作成
-                snapshots = [s for s in champ_data_existing["patches"] if s["patch_name"] == patch_name]
-                if snapshots:
-                    snapshot = snapshots[0]
-                else:
-                    snapshot = {
-                        "patch_name": patch_name,
-                        "updatetime": update_time,
-                        "data": []
-                    }
-                    champ_data_existing["patches"].append(snapshot)
-
-                # lane / rank の正規化値
-                lane_value = lane_map.get(lane_num, lane_num)
-                rank_value = rank_map.get(rank_num, rank_num)
-
-                updated = False
-                for entry in snapshot["data"]:
-                    if entry["lane"] == lane_value and entry["rank"] == rank_value:
-
-                        # すでに全く同じ値なら、更新しない
-                        if (entry["winrate"] == winrate and
-                            entry["pickrate"] == pickrate and
-                            entry["banrate"] == banrate):
-                            updated = True  # "存在している" という意味で True にする
-                            break
-
-                        # 🔥 値が違った時だけ更新
-                        entry["winrate"] = winrate
-                        entry["pickrate"] = pickrate
-                        entry["banrate"] = banrate
-                        snapshot["updatetime"] = update_time
-                        updated = True
-                        break
-
-                # もし既存が無ければ新規追加
-                if not updated:
-                    snapshot["data"].append({
-                        "lane": lane_value,
-                        "rank": rank_value,
-                        "winrate": winrate,
-                        "pickrate": pickrate,
-                        "banrate": banrate,
-                    })
-                # 個別ファイル保存
-                save_json(champ_file, champ_data_existing)
-
-                # 全体データには rank/lane を問わず最新データを追加
-                if champ_id not in all_champions_data:
-                    all_champions_data[champ_id] = {
-                        "id": champ_id,
-                        "name_ja": next((c["name_ja"] for c in champions if c["id"] == champ_id), None),
-                        "data": []
-                    }
-
-                # 重複チェック（updatetime + rank + lane が同じなら追加しない）
-                if not any(
-                    d["updatetime"] == update_time and d["rank"] == rank_map.get(rank_num) and d["lane"] == lane_map.get(lane_num)
-                    for d in all_champions_data[champ_id]["data"]
-                ):
-                    all_champions_data[champ_id]["data"].append({
-                        "updatetime": update_time,
-                        "lane": lane_map.get(lane_num, lane_num),
-                        "rank": rank_map.get(rank_num, rank_num),
-                        "winrate": winrate,
-                        "pickrate": pickrate,
-                        "banrate": banrate
-                    })
+    # チャンピオンごとの読み込み済みファイル（ファイルの読み書きはチャンピオン単位で1回）
+    states = {}
+    update_time = None
+
+    # 行が届いた順にそのままメモリ上のスナップショットへ反映する
+    for rank_num_str, lane_num_str, champ in fetch_rank_rows(stream):
+        row = parse_rank_row(int(rank_num_str), int(lane_num_str), champ)
+        metrics.count("rank_rows")
+        champ_id = hero_id_map.get(champ["hero_id"], champ["hero_id"])
+        update_time = row["updatetime"]
+
+        state = states.get(champ_id)
+        if state is None:
+            name_ja = champions.name_ja(champ_id)
+            champ_file = os.path.join(save_dir, f"{champ_id}.json")
+
+            # 個別ファイルは従来通り更新（過去データも保持）
+            champ_data_existing, changed = load_champion_file(champ_file, champ_id, name_ja)
+            state = states[champ_id] = {
+                "file": champ_file,
+                "data": champ_data_existing,
+                "snapshots": ChampionSnapshots(champ_data_existing),
+                "changed": changed,
+                "seen_keys": set(),
+            }
+
+            # 全体データには rank/lane を問わず最新データを追加
+            all_champions_data[champ_id] = {
+                "id": champ_id,
+                "name_ja": name_ja,
+                "data": []
+            }
+
+        if state["snapshots"].upsert(patch_name, row):
+            state["changed"] = True
+
+        # 重複チェック（updatetime + rank + lane が同じなら追加しない）
+        key = (row["updatetime"], row["rank"], row["lane"])
+        if key not in state["seen_keys"]:
+            state["seen_keys"].add(key)
+            all_champions_data[champ_id]["data"].append(dict(row))
+
+    # 変更があったファイルだけ最後に1回だけ保存
+    for state in states.values():
+        if state["changed"]:
+            save_json(state["file"], state["data"])
 
     # 全チャンピオンの最新データをまとめて保存
     save_json(ALL_CHAMPIONS_DATA_JSON, list(all_champions_data.values()))
 
     print(f"データを{update_time}の更新をしました。")
 
+    # 読み込んだチャンピオンファイル（パス → 中身）。パイプラインで後続の処理が使い回す
+    return {state["file"]: state["data"] for state in states.values()}
+
+
+def group_rank_rows(data, hero_id_map):
+    # hero_rank_list_v2 の rank × lane × champion の行をチャンピオンごとにまとめる（SQLite への一括反映用）
+    rows_by_champ = {}
+
+    for rank_num_str, lane_num_str, champ in iter_rank_rows_from_data(data):
+        hero_id = champ["hero_id"]
+        champ_id = hero_id_map.get(hero_id, hero_id)
+        rows_by_champ.setdefault(champ_id, []).append(parse_rank_row(int(rank_num_str), int(lane_num_str), champ))
+
+    return rows_by_champ
+
+
+def parse_rank_row(rank_num, lane_num, champ):
+    update_time = datetime.strptime(champ["dtstatdate"], "%Y%m%d").strftime("%Y/%m/%d")
+
+    # lane / rank の正規化値
+    return {
+        "updatetime": update_time,
+        "lane": LANE_MAP.get(lane_num, lane_num),
+        "rank": RANK_MAP.get(rank_num, rank_num),
+        "winrate": float(champ.get("win_rate", 0)) * 100,
+        "pickrate": float(champ.get("appear_rate", 0)) * 100,
+        "banrate": float(champ.get("forbid_rate", 0)) * 100,
+    }
+
+
+def load_champion_file(champ_file, champ_id, name_ja):
+    # 既存ファイルを読み込む。新規作成の場合は changed=True を返す
+    if os.path.exists(champ_file):
+        champ_data_existing = load_json(champ_file)
+
+        if "patches" not in champ_data_existing or not isinstance(champ_data_existing["patches"], list):
+            champ_data_existing["patches"] = []
+
+        return champ_data_existing, False
+
+    champ_data_existing = {
+        "id": champ_id,
+        "name_ja": name_ja,
+        "patches": []
+    }
+    return champ_data_existing, True
+
 
 def main():
-    champion_data_scrape()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stream", action="store_true", help="hero_rank_list_v2 を少しずつパースして取り込む")
+    args = parser.parse_args()
+
+    from async_fetch import prefetch  # 起動を速くするため、使う時に読み込む
+    prefetch(upstream_jobs(args.stream))
+    champion_data_scrape(stream=args.stream)
     delete_champion_data()
+    get_http_cache().report()
+    report_write_stats()
 
 
 if __name__ =="__main__":
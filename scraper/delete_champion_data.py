@@ -1,13 +1,22 @@
 import os
+import metrics
 from modeule import load_json, save_json
+from patch_timeline import load_patch_timeline
+from champion_history import archive_champion, select_recent, RETENTION, ARCHIVE
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # GitHub Actions対応
 DATA_DIR = os.path.join(BASE_DIR, '..', 'wrgg-frontend/public/data')
 
 CHAMPION_DIR = os.path.join(DATA_DIR, 'champion_data')
+PATCH_CONTENTS_JSON = os.path.join(DATA_DIR, 'patch_contents.json')
 
 
-def delete_champion_data():
+@metrics.timed()
+def delete_champion_data(loaded=None, retention=RETENTION, archive=ARCHIVE):
+    # loaded（パス → 読み込み済みの中身）があれば読み直さずにそれを使う
+    # 削るパッチは champion_history へ差分形式で保存しておくので、古いパッチも後から参照できる
+    loaded = loaded or {}
+    timeline = load_patch_timeline(PATCH_CONTENTS_JSON)
     for filename in os.listdir(CHAMPION_DIR):
         filepath = os.path.join(CHAMPION_DIR, filename)
 
@@ -15,21 +24,27 @@ def delete_champion_data():
         if not filename.endswith(".json"):
             continue
 
-        data = load_json(filepath)
+        data = loaded.get(filepath)
+        if data is None:
+            data = load_json(filepath)
         if not data:
             continue
 
         patches = data.get("patches", [])
 
-        # 5件以下なら何もしない
-        if len(patches) <= 5:
+        # 追加順ではなく updatetime・パッチの公開順で新しいものを選び、ファイル内の並びはそのまま残す
+        keep = select_recent(patches, timeline, retention["recent_patches"], retention["recent_days"])
+        if len(keep) == len(patches):
             continue
 
-        # 🔥 ソートせず「後ろ5件だけ残す」
-        # 前提：append順 = 古い → 新しい
-        trimmed = patches[-5:]
+        # 削るパッチだけを履歴に取り込む（毎回全部を書き直さない）
+        if archive["enabled"]:
+            kept = set(keep)
+            archive_champion(data, timeline, policy=archive, snapshots=[p for i, p in enumerate(patches) if i not in kept])
+
+        trimmed = [patches[i] for i in keep]
 
         data["patches"] = trimmed
         save_json(filepath, data)
 
-        print(f"{filename}: {len(patches)} → {len(trimmed)} に削減")
\ No newline at end of file
+        print(f"{filename}: {len(patches)} → {len(trimmed)} に削減")
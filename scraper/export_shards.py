@@ -0,0 +1,95 @@
+import os
+import json
+import hashlib
+from modeule import load_json, save_json, report_write_stats
+
+# all_champion_data.json を ランク × レーン ごとの小さなティアリストに分けて書き出す
+#   tier_lists/{rank}/{lane}.json  … 勝率の高い順に並べ、ピック率・バン率での順位も持たせる
+#   tier_lists/manifest.json       … シャードごとの sha256 とサイズ（フロントエンドのキャッシュ判定用）
+# 中身が変わらないシャードは書き直さないので、ブラウザ・CDN のキャッシュがそのまま使える
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__)) #githubactionsでの実行を考慮して、絶対パスを取得
+DATA_DIR = os.path.join(BASE_DIR, '..', 'wrgg-frontend/public/data')
+
+ALL_CHAMPIONS_DATA_JSON = os.path.join(DATA_DIR, 'all_champion_data.json')
+TIER_LIST_DIR = os.path.join(DATA_DIR, 'tier_lists')
+TIER_LIST_MANIFEST_JSON = os.path.join(TIER_LIST_DIR, 'manifest.json')
+
+SORT_KEYS = ["winrate", "pickrate", "banrate"]
+
+
+def build_tier_lists(all_champions_data):
+    # (rank, lane) → そのランク・レーンの全チャンピオンの行
+    # RANK_MAP にない数値のランクもそのまま来るので、パスと並べ替えに使えるよう文字列にする
+    shards = {}
+    for champ in all_champions_data:
+        for row in champ.get("data", []):
+            shards.setdefault((str(row["rank"]), str(row["lane"])), []).append({
+                "id": champ["id"],
+                "name_ja": champ.get("name_ja"),
+                "winrate": row["winrate"],
+                "pickrate": row["pickrate"],
+                "banrate": row["banrate"],
+                "updatetime": row["updatetime"],
+            })
+
+    tier_lists = {}
+    for (rank, lane), rows in shards.items():
+        # 同じ値のときは ID 順にして、実行ごとに並びが変わらないようにする
+        for key in SORT_KEYS:
+            ordered = sorted(rows, key=lambda r: (-r[key], r["id"]))
+            for position, row in enumerate(ordered, 1):
+                row[f"{key}_rank"] = position
+        rows.sort(key=lambda r: r["winrate_rank"])
+        tier_lists[(rank, lane)] = {
+            "rank": rank,
+            "lane": lane,
+            "updatetime": max(r["updatetime"] for r in rows),
+            "champions": rows,
+        }
+    return tier_lists
+
+
+def shard_digest(data):
+    # save_json と同じ形式で直列化したもののハッシュ
+    return hashlib.sha256(json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")).hexdigest()
+
+
+def export_tier_lists(source=ALL_CHAMPIONS_DATA_JSON, output_dir=TIER_LIST_DIR, manifest_path=TIER_LIST_MANIFEST_JSON):
+    all_champions_data = load_json(source)
+    tier_lists = build_tier_lists(all_champions_data)
+
+    shards = {}
+    for (rank, lane), tier_list in sorted(tier_lists.items()):
+        rel_path = f"{rank}/{lane}.json"
+        path = os.path.join(output_dir, rank, f"{lane}.json")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        save_json(path, tier_list)
+        shards[f"{rank}/{lane}"] = {
+            "path": rel_path,
+            "sha256": shard_digest(tier_list),
+            "count": len(tier_list["champions"]),
+            "updatetime": tier_list["updatetime"],
+        }
+
+    # 今回出力しなかった古いシャードは消す
+    for root, _, files in os.walk(output_dir):
+        for file_name in files:
+            path = os.path.join(root, file_name)
+            rel_path = os.path.relpath(path, output_dir).replace(os.sep, "/")
+            if file_name.endswith(".json") and os.path.abspath(path) != os.path.abspath(manifest_path) and rel_path[:-len(".json")] not in shards:
+                os.remove(path)
+                print(f"古いシャードを削除しました: {rel_path}")
+
+    save_json(manifest_path, {"shards": shards})
+    print(f"ティアリストを {len(shards)} 件出力しました: {output_dir}")
+    return {"success": True, "shards": len(shards)}
+
+
+def main():
+    export_tier_lists()
+    report_write_stats()
+
+
+if __name__ == "__main__":
+    main()
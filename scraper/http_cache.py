@@ -0,0 +1,216 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import metrics
+from http_client import TIMEOUT
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__)) #githubactionsでの実行を考慮して、絶対パスを取得
+CACHE_DIR = os.path.join(BASE_DIR, '.http_cache')  # レスポンス本文と ETag / Last-Modified の保存先
+
+MAX_CACHE_BYTES = 200 * 1024 * 1024  # これを超えたら古いものから削除
+
+
+class CachedResponse:
+    # requests.Response の代わりに返す最小限のレスポンス
+    def __init__(self, url, status_code, content, headers, encoding, from_cache):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.encoding = encoding or "utf-8"
+        self.from_cache = from_cache
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors="replace")
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        # エラー応答は HttpCache.get の中で例外にしている
+        pass
+
+
+class HttpCache:
+    # 条件付きGET（If-None-Match / If-Modified-Since）でディスクにキャッシュする
+    # ttl 秒以内ならリクエスト自体を省略し、それ以降は 304 で本文のダウンロードを省略する
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.stats = {
+            "hits": 0,          # ttl 内でリクエストなし
+            "revalidated": 0,   # 304 Not Modified
+            "misses": 0,        # 本文をダウンロード
+            "bytes_downloaded": 0,
+            "bytes_from_cache": 0,
+        }
+        self.prefetched = {}  # url → CachedResponse（async_fetch で先読みしたもの）
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + ".json", base + ".body"
+
+    def _load(self, url):
+        meta_path, body_path = self._paths(url)
+        if not (os.path.exists(meta_path) and os.path.exists(body_path)):
+            return None, None
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None, None
+        if meta.get("url") != url:
+            return None, None
+        return meta, body
+
+    def _store(self, url, meta, body=None):
+        meta_path, body_path = self._paths(url)
+        suffix = f".{threading.get_ident()}.tmp"
+        if body is not None:
+            with open(body_path + suffix, "wb") as f:
+                f.write(body)
+            os.replace(body_path + suffix, body_path)
+        with open(meta_path + suffix, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(meta_path + suffix, meta_path)
+
+    def _count(self, key, value=1):
+        with self.lock:
+            self.stats[key] += value
+
+    def lookup(self, url, ttl=0):
+        # ネットワークに出る前の確認: (レスポンス または None, meta, body, 条件付きGETのヘッダー)
+        # この実行で先読み済み、または ttl 内ならレスポンスを返す
+        response = self.prefetched.get(url)
+        if response is not None:
+            return response, None, None, None
+
+        meta, body = self._load(url)
+
+        # ttl 内ならネットワークに出ない
+        if meta and ttl and time.time() - meta["stored_at"] < ttl:
+            self._count("hits")
+            self._count("bytes_from_cache", len(body))
+            metrics.record_http(url, 0.0, 0, 200, from_cache=True)
+            return self._response(url, meta, body, from_cache=True), meta, body, None
+
+        headers = {}
+        if meta:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        return None, meta, body, headers
+
+    def receive(self, url, meta, body, response, elapsed):
+        # ネットワークからの応答（requests / httpx のレスポンス）を保存して CachedResponse を返す
+        # 304 ならキャッシュの本文を使う
+        now = time.time()
+        if response.status_code == 304 and meta:
+            metrics.record_http(url, elapsed, 0, 304, from_cache=True)
+            self._count("revalidated")
+            self._count("bytes_from_cache", len(body))
+            meta["stored_at"] = now
+            self._store(url, meta)
+            return self._response(url, meta, body, from_cache=True)
+
+        metrics.record_http(url, elapsed, len(response.content), response.status_code)
+        response.raise_for_status()
+        body = response.content
+        meta = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "encoding": response.encoding or getattr(response, "apparent_encoding", None),
+            "stored_at": now,
+            "size": len(body),
+        }
+        self._count("misses")
+        self._count("bytes_downloaded", len(body))
+        self._store(url, meta, body)
+        self.evict()
+        return self._response(url, meta, body, from_cache=False)
+
+    def get(self, url, session=None, ttl=0, timeout=TIMEOUT):
+        cached, meta, body, headers = self.lookup(url, ttl)
+        if cached is not None:
+            return cached
+
+        if session is None:
+            import requests  # キャッシュだけで済む時は読み込まない
+            session = requests
+        start = time.perf_counter()
+        try:
+            response = session.get(url, headers=headers, timeout=timeout)
+        except Exception:
+            metrics.record_http(url, time.perf_counter() - start, 0)
+            raise
+        return self.receive(url, meta, body, response, time.perf_counter() - start)
+
+    def prefetch(self, url, response):
+        # 先読みしたレスポンスを、この実行の間は get() でそのまま返す
+        with self.lock:
+            self.prefetched[url] = response
+
+    def _response(self, url, meta, body, from_cache):
+        headers = {}
+        if meta.get("etag"):
+            headers["ETag"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["Last-Modified"] = meta["last_modified"]
+        return CachedResponse(url, 200, body, headers, meta.get("encoding"), from_cache)
+
+    def evict(self):
+        # 合計サイズが max_bytes を超えたら、最後に使われたのが古い順に削除する
+        with self.lock:
+            entries = []
+            total = 0
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith(".body"):
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                stat = os.stat(path)
+                meta_path = path[:-len(".body")] + ".json"
+                used = os.path.getmtime(meta_path) if os.path.exists(meta_path) else stat.st_mtime
+                entries.append((used, stat.st_size, path, meta_path))
+                total += stat.st_size
+
+            entries.sort()
+            while total > self.max_bytes and entries:
+                _, size, path, meta_path = entries.pop(0)
+                for p in (path, meta_path):
+                    if os.path.exists(p):
+                        os.remove(p)
+                total -= size
+
+    def report(self):
+        s = self.stats
+        print(
+            f"HTTPキャッシュ: ヒット {s['hits']} / 304 {s['revalidated']} / ミス {s['misses']}, "
+            f"ダウンロード {s['bytes_downloaded']:,} bytes, キャッシュから {s['bytes_from_cache']:,} bytes"
+        )
+        return dict(s)
+
+
+# プロセス内で共有するキャッシュ
+_http_cache = None
+
+
+def get_http_cache():
+    global _http_cache
+    if _http_cache is None:
+        _http_cache = HttpCache()
+    return _http_cache
+
+
+def cached_get(url, session=None, ttl=0, timeout=TIMEOUT):
+    return get_http_cache().get(url, session=session, ttl=ttl, timeout=timeout)
@@ -0,0 +1,63 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+TIMEOUT = 30          # 1リクエストのタイムアウト（秒）
+MAX_WORKERS = 8       # 同時に動かすスレッド数
+PER_HOST_LIMIT = 4    # 同じホストへの同時接続数
+RETRIES = 3           # 5xx / 接続エラー時の再試行回数
+BACKOFF = 0.5         # 再試行の待ち時間（0.5, 1, 2 ... 秒）
+
+HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; wr.gg scraper)"}
+
+
+def create_session(pool_size=MAX_WORKERS, retries=RETRIES, backoff=BACKOFF):
+    # コネクションプールと再試行付きのセッションを作る
+    import requests  # 起動を速くするため、使う時に読み込む
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET", "HEAD"),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class HostLimiter:
+    # ホストごとの同時接続数を制限する
+    def __init__(self, limit=PER_HOST_LIMIT):
+        self.limit = limit
+        self.lock = threading.Lock()
+        self.semaphores = {}
+
+    def __call__(self, url):
+        host = urlsplit(url).netloc
+        with self.lock:
+            if host not in self.semaphores:
+                self.semaphores[host] = threading.BoundedSemaphore(self.limit)
+            return self.semaphores[host]
+
+
+def fetch_all(items, fetch, get_url, max_workers=MAX_WORKERS, per_host=PER_HOST_LIMIT):
+    # items を並列に fetch(item) し、結果を items と同じ順番のリストで返す
+    # 同じホストへの同時リクエストは per_host 件まで
+    limiter = HostLimiter(per_host)
+
+    def run(item):
+        with limiter(get_url(item)):
+            return fetch(item)
+
+    if not items:
+        return []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(run, items))
@@ -1,15 +1,24 @@
 import os
 import json
+import heapq
+import hashlib
+import argparse
+import metrics
+from modeule import load_json, save_json, report_write_stats
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, '..', 'wrgg-frontend/public/data')
 CHAMPION_DIR = os.path.join(DATA_DIR, 'champion_data')
 OUTPUT_DIR = os.path.join(DATA_DIR, 'AI')
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+OUTPUT_JSON = os.path.join(OUTPUT_DIR, 'diff_input.json')
+MANIFEST_JSON = os.path.join(BASE_DIR, '.diff_manifest.json')  # 差分モード用：ファイルごとのハッシュと前回の差分（公開しない・CI では actions/cache で保持）
+RANKING_JSON = os.path.join(OUTPUT_DIR, 'ai_ranking.json')  # score の上位 top_n 件（response_ai は理由の文章だけ書く）
+
+MANIFEST_VERSION = 1
+RANKING_VERSION = 1
 
 threshold_win = 2.0  # win/pick/ban の差分閾値(%)
 threshold = 3.0
-diff_input = {}
 
 rank_weight = {
     "Master": 8,
@@ -19,23 +28,29 @@ rank_weight = {
     "Emerald": 1
 }
 
-for file_name in os.listdir(CHAMPION_DIR):
-    if not file_name.endswith('.json'):
-        continue
+# score = (|win_diff| * win + |pick_diff| * pick + |ban_diff| * ban) * rank_weight
+diff_weight = {"win": 1.0, "pick": 0.5, "ban": 0.5}
 
-    file_path = os.path.join(CHAMPION_DIR, file_name)
-    with open(file_path, 'r', encoding='utf-8') as f:
-        champ_data = json.load(f)
+# ai_ranking.json の選び方
+ranking_config = {
+    "top_n": 15,             # 出力する件数
+    "min_score": 0.0,        # これ未満の score は選ばない
+    "max_per_champion": 1,   # 1チャンピオンから選ぶ行数（score の高い順）
+    "lane_quota": {},        # レーンごとの件数の上限（例 {"SUP": 3}）。書いていないレーンは上限なし
+    "rank_quota": {},        # ランクごとの件数の上限（例 {"Emerald": 2}）
+}
 
+
+def champion_diff(champ_data, file_name):
+    # 1チャンピオン分の「最新パッチ - 1つ前のパッチ」の差分。対象がなければ None
     if 'patches' not in champ_data or len(champ_data['patches']) < 2:
-        continue
+        return None
 
     patches = sorted(champ_data['patches'], key=lambda x: x['updatetime'])
     prev_patch = patches[-2]
     latest_patch = patches[-1]
 
-    champ_id = champ_data.get("id", file_name.replace('.json',''))
-    champ_name_ja = champ_data.get("name_ja", champ_id)  # 日本語名
+    champ_name_ja = champ_data.get("name_ja", champ_data.get("id", file_name.replace('.json','')))  # 日本語名
 
     prev_dict = {(e["lane"], e["rank"]): e for e in prev_patch["data"]}
     champ_diff = []
@@ -50,7 +65,7 @@ for file_name in os.listdir(CHAMPION_DIR):
         pick_diff = latest_entry['pickrate'] - prev_entry['pickrate']
         ban_diff = latest_entry['banrate'] - prev_entry['banrate']
         weight = rank_weight.get(latest_entry["rank"], 1)
-        score = abs(win_diff)*weight + abs(pick_diff)*weight*0.5 + abs(ban_diff)*weight*0.5
+        score = abs(win_diff)*weight*diff_weight["win"] + abs(pick_diff)*weight*diff_weight["pick"] + abs(ban_diff)*weight*diff_weight["ban"]
 
         if abs(win_diff) >= threshold_win or abs(pick_diff) >= threshold or abs(ban_diff) >= threshold:
             champ_diff.append({
@@ -67,16 +82,228 @@ for file_name in os.listdir(CHAMPION_DIR):
                 "trend": f"win{'↑' if win_diff>0 else '↓'} pick{'↑' if pick_diff>0 else '↓'} ban{'↑' if ban_diff>0 else '↓'}"
             })
 
-    if champ_diff:
-        diff_input[champ_id] = {
-            "patch_name": latest_patch["patch_name"],
-            "updatetime": latest_patch["updatetime"],
-            "diff_data": champ_diff
+    if not champ_diff:
+        return None
+
+    return {
+        "patch_name": latest_patch["patch_name"],
+        "updatetime": latest_patch["updatetime"],
+        "diff_data": champ_diff
+    }
+
+
+class TopRanking:
+    # 差分をチャンピオンごとに受け取りながら、score の上位 top_n 件を選ぶ
+    # 全件を溜めずに (lane, rank) ごとの上位だけを heap で持つ。
+    # 同じ (lane, rank) で自分より上が min(top_n, レーンの上限, ランクの上限) 件あれば、
+    # その行はどの順で選んでも上限か top_n に引っかかるので捨ててよい（全件を並べて選ぶのと同じ結果になる）
+
+    def __init__(self, **options):
+        # options は ranking_config の一部を上書きする
+        config = dict(ranking_config, **options)
+        self.top_n = config["top_n"]
+        self.min_score = config["min_score"]
+        self.max_per_champion = config["max_per_champion"]
+        self.lane_quota = config["lane_quota"]
+        self.rank_quota = config["rank_quota"]
+        self.heaps = {}  # (lane, rank) → [(score, -受け取った順, 候補), ...] の最小 heap
+        self.seq = 0
+
+    def cell_size(self, lane, rank):
+        return min(self.top_n, self.lane_quota.get(lane, self.top_n), self.rank_quota.get(rank, self.top_n))
+
+    def push(self, champ_id, diff):
+        # champion_diff の結果（None なら何もしない）
+        if not diff:
+            return
+        rows = [row for row in diff["diff_data"] if row["score"] >= self.min_score]
+        # score が同じならファイル内の順（sorted は安定）
+        rows = sorted(rows, key=lambda row: -row["score"])[:self.max_per_champion]
+
+        for row in rows:
+            self.seq += 1
+            size = self.cell_size(row["lane"], row["rank"])
+            if size <= 0:
+                continue
+            # 同じ score なら先に受け取った方（ファイル名順で前）を残す
+            item = (row["score"], -self.seq, {"champ_id": champ_id, "row": row, "others": diff["diff_data"]})
+            heap = self.heaps.setdefault((row["lane"], row["rank"]), [])
+            if len(heap) < size:
+                heapq.heappush(heap, item)
+            else:
+                heapq.heappushpop(heap, item)
+
+    def ranked(self):
+        # score の高い順に、レーン・ランクの上限を守って top_n 件
+        candidates = sorted((item for heap in self.heaps.values() for item in heap), key=lambda item: item[:2], reverse=True)
+        lane_count, rank_count = {}, {}
+        selected = []
+        for _, _, candidate in candidates:
+            if len(selected) >= self.top_n:
+                break
+            lane, rank = candidate["row"]["lane"], candidate["row"]["rank"]
+            if lane_count.get(lane, 0) >= self.lane_quota.get(lane, self.top_n):
+                continue
+            if rank_count.get(rank, 0) >= self.rank_quota.get(rank, self.top_n):
+                continue
+            lane_count[lane] = lane_count.get(lane, 0) + 1
+            rank_count[rank] = rank_count.get(rank, 0) + 1
+            selected.append(candidate)
+        return selected
+
+    def result(self):
+        # ai_ranking.json の中身。others は同じチャンピオンの他のレーン・ランクの trend（他との比較用）
+        items = []
+        for i, candidate in enumerate(self.ranked(), start=1):
+            row = candidate["row"]
+            items.append({
+                "ranking": i,
+                "id": candidate["champ_id"],
+                "name_ja": row["name_ja"],
+                "lane": row["lane"],
+                "rank": row["rank"],
+                "trend": row["trend"],
+                "score": row["score"],
+                "others": [f"{o['lane']} {o['rank']} {o['trend']}" for o in candidate["others"] if o is not row],
+            })
+        return {
+            "version": RANKING_VERSION,
+            "params": {
+                "top_n": self.top_n,
+                "min_score": self.min_score,
+                "max_per_champion": self.max_per_champion,
+                "lane_quota": self.lane_quota,
+                "rank_quota": self.rank_quota,
+            },
+            "items": items,
         }
 
-# 保存
-OUTPUT_JSON = os.path.join(OUTPUT_DIR, 'diff_input.json')
-with open(OUTPUT_JSON, 'w', encoding='utf-8') as f:
-    json.dump(diff_input, f, ensure_ascii=False, indent=2)
 
-print(f"差分データを {OUTPUT_JSON} に保存しました")
+def params_digest():
+    # 閾値・重みが変わったら差分を全部作り直す
+    params = {
+        "threshold_win": threshold_win,
+        "threshold": threshold,
+        "rank_weight": rank_weight,
+        "diff_weight": diff_weight,
+    }
+    return hashlib.sha256(json.dumps(params, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def file_digest(raw):
+    return hashlib.sha256(raw).hexdigest()
+
+
+@metrics.timed()
+def build_diff_input(champion_dir=CHAMPION_DIR, incremental=False, manifest_path=MANIFEST_JSON, ranking=None):
+    # champion_data/*.json から diff_input を作る
+    # incremental=True なら、前回から変わっていないファイルは manifest の差分を使い回す
+    # ranking（TopRanking）を渡すと、各ファイルの差分をそのまま渡して上位を選ぶ
+    digest = params_digest()
+
+    old_files = {}
+    if incremental:
+        manifest = load_json(manifest_path)
+        if isinstance(manifest, dict) and manifest.get("version") == MANIFEST_VERSION and manifest.get("params") == digest:
+            old_files = manifest.get("files", {})
+
+    diff_input = {}
+    new_files = {}
+    recomputed = 0
+
+    # ファイル名順に処理して、全体・差分どちらでも同じ並びにする
+    for file_name in sorted(os.listdir(champion_dir)):
+        if not file_name.endswith('.json'):
+            continue
+
+        file_path = os.path.join(champion_dir, file_name)
+        stat = os.stat(file_path)
+        old = old_files.get(file_name)
+
+        # mtime とサイズが同じならファイルを読まずに前回の結果を使う
+        if old and old["mtime_ns"] == stat.st_mtime_ns and old["size"] == stat.st_size:
+            entry = old
+        else:
+            with open(file_path, 'rb') as f:
+                raw = f.read()
+            sha = file_digest(raw)
+
+            if old and old["sha256"] == sha:
+                # 中身が同じ（チェックアウトで mtime だけ変わった等）
+                entry = dict(old, mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+            else:
+                champ_data = json.loads(raw.decode('utf-8'))
+                entry = {
+                    "mtime_ns": stat.st_mtime_ns,
+                    "size": stat.st_size,
+                    "sha256": sha,
+                    "champ_id": champ_data.get("id", file_name.replace('.json','')),
+                    "diff": champion_diff(champ_data, file_name),
+                }
+                recomputed += 1
+                metrics.count("ai_input_recomputed")
+
+        new_files[file_name] = entry
+        metrics.count("ai_input_files")
+        if entry["diff"]:
+            diff_input[entry["champ_id"]] = entry["diff"]
+            if ranking is not None:
+                ranking.push(entry["champ_id"], entry["diff"])
+
+    if incremental:
+        save_json(manifest_path, {"version": MANIFEST_VERSION, "params": digest, "files": new_files})
+
+    return diff_input, recomputed
+
+
+def ranking_from_diff_input(diff_input, **options):
+    # 保存済みの diff_input.json から選び直す（ai_ranking.json がない時用）
+    ranking = TopRanking(**options)
+    for champ_id, diff in diff_input.items():
+        ranking.push(champ_id, diff)
+    return ranking.result()
+
+
+def parse_quota(values):
+    # ["SUP=3", "TOP=2"] → {"SUP": 3, "TOP": 2}
+    quota = {}
+    for value in values or []:
+        name, _, count = value.partition("=")
+        quota[name] = int(count)
+    return quota
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--incremental", action="store_true", help="変更されたチャンピオンだけ差分を再計算する")
+    parser.add_argument("--top", type=int, help="ai_ranking.json に出す件数")
+    parser.add_argument("--min-score", type=float, help="これ未満の score は選ばない")
+    parser.add_argument("--per-champion", type=int, help="1チャンピオンから選ぶ行数")
+    parser.add_argument("--lane-quota", action="append", metavar="LANE=N", help="レーンごとの件数の上限（例 SUP=3）")
+    parser.add_argument("--rank-quota", action="append", metavar="RANK=N", help="ランクごとの件数の上限（例 Emerald=2）")
+    args = parser.parse_args()
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    # 指定したものだけ ranking_config を上書きする
+    options = {
+        "top_n": args.top,
+        "min_score": args.min_score,
+        "max_per_champion": args.per_champion,
+        "lane_quota": parse_quota(args.lane_quota) or None,
+        "rank_quota": parse_quota(args.rank_quota) or None,
+    }
+    ranking = TopRanking(**{key: value for key, value in options.items() if value is not None})
+    diff_input, recomputed = build_diff_input(incremental=args.incremental, ranking=ranking)
+
+    # 保存
+    save_json(OUTPUT_JSON, diff_input)
+    save_json(RANKING_JSON, ranking.result())
+
+    print(f"{recomputed} 件のチャンピオンを再計算しました")
+    print(f"差分データを {OUTPUT_JSON} に保存しました")
+    print(f"上位 {len(ranking.ranked())} 件を {RANKING_JSON} に保存しました")
+    report_write_stats()
+
+
+if __name__ == "__main__":
+    main()
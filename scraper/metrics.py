@@ -0,0 +1,163 @@
+import os
+import json
+import time
+import functools
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+# 実行時の計測（処理ごとの時間・HTTP・JSON の読み書き・処理した行数）
+#   with metrics.stage("championdata"): ...     # 区間の時間
+#   @metrics.timed()                            # 関数の時間
+#   metrics.count("rank_rows", n)               # 件数
+# http_cache / modeule など共通部分から record_http / record_json を呼ぶ
+# 最後に write_run_metrics() で run_metrics.json に書き出す
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RUN_METRICS_JSON = os.path.join(BASE_DIR, 'run_metrics.json')
+PROFILE_PATH = os.path.join(BASE_DIR, 'run_profile.pstats')
+
+SLOWEST_REQUESTS = 10  # 遅かったリクエストを何件残すか
+
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def _new_run():
+    return {
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "stages": {},    # "親/子" → {calls, seconds}
+        "http": {"requests": 0, "from_cache": 0, "errors": 0, "bytes": 0, "seconds": 0.0, "by_host": {}, "slowest": []},
+        "json": {"read": {}, "written": {}, "skipped": 0},
+        "counters": {},
+    }
+
+
+_run = _new_run()
+_started = time.perf_counter()
+
+
+def reset():
+    global _run, _started
+    with _lock:
+        _run = _new_run()
+        _started = time.perf_counter()
+
+
+def _stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+@contextmanager
+def stage(name):
+    # 区間の時間を「外側の区間/name」として積算する
+    stack = _stack()
+    stack.append(name)
+    path = "/".join(stack)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        stack.pop()
+        with _lock:
+            entry = _run["stages"].setdefault(path, {"calls": 0, "seconds": 0.0})
+            entry["calls"] += 1
+            entry["seconds"] += elapsed
+
+
+def timed(name=None):
+    # 関数を stage で囲むデコレーター
+    def decorator(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name, n=1):
+    with _lock:
+        _run["counters"][name] = _run["counters"].get(name, 0) + n
+
+
+def record_http(url, seconds, size, status=None, from_cache=False):
+    host = urlsplit(url).netloc
+    with _lock:
+        http = _run["http"]
+        http["requests"] += 1
+        http["bytes"] += size
+        http["seconds"] += seconds
+        if from_cache:
+            http["from_cache"] += 1
+        if status is None or status >= 400:
+            http["errors"] += 1
+        by_host = http["by_host"].setdefault(host, {"requests": 0, "bytes": 0, "seconds": 0.0})
+        by_host["requests"] += 1
+        by_host["bytes"] += size
+        by_host["seconds"] += seconds
+
+        slowest = http["slowest"]
+        slowest.append({"url": url, "seconds": round(seconds, 4), "bytes": size, "status": status})
+        slowest.sort(key=lambda r: -r["seconds"])
+        del slowest[SLOWEST_REQUESTS:]
+
+
+def record_json(kind, filename, size):
+    # kind: "read" / "written" / "skipped"
+    with _lock:
+        if kind == "skipped":
+            _run["json"]["skipped"] += 1
+            return
+        files = _run["json"][kind]
+        key = os.path.relpath(os.path.abspath(filename), os.path.join(BASE_DIR, '..'))
+        files[key] = files.get(key, 0) + size
+
+
+def snapshot():
+    # run_metrics.json に書く内容
+    with _lock:
+        data = json.loads(json.dumps(_run))
+    data["seconds"] = round(time.perf_counter() - _started, 4)
+    for entry in data["stages"].values():
+        entry["seconds"] = round(entry["seconds"], 4)
+    data["http"]["seconds"] = round(data["http"]["seconds"], 4)
+    for entry in data["http"]["by_host"].values():
+        entry["seconds"] = round(entry["seconds"], 4)
+    for kind in ("read", "written"):
+        files = data["json"][kind]
+        data["json"][f"{kind}_files"] = len(files)
+        data["json"][f"{kind}_bytes"] = sum(files.values())
+    return data
+
+
+def write_run_metrics(path=RUN_METRICS_JSON):
+    # modeule.save_json は使わない（自分自身の書き込みを計測に含めないため）
+    data = snapshot()
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    print(f"計測結果を {path} に保存しました")
+    return data
+
+
+@contextmanager
+def profile(path=PROFILE_PATH, enabled=True):
+    # cProfile で囲み、pstats 形式で保存する（python -m pstats で見られる）
+    if not enabled:
+        yield
+        return
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        print(f"プロファイルを {path} に保存しました")
@@ -1,13 +1,183 @@
 import os
 import json
+import hashlib
+import tempfile
+import metrics
+
+# save_json の実際の書き込み / スキップ件数（実行ごとの本当のI/Oを表示するため）
+write_stats = {"written": 0, "skipped": 0, "bytes_written": 0}
+
+# 新しく作るファイルの権限（mkstemp の一時ファイルは 0600 なので、rename の前に付け直す）
+NEW_FILE_MODE = 0o644
 
 def load_json(filename):
     if os.path.exists(filename):
+        metrics.record_json("read", filename, os.path.getsize(filename))
         with open(filename, "r", encoding="utf-8") as f:
             return json.load(f)
     return []
 
 
-def save_json(filename, data):
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
\ No newline at end of file
+def _file_digest(filename):
+    h = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def save_json(filename, data, compact=False):
+    # 中身が同じなら書かない。書く時は一時ファイル → fsync → rename で途中状態を残さない
+    # compact=True なら改行・空白なしで書く（フロントエンドで直接見ない大きなファイル用）
+    if compact:
+        payload = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    else:
+        payload = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+    return _save_payload(filename, payload, ".json")
+
+
+def save_text(filename, text):
+    # JSON 以外（CSV など）を save_json と同じように書く（中身が同じなら書かない・途中状態を残さない）
+    return _save_payload(filename, text.encode("utf-8"), os.path.splitext(filename)[1])
+
+
+def _save_payload(filename, payload, suffix):
+    if os.path.exists(filename) and os.path.getsize(filename) == len(payload):
+        if _file_digest(filename) == hashlib.sha256(payload).hexdigest():
+            write_stats["skipped"] += 1
+            metrics.record_json("skipped", filename, 0)
+            return False
+
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_", suffix=suffix)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        mode = os.stat(filename).st_mode & 0o777 if os.path.exists(filename) else NEW_FILE_MODE
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, filename)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    write_stats["written"] += 1
+    write_stats["bytes_written"] += len(payload)
+    metrics.record_json("written", filename, len(payload))
+    return True
+
+
+def report_write_stats():
+    print(
+        f"JSON書き込み: {write_stats['written']} 件 ({write_stats['bytes_written']:,} bytes), "
+        f"変更なしでスキップ: {write_stats['skipped']} 件"
+    )
+    return dict(write_stats)
+
+class ChampionRegistry:
+    # champions.json を1回だけ読み込み、id / 小文字id / name_cn / name_ja / kana で O(1) 検索できるようにする
+    # 変更があった時だけ save() で書き戻す
+
+    INDEX_KEYS = ("name_cn", "name_ja", "kana")
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.champions = load_json(filename)
+        self.dirty = False
+        self._reindex()
+
+    def _reindex(self):
+        self.by_id = {}
+        self.by_lower_id = {}
+        self.by_key = {key: {} for key in self.INDEX_KEYS}
+        for champ in self.champions:
+            self._index(champ)
+
+    def _index(self, champ):
+        champ_id = champ.get("id")
+        if champ_id:
+            self.by_id[champ_id] = champ
+            self.by_lower_id[champ_id.strip().lower()] = champ
+        for key in self.INDEX_KEYS:
+            value = champ.get(key)
+            if value:
+                self.by_key[key][value] = champ
+
+    def __iter__(self):
+        return iter(self.champions)
+
+    def __len__(self):
+        return len(self.champions)
+
+    def get(self, champ_id):
+        return self.by_id.get(champ_id)
+
+    def get_lower(self, champ_id):
+        # 大文字小文字を区別しない id 検索（ddragon や AI 出力の id 用）
+        return self.by_lower_id.get(champ_id.strip().lower())
+
+    def by_name_cn(self, name_cn):
+        return self.by_key["name_cn"].get(name_cn)
+
+    def by_name_ja(self, name_ja):
+        return self.by_key["name_ja"].get(name_ja)
+
+    def by_kana(self, kana):
+        return self.by_key["kana"].get(kana)
+
+    def name_ja(self, champ_id):
+        champ = self.by_id.get(champ_id)
+        return champ.get("name_ja") if champ else None
+
+    def _move(self, index, old, new, champ):
+        # インデックスの1件だけを古いキーから新しいキーへ付け替える
+        if old and index.get(old) is champ:
+            del index[old]
+        if new:
+            index[new] = champ
+
+    def update(self, champ, **fields):
+        # 値が変わったフィールドだけ書き換える。変更があれば True を返す
+        changed_keys = [key for key, value in fields.items() if champ.get(key) != value]
+        if not changed_keys:
+            return False
+
+        for key in changed_keys:
+            old, new = champ.get(key), fields[key]
+            champ[key] = new
+            # 検索キーが変わった時は、そのチャンピオンの分だけインデックスを直す
+            if key == "id":
+                self._move(self.by_id, old, new, champ)
+                self._move(self.by_lower_id, old.strip().lower() if old else None, new.strip().lower() if new else None, champ)
+            elif key in self.INDEX_KEYS:
+                self._move(self.by_key[key], old, new, champ)
+        self.dirty = True
+        return True
+
+    def replace_all(self, champions):
+        # 一覧を丸ごと入れ替える（チャンピオン一覧の再取得時）
+        if champions != self.champions:
+            self.champions = champions
+            self.dirty = True
+            self._reindex()
+
+    def save(self):
+        # 変更があった時だけ champions.json を書き戻す
+        if not self.dirty:
+            return False
+        save_json(self.filename, self.champions)
+        self.dirty = False
+        return True
+
+
+# ファイルパス → ChampionRegistry（同じプロセス内のスクリプトで共有する）
+_registries = {}
+
+
+def get_champion_registry(filename):
+    key = os.path.abspath(filename)
+    if key not in _registries:
+        _registries[key] = ChampionRegistry(filename)
+    return _registries[key]
@@ -0,0 +1,208 @@
+import os
+import re
+import html
+import argparse
+from modeule import load_json, save_json, report_write_stats
+from patch_timeline import PatchTimeline
+
+# patch_contents.json の change_details（HTML）を構造化した変更一覧（patch_changes.json）
+# {
+#   "version": 1,
+#   "patches": {patch_name: update_date, ...},    # 古い → 新しい順
+#   "champions": {                                # チャンピオン → パッチ → スキル → 変更
+#     "ニダリー": {
+#       patch_name: {
+#         "ジャンプ": [
+#           {"stat": "基本ダメージ", "before": "65/100/135/170", "after": "55/90/125/160", "change": "down", "direction": "nerf"},
+#           {"tag": "NEW", "text": "..."},         # 「→」がない行はそのままの文章（行頭の [NEW] などは tag）
+#         ]
+#       }
+#     }
+#   },
+#   "abilities": {"ニダリー": {"ジャンプ": [patch_name, ...]}}   # チャンピオン → スキル → 変更があったパッチ（古い順）
+# }
+# 比べた数値（[[65, 100, 135, 170]] など）は before / after から value_terms() で作れるので保存しない
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__)) #githubactionsでの実行を考慮して、絶対パスを取得
+DATA_DIR = os.path.join(BASE_DIR, '..', 'wrgg-frontend/public/data')
+
+PATCH_CONTENTS_JSON = os.path.join(DATA_DIR, 'patch_contents.json')
+PATCH_CHANGES_JSON = os.path.join(DATA_DIR, 'patch_changes.json')
+
+CHANGES_VERSION = 1
+
+# 値が小さくなる方が強化になる項目（名前にこれを含むもの）
+LOWER_IS_BETTER = ["クールダウン", "コスト", "詠唱時間", "チャージ時間", "待機時間", "再使用", "cooldown", "cost"]
+REDUCTION_WORDS = ["短縮", "減少量", "reduction"]  # 「クールダウン短縮時間」などは大きい方が強化
+
+_LI_RE = re.compile(r"<li\b[^>]*>(.*?)</li>", re.S | re.I)
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"\s+")
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+_ARROW_RE = re.compile(r"→|->|⇒")
+_NOTE_RE = re.compile(r"（[^（）]*）|\([^()]*\)")   # 「（チャンピオンレベルに応じて）」などの補足
+_TAG_PREFIX_RE = re.compile(r"^[\[【]([^\]】]+)[\]】]\s*")  # 行頭の [NEW] / [削除] / [バグ修正] など
+
+
+def html_lines(change_details):
+    # change_details の <li> ごとの文章（<li> がなければ全体を1行とする）
+    items = _LI_RE.findall(change_details) or [change_details]
+    lines = []
+    for item in items:
+        text = html.unescape(_TAG_RE.sub("", item))
+        text = _SPACE_RE.sub(" ", text.replace("\xa0", " ")).strip()
+        if text:
+            lines.append(text)
+    return lines
+
+
+def numbers(text):
+    return [float(n) if "." in n else int(n) for n in _NUMBER_RE.findall(text)]
+
+
+def value_terms(text):
+    # 「10/20/30 + 攻撃力の60%」→ [[10, 20, 30], [60]]（補足の括弧の中は除く）
+    return [numbers(term) for term in _NOTE_RE.sub("", text).split("+")]
+
+
+def split_arrow(text):
+    # 括弧の外にある最初の「→」で 変更前 / 変更後 に分ける（括弧・「」内の「→」は補足や引用）
+    depth = 0
+    for i, char in enumerate(text):
+        if char in "（(「":
+            depth += 1
+        elif char in "）)」":
+            depth = max(0, depth - 1)
+        elif depth == 0:
+            match = _ARROW_RE.match(text, i)
+            if match:
+                return text[:i], text[match.end():]
+    return None
+
+
+def compare_values(before, after):
+    # 項（+ で区切った部分）ごとに数値を比べて "up" / "down" / "mixed" / "same"
+    # 片方が1つの値ならもう片方の各値と比べる（「8秒 → 8/7/6/5秒」）。比べられない時は None
+    if not before or len(before) != len(after):
+        return None
+    pairs = []
+    for b, a in zip(before, after):
+        if len(b) == 1 and len(a) > 1:
+            b = b * len(a)
+        elif len(a) == 1 and len(b) > 1:
+            a = a * len(b)
+        if not b or len(b) != len(a):
+            return None
+        pairs.extend(zip(b, a))
+    ups = any(a > b for b, a in pairs)
+    downs = any(a < b for b, a in pairs)
+    if ups and downs:
+        return "mixed"
+    if ups:
+        return "up"
+    if downs:
+        return "down"
+    return "same"
+
+
+def change_direction(stat, change):
+    # 値の増減から強化 / 弱体化を判定する（クールダウンなどは小さい方が強化）
+    if change in ("up", "down"):
+        stat = stat.lower()
+        lower_is_better = any(word in stat for word in LOWER_IS_BETTER) and not any(word in stat for word in REDUCTION_WORDS)
+        return "buff" if (change == "up") != lower_is_better else "nerf"
+    if change == "mixed":
+        return "mixed"
+    return None
+
+
+def parse_change_line(text):
+    # 「項目：変更前 → 変更後」の1行を構造化する。形式が違う行は {"text": ...}（行頭の [NEW] などは "tag"）
+    parts = split_arrow(text)
+    if parts is None:
+        tag = _TAG_PREFIX_RE.match(text)
+        if tag:
+            return {"tag": tag.group(1), "text": text[tag.end():]}
+        return {"text": text}
+
+    left, after = parts
+    stat, sep, before = left.partition("：")
+    if not sep:
+        stat, sep, before = left.partition(":")
+    if not sep:
+        stat, before = "", left
+    stat, before, after = stat.strip(), before.strip(), after.strip()
+
+    entry = {"stat": stat, "before": before, "after": after}
+    before_values, after_values = value_terms(before), value_terms(after)
+    change = compare_values(before_values, after_values)
+    if change is not None:
+        entry["change"] = change
+        entry["direction"] = change_direction(stat, change)
+    return entry
+
+
+def build_patch_changes(patch_contents):
+    # patch_contents.json の中身から patch_changes.json の中身を作る
+    timeline = PatchTimeline(patch_contents)
+    # 日付のないパッチは最後に並べる（patch_contents.json の並び順のまま）
+    order = sorted(patch_contents, key=lambda name: (name not in timeline.positions, timeline.positions.get(name, 0)))
+
+    champions = {}
+    abilities = {}
+    for patch_name in order:
+        for champion_name, changes in patch_contents[patch_name].get("champions", {}).items():
+            by_ability = champions.setdefault(champion_name, {}).setdefault(patch_name, {})
+            for change in changes:
+                title = change.get("ability_title", "")
+                by_ability.setdefault(title, []).extend(
+                    parse_change_line(line) for line in html_lines(change.get("change_details", ""))
+                )
+                patches = abilities.setdefault(champion_name, {}).setdefault(title, [])
+                if not patches or patches[-1] != patch_name:
+                    patches.append(patch_name)
+
+    return {
+        "version": CHANGES_VERSION,
+        "patches": {name: patch_contents[name].get("update_date", "") for name in order},
+        "champions": champions,
+        "abilities": abilities,
+    }
+
+
+def update_patch_changes(patch_contents=None, path=PATCH_CHANGES_JSON):
+    # patch_contents.json から作り直す（変わっていなければ save_json が書き込みを省略する）
+    if patch_contents is None:
+        patch_contents = load_json(PATCH_CONTENTS_JSON) or {}
+    changes = build_patch_changes(patch_contents)
+    save_json(path, changes, compact=True)
+    print(f"{len(changes['champions'])} 体のチャンピオンの変更一覧を保存しました。")
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="パッチの変更一覧（patch_changes.json）")
+    parser.add_argument("champion", nargs="?", help="このチャンピオン（name_ja）の変更を表示する")
+    parser.add_argument("--ability", help="このスキルの変更だけ表示する")
+    args = parser.parse_args()
+
+    if not args.champion:
+        update_patch_changes()
+        report_write_stats()
+        return
+
+    changes = load_json(PATCH_CHANGES_JSON) or update_patch_changes()
+    for patch_name, by_ability in changes["champions"].get(args.champion, {}).items():
+        for title, entries in by_ability.items():
+            if args.ability and title != args.ability:
+                continue
+            for entry in entries:
+                if "stat" in entry:
+                    mark = {"buff": "▲", "nerf": "▼", "mixed": "◆"}.get(entry.get("direction"), " ")
+                    print(f"{changes['patches'][patch_name]}  {mark} {title} {entry['stat']}: {entry['before']} → {entry['after']}")
+                else:
+                    print(f"{changes['patches'][patch_name]}    {title} {entry['text']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
-import requests
-from bs4 import BeautifulSoup
 import os
 from datetime import datetime
-from modeule import load_json, save_json
+import metrics
+from modeule import load_json, save_json, report_write_stats
+from http_cache import cached_get, get_http_cache
+from http_client import create_session, fetch_all, MAX_WORKERS, PER_HOST_LIMIT
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__)) #githubactionsでの実行を考慮して、絶対パスを取得
 DATA_DIR = os.path.join(BASE_DIR, '..', 'wrgg-frontend/public/data')
@@ -10,41 +11,105 @@ DATA_DIR = os.path.join(BASE_DIR, '..', 'wrgg-frontend/public/data')
 PATCH_NOTES_JSON = os.path.join(DATA_DIR, 'patch_notes.json')# パッチノートの情報を保存するJSONファイル
 PATCH_CONTENTS_JSON = os.path.join(DATA_DIR, 'patch_contents.json')# パッチ内容の情報を保存するJSONファイル
 
+# パッチ記事のパース
+HTML_PARSER = None        # None なら lxml があれば lxml、なければ html.parser
+USE_STRAINER = True       # <time> と .character-changes-container の部分だけ木を作る
+PARSE_WORKERS = os.cpu_count() or 1  # パースに使うプロセス数
+PARSE_IN_PROCESS_BELOW = 4           # これより少ないページはプロセスを立てずにその場でパースする
+
+# パッチノート一覧のクロール
+PATCH_INDEX_URL = "https://wildrift.leagueoflegends.com/ja-jp/news/tags/patch-notes/"
+PATCH_INDEX_STATE_JSON = os.path.join(BASE_DIR, '.patch_index_state.json')  # 前回どこまで取り込んだか（公開しないので public の外）
+SITE_URL = "https://wildrift.leagueoflegends.com"
+MAX_INDEX_PAGES = 50  # 遡る一覧ページの上限
+
+
 # スクレイピング
-def fetch_patch_notes():
-    url = "https://wildrift.leagueoflegends.com/ja-jp/news/tags/patch-notes/"
-    response = requests.get(url)
-    response.raise_for_status()
-    soup = BeautifulSoup(response.text, "html.parser")
+def parse_patch_index(html, base_url=PATCH_INDEX_URL):
+    # 一覧ページ1枚分: (新しい → 古い順のパッチ, 次のページの URL または None)
+    from bs4 import BeautifulSoup, SoupStrainer  # 起動を速くするため、パースする時に読み込む
+    from urllib.parse import urljoin
+    soup = BeautifulSoup(html, resolve_parser(), parse_only=SoupStrainer(["a", "link"]))
 
     patch_notes = []
     for a in soup.select("a[data-testid='articlefeaturedcard-component']"):
         patch_name_tag = a.select_one("div[data-testid='card-title']")
         patch_name = patch_name_tag.text.strip() if patch_name_tag else ""
-        patch_link = "https://wildrift.leagueoflegends.com" + a.get("href", "")
+        patch_link = SITE_URL + a.get("href", "")
         patch_notes.append({
             "patch_name": patch_name,
             "patch_link": patch_link
         })
-    return list(reversed(patch_notes))  # 逆順にして古い順→新しい順に 
 
+    next_tag = soup.select_one("link[rel='next'][href], a[rel='next'][href]")
+    next_url = urljoin(base_url, next_tag["href"]) if next_tag else None
+    return patch_notes, next_url
+
+
+def crawl_patch_index(known_links, state, url=PATCH_INDEX_URL, max_pages=MAX_INDEX_PAGES):
+    # 一覧を新しい順にたどり、ページ内の取り込み済みでないパッチを全部拾う
+    # （固定表示や並べ替えで取り込み済みのカードが先頭に来ても、その後ろの新しいパッチを取りこぼさない）
+    # 次のページは、そのページが全部新しいパッチだった時と、過去分の取り込み（backfill）が終わっていない時だけ読む
+    # state: {"backfill_complete": 一覧の最後まで読んだか}（.patch_index_state.json に保存）
+    # 戻り値: (取り込み済みより新しいパッチ, 古いパッチ)（どちらも古い → 新しい順。古い方は backfill の時だけ）
+    backfill = not state.get("backfill_complete")
+    newer, older = [], []
+    seen = set()
+    reached_known = False
+    pages = 0
+
+    while url and pages < max_pages:
+        response = cached_get(url)
+        response.raise_for_status()
+        page_patches, next_url = parse_patch_index(response.text, url)
+        pages += 1
+
+        for patch in page_patches:
+            link = patch["patch_link"]
+            if link in known_links:
+                reached_known = True
+            elif link not in seen:
+                seen.add(link)
+                # backfill 中は、最初の取り込み済みのカードより後ろは古いパッチ
+                # 通常の実行では読むのは取り込み済みが出てくるページまでなので、全部新しいパッチとする
+                (older if backfill and reached_known else newer).append(patch)
+
+        if reached_known and not backfill:
+            break
+        url = next_url
+
+    if backfill and not url:
+        state["backfill_complete"] = True  # 一覧の最後まで読んだ
+    metrics.count("patch_index_pages", pages)
+    print(f"パッチノート一覧を {pages} ページ読みました。")
+    return list(reversed(newer)), list(reversed(older))  # 逆順にして古い順→新しい順に
+
+
+def load_index_state():
+    # 状態ファイルがない時（キャッシュがない新しい checkout など）は、過去分の取り込みが終わっていないものとして一覧を最後まで読む
+    return load_json(PATCH_INDEX_STATE_JSON) or {}
+
+
+@metrics.timed()
 def update_patch_data():
     try:
-        patch_data = fetch_patch_notes()
-
         existing_data = load_json(PATCH_NOTES_JSON)
         existing_links = {item["patch_link"] for item in existing_data}
+        state = load_index_state()
 
-        # 既存にないパッチだけ抽出して追加
-        new_patches = [p for p in patch_data if p["patch_link"] not in existing_links]
+        # 既存にないパッチだけ一覧から取り出して追加
+        newer, older = crawl_patch_index(existing_links, state)
+        new_patches = older + newer
 
         if new_patches:
-            updated_data = existing_data + new_patches  # 既存の後ろに追加
+            updated_data = older + existing_data + newer  # 新しいパッチは既存の後ろ、backfill で見つけた古いパッチは前に追加
             save_json(PATCH_NOTES_JSON, updated_data)
             print(f"{len(new_patches)} 件の新しいパッチを追加しました。")
         else:
             print("新しいパッチはありませんでした。")
 
+        save_json(PATCH_INDEX_STATE_JSON, state)
+
         print("データの取得と更新が完了しました。")
         return {"success": True}
     except Exception as e:
@@ -52,83 +117,184 @@ def update_patch_data():
         return {"success": False, "error": str(e)}
 
 # パッチ内容のスクレイピング
-def fetch_patch_contents_for_patch(patch):
+def fetch_patch_page(patch, session=None):
+    # 記事の HTML だけを取得する（パースは parse_patch_pages でまとめて行う）
     patch_name = patch.get("patch_name", "")
     patch_link = patch.get("patch_link", "")
-    patch_result = {}
-
     if not patch_link:
-        return patch_result
+        return None
 
     try:
-        response = requests.get(patch_link)
+        response = cached_get(patch_link, session=session)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
+        return response.text
+    except Exception as e:
+        print(f"Error fetching or parsing patch {patch_name} ({patch_link}): {e}")
+        return None
 
-        update_time_elem = soup.select_one("time")
-        if update_time_elem and update_time_elem.get("datetime"):
-            iso_datetime = update_time_elem["datetime"]
-            updatetime = datetime.fromisoformat(iso_datetime.replace("Z", "+00:00")).strftime("%Y/%m/%d")
-        else:
-            updatetime = ""
 
-        container_elems = soup.select(".character-changes-container")
-        champions_dict = {}
+def resolve_parser(parser=None):
+    # 使う BeautifulSoup のパーサー名（lxml が入っていなければ html.parser に戻す）
+    parser = parser or HTML_PARSER
+    if parser:
+        return parser
+    try:
+        import lxml  # noqa: F401
+        return "lxml"
+    except ImportError:
+        return "html.parser"
+
 
-        for container in container_elems:
-            champion_name_elem = container.select_one(".character-name")
-            champion_name = champion_name_elem.text.strip() if champion_name_elem else ""
-            if not champion_name:
-                continue
+_strainer = None
 
-            change_elems = container.select(".character-change")
-            changes_list = []
 
-            for change in change_elems:
-                ability_title = change.select_one(".character-ability-title")
-                change_details_elem  = change.select_one(".character-change-body ul")
+def patch_strainer():
+    # <time> と .character-changes-container（とその中身）だけ木を作る SoupStrainer
+    # allow_tag_creation がない古い bs4 では None（全体をパースする）
+    global _strainer
+    if _strainer is None:
+        from bs4 import SoupStrainer
+        if not hasattr(SoupStrainer, "allow_tag_creation"):
+            return None
 
-                ability_title_text = ability_title.text.strip() if ability_title else ""
-                change_details_html = "".join(str(elem) for elem in change_details_elem) if change_details_elem else ""
+        class PatchStrainer(SoupStrainer):
+            def __init__(self):
+                super().__init__(name="time")
 
-                changes_list.append({
-                    "ability_title": ability_title_text,
-                    "change_details": change_details_html
-                })
+            def allow_tag_creation(self, nsprefix, name, attrs):
+                # 木の一番上に置くタグだけが判定される（残したタグの中身はすべて作られる）
+                if name == "time":
+                    return True
+                classes = (attrs or {}).get("class") or ""
+                if not isinstance(classes, str):
+                    classes = " ".join(classes)
+                return "character-changes-container" in classes.split()
 
-            if changes_list:
-                champions_dict[champion_name] = changes_list
+        _strainer = PatchStrainer()
+    return _strainer
 
-        if champions_dict:
-            patch_result[patch_name] = {
-                "update_date": updatetime,
-                "champions": champions_dict
-            }
 
-    except Exception as e:
-        print(f"Error fetching or parsing patch {patch_name} ({patch_link}): {e}")
+def parse_patch_contents(patch_name, html, parser="html.parser", strainer=None):
+    from bs4 import BeautifulSoup
+    patch_result = {}
+    soup = BeautifulSoup(html, parser, parse_only=strainer)
 
-    return patch_result
+    update_time_elem = soup.select_one("time")
+    if update_time_elem and update_time_elem.get("datetime"):
+        iso_datetime = update_time_elem["datetime"]
+        updatetime = datetime.fromisoformat(iso_datetime.replace("Z", "+00:00")).strftime("%Y/%m/%d")
+    else:
+        updatetime = ""
+
+    container_elems = soup.select(".character-changes-container")
+    champions_dict = {}
+
+    for container in container_elems:
+        champion_name_elem = container.select_one(".character-name")
+        champion_name = champion_name_elem.text.strip() if champion_name_elem else ""
+        if not champion_name:
+            continue
+
+        change_elems = container.select(".character-change")
+        changes_list = []
+
+        for change in change_elems:
+            ability_title = change.select_one(".character-ability-title")
+            change_details_elem  = change.select_one(".character-change-body ul")
+
+            ability_title_text = ability_title.text.strip() if ability_title else ""
+            change_details_html = "".join(str(elem) for elem in change_details_elem) if change_details_elem else ""
 
+            changes_list.append({
+                "ability_title": ability_title_text,
+                "change_details": change_details_html
+            })
 
+        if changes_list:
+            champions_dict[champion_name] = changes_list
 
-def update_patch_contents():
+    if champions_dict:
+        patch_result[patch_name] = {
+            "update_date": updatetime,
+            "champions": champions_dict
+        }
+
+    return patch_result
+
+
+def _parse_page(args):
+    # プロセスプールで動かす1ページ分のパース（エラーは親プロセスで表示する）
+    patch_name, html, parser, use_strainer = args
+    try:
+        return parse_patch_contents(patch_name, html, parser, patch_strainer() if use_strainer else None), None
+    except Exception as e:
+        return {}, str(e)
+
+
+def parse_patch_pages(pages, parser=None, use_strainer=USE_STRAINER, workers=PARSE_WORKERS):
+    # [(patch, html), ...] をパースして同じ順番で結果を返す
+    # ページが多い時は通信とは別にプロセスプールで並列にパースする（CPU を使う処理のため）
+    parser = resolve_parser(parser)
+    jobs = [(patch.get("patch_name", ""), html, parser, use_strainer) for patch, html in pages]
+    if workers > 1 and len(jobs) >= PARSE_IN_PROCESS_BELOW:
+        from concurrent.futures import ProcessPoolExecutor  # 起動を速くするため、使う時に読み込む
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+            parsed = list(executor.map(_parse_page, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    else:
+        parsed = [_parse_page(job) for job in jobs]
+    metrics.count("patch_pages_parsed", len(jobs))
+
+    results = []
+    for (patch, _), (patch_result, error) in zip(pages, parsed):
+        if error is not None:
+            print(f"Error fetching or parsing patch {patch.get('patch_name', '')} ({patch.get('patch_link', '')}): {error}")
+        results.append(patch_result)
+    return results
+
+
+def fetch_missing_patch_contents(patches, max_workers=MAX_WORKERS, per_host=PER_HOST_LIMIT, parse_workers=PARSE_WORKERS):
+    # 未取得のパッチ記事をコネクションプール付きのセッションで並列に取得してから、まとめてパースする
+    # 結果は patches と同じ順番で返す（マージ順を固定するため）
+    session = create_session(pool_size=max_workers)
+    try:
+        with metrics.stage("fetch_patch_pages"):
+            htmls = fetch_all(
+                patches,
+                lambda patch: fetch_patch_page(patch, session),
+                lambda patch: patch.get("patch_link", ""),
+                max_workers=max_workers,
+                per_host=per_host,
+            )
+    finally:
+        session.close()
+
+    pages = [(patch, html) for patch, html in zip(patches, htmls) if html is not None]
+    with metrics.stage("parse_patch_pages"):
+        return parse_patch_pages(pages, workers=parse_workers)
+
+
+@metrics.timed()
+def update_patch_contents(max_workers=MAX_WORKERS):
     patch_data = load_json(PATCH_NOTES_JSON)
     try:
         existing_contents = load_json(PATCH_CONTENTS_JSON)
         if not existing_contents:
             existing_contents = {}
 
-        for patch in patch_data:
-            patch_name = patch.get("patch_name")
-            if patch_name not in existing_contents:
-                patch_result = fetch_patch_contents_for_patch(patch)
-                if patch_result:
-                    existing_contents.update(patch_result)
+        missing_patches = [p for p in patch_data if p.get("patch_name") not in existing_contents]
+
+        # patch_notes.json の順番でマージする（同名パッチは先に取得できた方を使う）
+        for patch_result in fetch_missing_patch_contents(missing_patches, max_workers=max_workers):
+            for patch_name, contents in patch_result.items():
+                existing_contents.setdefault(patch_name, contents)
 
         save_json(PATCH_CONTENTS_JSON, existing_contents)
         print(f"{len(existing_contents)} 件のパッチ内容を保存しました。")
 
+        # change_details を構造化した変更一覧（patch_changes.json）も作り直す
+        from patch_changes import update_patch_changes
+        update_patch_changes(existing_contents)
+
         return {"success": True}
     except Exception as e:
         print(f"エラーが発生しました: {e}")
@@ -138,6 +304,8 @@ def update_patch_contents():
 def main():
     update_patch_data()
     update_patch_contents()
+    get_http_cache().report()
+    report_write_stats()
 
 if __name__ =="__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,63 @@
+import os
+from bisect import bisect_right
+from datetime import datetime
+from modeule import load_json
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__)) #githubactionsでの実行を考慮して、絶対パスを取得
+DATA_DIR = os.path.join(BASE_DIR, '..', 'wrgg-frontend/public/data')
+
+PATCH_CONTENTS_JSON = os.path.join(DATA_DIR, 'patch_contents.json')# パッチ内容の情報を保存するJSONファイル
+
+DATE_FORMAT = "%Y/%m/%d"
+
+# (パス, 更新時刻) → PatchTimeline のキャッシュ
+_timeline_cache = {}
+
+
+class PatchTimeline:
+    # patch_contents.json から作る「日付順のパッチ一覧」
+    # 最新パッチと、ある日付時点で有効だったパッチを O(log n) で返す
+
+    def __init__(self, patch_data):
+        patch_dates = [
+            (datetime.strptime(info["update_date"], DATE_FORMAT), name)
+            for name, info in (patch_data or {}).items()
+            if info.get("update_date")
+        ]
+        # 同じ日付なら patch_contents.json の並び順を保つ（安定ソート）
+        patch_dates.sort(key=lambda x: x[0])
+
+        self.dates = [date for date, _ in patch_dates]
+        self.names = [name for _, name in patch_dates]
+        self.positions = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self):
+        return len(self.names)
+
+    def latest(self):
+        # 最新パッチ名。パッチがない場合は None
+        return self.names[-1] if self.names else None
+
+    def patch_at(self, date):
+        # date（"YYYY/MM/DD" か datetime）の時点で有効だったパッチ名
+        if isinstance(date, str):
+            date = datetime.strptime(date, DATE_FORMAT)
+        i = bisect_right(self.dates, date)
+        return self.names[i - 1] if i else None
+
+    def position(self, patch_name):
+        # パッチの日付順の位置。未知のパッチは -1
+        return self.positions.get(patch_name, -1)
+
+
+def load_patch_timeline(path=PATCH_CONTENTS_JSON):
+    # ファイルが変わっていなければ前回作ったインデックスを使い回す
+    mtime = os.path.getmtime(path) if os.path.exists(path) else None
+    key = (os.path.abspath(path), mtime)
+
+    timeline = _timeline_cache.get(key)
+    if timeline is None:
+        timeline = PatchTimeline(load_json(path))
+        _timeline_cache.clear()
+        _timeline_cache[key] = timeline
+    return timeline
@@ -0,0 +1,250 @@
+import os
+import sys
+import time
+import hashlib
+import argparse
+import metrics
+from modeule import load_json, save_json, get_champion_registry, report_write_stats
+
+# スクレイピングの各処理を1プロセスでまとめて実行する
+# 使い方: python scraper/pipeline.py champion championdata ai_input
+#   - 指定した処理だけを依存関係の順に実行する（--with-deps で前提の処理も実行）
+#   - champions.json / パッチ一覧 / チャンピオンファイルは1回だけ読み込んで共有し、最後にまとめて保存する
+#   - 入力ファイルが前回から変わっていない処理はスキップする（--force で強制実行）
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__)) #githubactionsでの実行を考慮して、絶対パスを取得
+DATA_DIR = os.path.join(BASE_DIR, '..', 'wrgg-frontend/public/data')
+
+CHAMPIONS_JSON = os.path.join(DATA_DIR, 'champions.json')
+PATCH_CONTENTS_JSON = os.path.join(DATA_DIR, 'patch_contents.json')
+CHAMPION_DIR = os.path.join(DATA_DIR, 'champion_data')
+DIFF_INPUT_JSON = os.path.join(DATA_DIR, 'AI', 'diff_input.json')
+AI_RANKING_JSON = os.path.join(DATA_DIR, 'AI', 'ai_ranking.json')
+ALL_CHAMPIONS_DATA_JSON = os.path.join(DATA_DIR, 'all_champion_data.json')
+
+PIPELINE_STATE_JSON = os.path.join(BASE_DIR, '.pipeline_state.json')  # 処理ごとの前回の入力ハッシュ
+
+
+class DataContext:
+    # 処理の間で共有するデータ
+    def __init__(self, options):
+        self.options = options
+        self.champion_files = {}  # チャンピオンファイルのパス → 読み込み済みの中身
+
+    @property
+    def champions(self):
+        return get_champion_registry(CHAMPIONS_JSON)
+
+    def load_champion_file(self, path):
+        key = os.path.abspath(path)
+        if key not in self.champion_files:
+            self.champion_files[key] = load_json(path)
+        return self.champion_files[key]
+
+    def flush(self):
+        # champions.json は変更があった時だけ書き戻す（パッチ一覧は patch_timeline 側でプロセス内共有）
+        self.champions.save()
+
+
+# ---- 各処理（重いライブラリは実行する時だけ読み込む） ----
+
+def run_champion(ctx):
+    from champion_scraper import update_champion_data, download_champion_images, update_champion_CN, create_champion_jsons
+    update_champion_data(save=False)
+    download_champion_images()
+    update_champion_CN(save=False)
+    create_champion_jsons()
+
+
+def run_patch(ctx):
+    from patch_scraper import update_patch_data, update_patch_contents
+    update_patch_data()
+    update_patch_contents()
+
+
+def run_championdata(ctx):
+    from championdata_scraper import champion_data_scrape
+    from delete_champion_data import delete_champion_data
+    loaded = champion_data_scrape(stream=ctx.options.stream)
+    ctx.champion_files.update({os.path.abspath(path): data for path, data in loaded.items()})
+    delete_champion_data({path: ctx.load_champion_file(path) for path in loaded})
+
+
+def run_lane(ctx):
+    from champion_lane import champion_lane, add_manual_lanes_bulk
+    champion_lane(load=ctx.load_champion_file, save=False)
+    add_manual_lanes_bulk(save=False)
+
+
+def run_export(ctx):
+    from export_shards import export_tier_lists
+    export_tier_lists()
+
+
+def run_ai_input(ctx):
+    import make_ai_input
+    os.makedirs(make_ai_input.OUTPUT_DIR, exist_ok=True)
+    ranking = make_ai_input.TopRanking()
+    diff_input, recomputed = make_ai_input.build_diff_input(incremental=not ctx.options.full, ranking=ranking)
+    save_json(make_ai_input.OUTPUT_JSON, diff_input)
+    save_json(make_ai_input.RANKING_JSON, ranking.result())
+    print(f"{recomputed} 件のチャンピオンを再計算しました")
+
+
+def run_ai(ctx):
+    import response_ai
+    response_ai.run()
+
+
+# name: (実行関数, 前提の処理, 入力ファイル)
+# 入力ファイルが None の処理は外部サイトから取得するので毎回実行する
+STAGES = {
+    "champion": (run_champion, [], None),
+    "patch": (run_patch, [], None),
+    "championdata": (run_championdata, ["champion", "patch"], None),
+    "lane": (run_lane, ["championdata"], [CHAMPIONS_JSON, CHAMPION_DIR]),
+    "export": (run_export, ["championdata"], [ALL_CHAMPIONS_DATA_JSON]),
+    "ai_input": (run_ai_input, ["championdata", "patch"], [CHAMPION_DIR, PATCH_CONTENTS_JSON]),
+    "ai": (run_ai, ["ai_input"], [AI_RANKING_JSON, DIFF_INPUT_JSON, CHAMPIONS_JSON]),
+}
+
+
+def resolve_order(names, with_deps=False):
+    # 依存関係の順（トポロジカル順）に並べる。with_deps なら前提の処理も含める
+    selected = set(names)
+    if with_deps:
+        stack = list(names)
+        while stack:
+            for dep in STAGES[stack.pop()][1]:
+                if dep not in selected:
+                    selected.add(dep)
+                    stack.append(dep)
+
+    order = []
+    visiting = set()
+
+    def visit(name):
+        if name in order:
+            return
+        if name in visiting:
+            raise ValueError(f"依存関係が循環しています: {name}")
+        visiting.add(name)
+        for dep in STAGES[name][1]:
+            visit(dep)
+        visiting.discard(name)
+        if name in selected:
+            order.append(name)
+
+    for name in STAGES:
+        if name in selected:
+            visit(name)
+    return order
+
+
+def inputs_digest(paths):
+    # 入力ファイル（ディレクトリは中の .json 全部）の中身のハッシュ
+    h = hashlib.sha256()
+    for path in paths:
+        if os.path.isdir(path):
+            files = [os.path.join(path, f) for f in sorted(os.listdir(path)) if f.endswith(".json")]
+        else:
+            files = [path]
+        for file_path in files:
+            h.update(os.path.relpath(file_path, DATA_DIR).encode("utf-8"))
+            if os.path.exists(file_path):
+                with open(file_path, "rb") as f:
+                    h.update(hashlib.sha256(f.read()).digest())
+    return h.hexdigest()
+
+
+def upstream_jobs(order, options):
+    # 実行する処理が使う上流データ（互いに依存しないので、最初にまとめて同時に取得する）
+    jobs = {}
+    if "champion" in order:
+        from champion_scraper import upstream_jobs as champion_jobs
+        jobs.update(champion_jobs())
+    if "championdata" in order:
+        from championdata_scraper import upstream_jobs as championdata_jobs
+        jobs.update(championdata_jobs(options.stream))
+    return jobs
+
+
+def run_pipeline(names, options):
+    ctx = DataContext(options)
+    order = resolve_order(names, options.with_deps)
+    state = load_json(PIPELINE_STATE_JSON) or {}
+    timings = []
+
+    print(f"実行する処理: {' → '.join(order)}")
+    try:
+        jobs = upstream_jobs(order, options) if options.prefetch else {}
+        if jobs:
+            from async_fetch import prefetch
+            prefetch(jobs)
+
+        for name in order:
+            run, _, inputs = STAGES[name]
+
+            if inputs is not None:
+                # 前の処理が変更した champions.json を判定に含めるため、先に書き戻しておく
+                ctx.flush()
+                digest = inputs_digest(inputs)
+                if not options.force and state.get(name) == digest:
+                    print(f"[{name}] 入力に変更がないのでスキップします")
+                    timings.append((name, 0.0, "skipped"))
+                    continue
+
+            start = time.perf_counter()
+            try:
+                with metrics.stage(name):
+                    run(ctx)
+            except Exception as e:
+                timings.append((name, time.perf_counter() - start, "failed"))
+                print(f"[{name}] エラーが発生しました: {e}")
+                if not options.keep_going:
+                    raise
+                continue
+            timings.append((name, time.perf_counter() - start, "ok"))
+            if inputs is not None:
+                # 自分で入力を書き換える処理（lane → champions.json）もあるので、実行後の状態を記録する
+                ctx.flush()
+                state[name] = inputs_digest(inputs)
+    finally:
+        ctx.flush()
+        save_json(PIPELINE_STATE_JSON, state)
+
+        print("処理ごとの実行時間:")
+        for name, elapsed, status in timings:
+            print(f"  {name:<14} {elapsed:8.2f} s  {status}")
+        if "http_cache" in sys.modules:
+            sys.modules["http_cache"].get_http_cache().report()
+        report_write_stats()
+        metrics.write_run_metrics()
+
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="スクレイピング処理をまとめて実行する")
+    parser.add_argument("stages", nargs="*", metavar="stage",
+                        help=f"実行する処理（{', '.join(STAGES)}）。省略時は全部")
+    parser.add_argument("--with-deps", action="store_true", help="前提の処理も実行する")
+    parser.add_argument("--force", action="store_true", help="入力に変更がなくても実行する")
+    parser.add_argument("--keep-going", action="store_true", help="エラーが出ても残りの処理を続ける")
+    parser.add_argument("--stream", action="store_true", help="hero_rank_list_v2 を少しずつパースして取り込む")
+    parser.add_argument("--no-prefetch", dest="prefetch", action="store_false",
+                        help="上流データを最初にまとめて取得せず、各処理の中で順に取得する")
+    parser.add_argument("--full", action="store_true", help="make_ai_input を差分モードではなく全件で計算する")
+    parser.add_argument("--profile", action="store_true", help=f"cProfile の結果を {os.path.basename(metrics.PROFILE_PATH)} に保存する")
+    options = parser.parse_args()
+
+    unknown = [name for name in options.stages if name not in STAGES]
+    if unknown:
+        parser.error(f"不明な処理です: {', '.join(unknown)}")
+
+    with metrics.profile(enabled=options.profile):
+        run_pipeline(options.stages or list(STAGES), options)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import json
+import codecs
+
+# hero_rank_list_v2 のレスポンス {"data": {rank: {lane: [hero, ...]}}, ...} を
+# 全体を dict にせずに少しずつパースし、(rank, lane, hero) を1行ずつ返す
+
+_decoder = json.JSONDecoder()
+WHITESPACE = " \t\n\r"
+
+
+class _StreamReader:
+    # バイト列のチャンクを受け取り、必要な分だけ文字列バッファに読み足す
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        # 読み終わった部分を捨ててから次のチャンクを足す。これ以上なければ False
+        if self.eof:
+            return False
+        if self.pos:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        for chunk in self.chunks:
+            text = self.decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+            if text:
+                self.buffer += text
+                return True
+        self.buffer += self.decoder.decode(b"", final=True)
+        self.eof = True
+        return False
+
+    def peek(self):
+        # 空白を読み飛ばして次の1文字を返す（終端なら ""）
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"'{char}' が必要な位置に '{found}' があります")
+        self.pos += 1
+
+    def value(self):
+        # 次の JSON 値を1つ読む。値がバッファの終わりで切れていたら読み足して再試行する
+        self.peek()
+        while True:
+            try:
+                result, end = _decoder.raw_decode(self.buffer, self.pos)
+                # 数値などは末尾で切れていても読めてしまうので、後ろに1文字あるか終端の時だけ確定
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return result
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def object_keys(self):
+        # "{" の直後から呼ぶ。キーを1つずつ返し、呼び出し側が値を読んだら次へ進む
+        first = True
+        while True:
+            if self.peek() == "}":
+                self.pos += 1
+                return
+            if not first:
+                self.expect(",")
+            first = False
+            key = self.value()
+            self.expect(":")
+            yield key
+
+    def array_items(self):
+        # "[" の直後から呼ぶ。要素ごとに1回 yield し、呼び出し側が値を読む
+        first = True
+        while True:
+            if self.peek() == "]":
+                self.pos += 1
+                return
+            if not first:
+                self.expect(",")
+            first = False
+            yield
+
+
+def iter_rank_rows_from_data(data):
+    # パース済みの data から同じ形で行を返す（従来の経路用）
+    for rank_num_str, lanes in data.items():
+        for lane_num_str, champs in lanes.items():
+            for champ in champs:
+                yield rank_num_str, lane_num_str, champ
+
+
+def iter_rank_rows(chunks):
+    # chunks（bytes / str のイテラブル）から (rank, lane, hero) を1行ずつ返す
+    reader = _StreamReader(chunks)
+    reader.expect("{")
+    for key in reader.object_keys():
+        if key != "data":
+            reader.value()  # data 以外は読み飛ばす
+            continue
+
+        if reader.peek() != "{":
+            # 想定外の形（null など）はそのまま読んで従来の経路で処理する
+            data = reader.value()
+            if isinstance(data, dict):
+                yield from iter_rank_rows_from_data(data)
+            continue
+
+        reader.expect("{")
+        for rank_num_str in reader.object_keys():
+            reader.expect("{")
+            for lane_num_str in reader.object_keys():
+                reader.expect("[")
+                for _ in reader.array_items():
+                    yield rank_num_str, lane_num_str, reader.value()
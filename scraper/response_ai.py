@@ -1,12 +1,12 @@
-from google import genai
 import os
+import io
 import csv
 import json
-from dotenv import load_dotenv
-
-# .envファイルを読み込む
-load_dotenv()
-api_key = os.getenv('GEMINI_API')
+import hashlib
+import argparse
+from datetime import datetime, timezone
+import metrics
+from modeule import load_json, save_json, save_text, get_champion_registry
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, '..', 'wrgg-frontend/public/data/AI')
@@ -14,54 +14,75 @@ DATA_DIR = os.path.join(BASE_DIR, '..', 'wrgg-frontend/public/data/AI')
 DIFF_PATH = os.path.join(DATA_DIR, 'diff_input.json')
 OUTPUT_CSV = os.path.join(DATA_DIR, 'output_ai.csv')
 OUTPUT_JSON = os.path.join(DATA_DIR, 'output_ai.json')
+RANKING_PATH = os.path.join(DATA_DIR, 'ai_ranking.json')  # make_ai_input が選んだ上位（順番・チャンピオンはこれで決まる）
+RESPONSE_CACHE_JSON = os.path.join(BASE_DIR, '.response_cache.json')  # プロンプトのハッシュ → Gemini の応答（公開しないので public の外）
 
 CHAMPION_PATH= os.path.join(DATA_DIR, '..', 'champions.json')
 
 MAX_RETRY = 5
-retry_count = 0
-success = False
-
-client = genai.Client(api_key=api_key)
-
-# 入力データ読み込み
-with open(DIFF_PATH, "r", encoding="utf-8") as f:
-    diff = f.read()
-
-#  英語を日本語に応急処置
-with open(CHAMPION_PATH, "r", encoding="utf-8") as f:
-    champions_data = json.load(f)
-
-# id → name_ja 辞書作成
-id_to_ja = {
-    champ["id"].strip().lower(): champ["name_ja"]
-    for champ in champions_data
+MODEL = "gemini-2.5-flash-lite"
+GENERATION_CONFIG = {
+    "max_output_tokens": 2000,
+    "temperature": 0,  # フォーマット厳守
+    "top_p": 0,
+    "candidate_count": 1
 }
-
-# Geminiプロンプト
-prompt = f"""
+CSV_HEADER = ["ranking", "champion", "reason"]
+
+LANES = ["TOP", "JG", "MID", "ADC", "SUP"]  # --per-lane の時のリクエストの分け方
+CACHE_ENTRIES = 20     # response_cache.json に残す応答の数
+
+
+def create_client():
+    # google-genai / dotenv は重いので、API を呼ぶ時だけ読み込む
+    from google import genai
+    from dotenv import load_dotenv
+
+    # .envファイルを読み込む
+    load_dotenv()
+    api_key = os.getenv('GEMINI_API')
+    return genai.Client(api_key=api_key)
+
+
+def load_ranking():
+    # make_ai_input が選んだ上位の一覧。ai_ranking.json がない時は diff_input.json から同じ方法で選ぶ
+    ranking = load_json(RANKING_PATH)
+    if isinstance(ranking, dict) and "items" in ranking:
+        return ranking["items"]
+    import make_ai_input
+    return make_ai_input.ranking_from_diff_input(load_json(DIFF_PATH) or {})["items"]
+
+
+def build_prompt(items, lane=None):
+    # Geminiプロンプト（選ぶのは make_ai_input なので、ここでは理由の文章だけを書かせる）
+    ranking = [
+        {"ranking": i, "champion": item["name_ja"], "lane": item["lane"], "rank": item["rank"],
+         "trend": item["trend"], "others": item["others"]}
+        for i, item in enumerate(items, start=1)
+    ]
+    count = len(items)
+    lane_rule = f"- すべて {lane} レーンのデータです\n" if lane else ""
+    return f"""
 あなたはワイルドリフトの統計アナリストです。
-以下に最新パッチ差分データ（DIFF）を渡します。
-scoreが大きいものを15件だけ抽出してください。
+以下に最新パッチで変化の大きかった{count}件（RANKING）を順位付きで渡します。
+順位とチャンピオンはそのままに、各行の reason を書いてください。
 
 
 【分析条件】
-- 同一チャンピオン・同一ランク内のみ比較
 - 上昇・下降トレンドともに重要
 - reason には trend の情報（win↑/↓ pick↑/↓ ban↑/↓）を使用
 - 数字は勝手に補完せず、trend とレーン/ランクだけで記載
-- score は分析にのみ使用、出力に表示しない
+- others は同じチャンピオンの他のレーン・ランクの trend
 - reason には「選定理由（該当ランク）」と「他ランク帯やレーンとの比較」を必ず含める
-
+{lane_rule}
 【絶対遵守ルール】
-1. 出力は必ず15件
+1. 出力は必ず{count}件、RANKING と同じ順
 2. CSV形式
 3. ヘッダーは "ranking,champion,reason"
 4. ダブルクォートで囲む
 5. CSV以外の文章は書かない
-6. 1～15の番号を振る
+6. ranking と champion は RANKING の値をそのまま書く
 
-【出力例】
-"ranking","champion","reason"
 【出力例】
 "ranking","champion","reason"
 "1","名前","laneのrankでwin↑ pick↑ ban↑。TOPレーンでは、～"
@@ -69,82 +90,192 @@ scoreが大きいものを15件だけ抽出してください。
 
 【reason 記載ルール】
 - 1文目：このランク・レーンで選ばれた理由（trend を使用）
-- 2文目：他ランク帯との比較（相対的な傾向のみ）
+- 2文目：他ランク帯との比較（others の相対的な傾向のみ）
 
 【データ】
-DIFF:
-{diff}
+RANKING:
+{json.dumps(ranking, ensure_ascii=False, separators=(",", ":"))}
 
 """
 
-while not success and retry_count < MAX_RETRY:
-    try:
-        response = client.models.generate_content(
-            model="gemini-2.5-flash-lite",
-            contents=prompt,
-            config = {
-                "max_output_tokens": 2000,
-                "temperature": 0,  # フォーマット厳守
-                "top_p": 0,
-                "candidate_count": 1
-            }
-        )
-        raw = response.text.strip()
-
-        # 不要な ```csv などを削除
-        if raw.startswith("```csv"):
-            raw = raw[len("```csv"):].lstrip()
-        if raw.endswith("```"):
-            raw = raw[:-3].rstrip()
-
-        # CSV → Dict に変換して行数チェック
-        reader = csv.DictReader(raw.splitlines())
-        rows = list(reader)
-
-        # フォーマットチェック
-        if reader.fieldnames != ["ranking","champion","reason"]:
-            raise ValueError("CSV ヘッダーが不正")
-
-        # 件数チェック
-        if len(rows) != 15:
-            raise ValueError(f"件数が不正: {len(rows)} 件")
-
-        # 成功
-        success = True
-
-    except Exception as e:
-        print("リクエスト失敗、再試行します:", e)
-        retry_count += 1
-
-if not success:
-    raise RuntimeError("最大リトライ回数に達しました。Gemini から正しい CSV を取得できませんでした")
-
-# この raw をそのまま CSV として保存
-with open(OUTPUT_CSV, 'w', encoding='utf-8') as f:
-    f.write(raw)
 
-print("CSV 保存完了:", OUTPUT_CSV)
+def clean_csv(text):
+    raw = text.strip()
+    # 不要な ```csv などを削除
+    if raw.startswith("```csv"):
+        raw = raw[len("```csv"):].lstrip()
+    if raw.endswith("```"):
+        raw = raw[:-3].rstrip()
+    return raw
+
+
+def expected_names(item):
+    # 応答の champion として認める名前（name_ja と id、小文字）
+    return {item["name_ja"].lower(), item["id"].lower()}
+
+
+def validate_csv(raw, items):
+    # CSV → Dict に変換して、items と同じ順・同じチャンピオンかをチェックする。不正なら ValueError
+    reader = csv.DictReader(raw.splitlines())
+    rows = list(reader)
+
+    # フォーマットチェック
+    if reader.fieldnames != CSV_HEADER:
+        raise ValueError("CSV ヘッダーが不正")
+
+    # 件数チェック
+    if len(rows) != len(items):
+        raise ValueError(f"件数が不正: {len(rows)} 件")
+
+    for i, (row, item) in enumerate(zip(rows, items), start=1):
+        if (row.get("ranking") or "").strip() != str(i):
+            raise ValueError(f"ranking が不正: {row.get('ranking')}")
+        # 渡した順位と違うチャンピオンは作られた答えとみなす
+        if (row.get("champion") or "").strip().lower() not in expected_names(item):
+            raise ValueError(f"{i} 位のチャンピオンが違う: {row.get('champion')}")
+        if not (row.get("reason") or "").strip():
+            raise ValueError(f"{i} 行目の reason が空")
+    return rows
+
+
+def request_csv(client, prompt, items):
+    # Gemini から items の件数分の CSV を受け取る。形式が不正なら MAX_RETRY 回まで再試行
+    retry_count = 0
+    while retry_count < MAX_RETRY:
+        try:
+            metrics.count("ai_requests")
+            response = client.models.generate_content(
+                model=MODEL,
+                contents=prompt,
+                config=GENERATION_CONFIG
+            )
+            raw = clean_csv(response.text)
+            validate_csv(raw, items)
+
+            # 成功
+            return raw
+
+        except Exception as e:
+            print("リクエスト失敗、再試行します:", e)
+            retry_count += 1
 
-# CSV → JSON 化
-parsed = []
-with open(OUTPUT_CSV, 'r', encoding='utf-8') as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        champ_name = row["champion"].strip()
-        champ_key = champ_name.lower()
-
-        # 🔥 ここが応急処置
-        if champ_key in id_to_ja:
-            champ_name = id_to_ja[champ_key]
-
-        parsed.append({
-            "ranking": row["ranking"].strip(),
-            "champion": champ_name,
-            "reason": row["reason"].strip()
-        })
+    raise RuntimeError("最大リトライ回数に達しました。Gemini から正しい CSV を取得できませんでした")
 
-# JSON 保存
-with open(OUTPUT_JSON, 'w', encoding='utf-8') as f:
-    json.dump(parsed, f, ensure_ascii=False, indent=2)
 
-print("JSON 化完了:", OUTPUT_JSON)
+def prompt_key(prompt):
+    # モデル・設定・プロンプトが同じなら同じ応答を使う
+    payload = json.dumps({"model": MODEL, "config": GENERATION_CONFIG, "prompt": prompt}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def build_jobs(items, per_lane=False):
+    # 送るリクエスト: [{"lane", "items", "prompt"}]（per_lane ならレーンごと、順位の順は保つ）
+    if not per_lane:
+        groups = [(None, items)] if items else []
+    else:
+        lanes = LANES + sorted({item["lane"] for item in items} - set(LANES))
+        groups = [(lane, [item for item in items if item["lane"] == lane]) for lane in lanes]
+        groups = [(lane, group) for lane, group in groups if group]
+    return [{"lane": lane, "items": group, "prompt": build_prompt(group, lane)} for lane, group in groups]
+
+
+def merge_results(jobs, raws):
+    # 各リクエストの reason を、make_ai_input が付けた順位の順に1つの CSV にまとめる
+    # champion は応答ではなく ai_ranking.json の name_ja を使う
+    merged = []
+    for job, raw in zip(jobs, raws):
+        for item, row in zip(job["items"], csv.DictReader(raw.splitlines())):
+            merged.append((item["ranking"], item["name_ja"], row["reason"].strip()))
+    merged.sort(key=lambda x: x[0])
+
+    lines = ['"ranking","champion","reason"']
+    for i, (_, name, reason) in enumerate(merged, start=1):
+        lines.append(",".join('"' + value.replace('"', '""') + '"' for value in [str(i), name, reason]))
+    return "\n".join(lines)
+
+
+def generate(items, client_factory=create_client, per_lane=False, cache_path=RESPONSE_CACHE_JSON):
+    # ai_ranking.json の items に reason を付けた CSV を作る
+    # 同じプロンプトの応答は response_cache.json から使い、Gemini を呼ぶのはキャッシュにないものだけ
+    # client_factory はキャッシュにない時だけ呼ぶ（テストでは偽のクライアントを返す関数を渡す）
+    jobs = build_jobs(items, per_lane)
+    cache = load_json(cache_path) or {}
+    keys = [prompt_key(job["prompt"]) for job in jobs]
+    raws = [cache[key]["raw"] if key in cache else None for key in keys]
+
+    missing = [i for i, raw in enumerate(raws) if raw is None]
+    metrics.count("ai_cache_hits", len(jobs) - len(missing))
+    print(f"Gemini へのリクエスト {len(jobs)} 件のうち {len(jobs) - len(missing)} 件はキャッシュを使います")
+    if missing:
+        # 起動を速くするため、使う時に読み込む
+        from concurrent.futures import ThreadPoolExecutor
+        client = client_factory()
+        # レーンごとのリクエストは互いに依存しないので同時に送る
+        with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+            results = list(executor.map(lambda i: request_csv(client, jobs[i]["prompt"], jobs[i]["items"]), missing))
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        for i, raw in zip(missing, results):
+            raws[i] = raw
+            cache[keys[i]] = {"raw": raw, "lane": jobs[i]["lane"], "created_at": now}
+
+    # 新しいものから CACHE_ENTRIES 件だけ残す（今回使ったものは必ず残す）
+    used = set(keys)
+    kept = sorted(cache.items(), key=lambda item: (item[0] in used, item[1]["created_at"]), reverse=True)[:max(CACHE_ENTRIES, len(used))]
+    save_json(cache_path, dict(kept))
+
+    return merge_results(jobs, raws)
+
+
+def save_outputs(raw):
+    # この raw をそのまま CSV として保存（save_json と同じく、途中で止まっても前回のファイルが残る）
+    save_text(OUTPUT_CSV, raw)
+
+    print("CSV 保存完了:", OUTPUT_CSV)
+
+    #  英語を日本語に応急処置（小文字idで name_ja を引く）
+    champions = get_champion_registry(CHAMPION_PATH)
+
+    # CSV → JSON 化
+    parsed = []
+    with io.StringIO(raw, newline=None) as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            champ_name = row["champion"].strip()
+
+            # 🔥 ここが応急処置
+            champ = champions.get_lower(champ_name)
+            if champ:
+                champ_name = champ["name_ja"]
+
+            parsed.append({
+                "ranking": row["ranking"].strip(),
+                "champion": champ_name,
+                "reason": row["reason"].strip()
+            })
+
+    # JSON 保存
+    save_json(OUTPUT_JSON, parsed)
+
+    print("JSON 化完了:", OUTPUT_JSON)
+
+
+def run(client_factory=create_client, per_lane=False):
+    # 入力データ読み込み
+    items = load_ranking()
+    if not items:
+        # 空の結果で output_ai.csv / json を上書きしないよう、前回の出力を残して止める
+        raise ValueError(f"ランキングが空です（{os.path.basename(RANKING_PATH)} / {os.path.basename(DIFF_PATH)} を確認してください）")
+    raw = generate(items, client_factory, per_lane)
+    save_outputs(raw)
+    return {"success": True}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--per-lane", action="store_true", help="レーンごとに分けて同時にリクエストし、結果をまとめる")
+    args = parser.parse_args()
+    run(per_lane=args.per_lane)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+import os
+import json
+import sqlite3
+import argparse
+from modeule import load_json, save_json
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__)) #githubactionsでの実行を考慮して、絶対パスを取得
+DATA_DIR = os.path.join(BASE_DIR, '..', 'wrgg-frontend/public/data')
+
+SQLITE_DB = os.path.join(BASE_DIR, 'wrgg.sqlite3')  # スクレイピング結果をまとめて持つDB（フロントには出さない）
+
+CHAMPIONS_JSON = os.path.join(DATA_DIR, 'champions.json')
+PATCH_NOTES_JSON = os.path.join(DATA_DIR, 'patch_notes.json')
+PATCH_CONTENTS_JSON = os.path.join(DATA_DIR, 'patch_contents.json')
+ALL_CHAMPIONS_DATA_JSON = os.path.join(DATA_DIR, 'all_champion_data.json')
+CHAMPION_DIR = os.path.join(DATA_DIR, 'champion_data')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS champions (
+    id       TEXT PRIMARY KEY,
+    name_ja  TEXT,
+    name_cn  TEXT,
+    seq      INTEGER NOT NULL,
+    doc      TEXT NOT NULL            -- champions.json の1件（キー順も保持）
+);
+CREATE INDEX IF NOT EXISTS champions_name_cn ON champions(name_cn);
+
+CREATE TABLE IF NOT EXISTS patch_notes (
+    seq        INTEGER PRIMARY KEY,   -- patch_notes.json の並び（同じリンク・同じ名前の行もそのまま持つ）
+    link       TEXT NOT NULL,
+    patch_name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS patch_notes_link ON patch_notes(link);
+
+CREATE TABLE IF NOT EXISTS patches (
+    name        TEXT PRIMARY KEY,
+    update_date TEXT,
+    seq         INTEGER NOT NULL      -- patch_contents.json の並び
+);
+
+CREATE TABLE IF NOT EXISTS patch_changes (
+    patch_name     TEXT NOT NULL,
+    champion_name  TEXT NOT NULL,
+    champion_seq   INTEGER NOT NULL,
+    seq            INTEGER NOT NULL,
+    ability_title  TEXT,
+    change_details TEXT,
+    PRIMARY KEY (patch_name, champion_name, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS patch_changes_champion ON patch_changes(champion_name, patch_name);
+
+CREATE TABLE IF NOT EXISTS champion_files (
+    champion_id TEXT PRIMARY KEY,
+    doc         TEXT NOT NULL         -- champion_data/<id>.json の patches 以外
+);
+
+CREATE TABLE IF NOT EXISTS champion_patches (
+    champion_id TEXT NOT NULL,
+    patch_name  TEXT NOT NULL,
+    updatetime  TEXT,
+    seq         INTEGER NOT NULL,
+    PRIMARY KEY (champion_id, patch_name)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS stats (
+    champion_id TEXT NOT NULL,
+    patch_name  TEXT NOT NULL,
+    lane        TEXT NOT NULL,
+    rank        TEXT NOT NULL,
+    winrate     REAL,
+    pickrate    REAL,
+    banrate     REAL,
+    updatetime  TEXT,
+    seq         INTEGER NOT NULL,
+    PRIMARY KEY (champion_id, patch_name, lane, rank)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS stats_patch_lane_rank ON stats(patch_name, lane, rank);
+
+-- 値が変わった時だけスナップショットの updatetime を進める（championdata_scraper と同じ動き）
+CREATE TRIGGER IF NOT EXISTS stats_touch_snapshot AFTER UPDATE ON stats
+BEGIN
+    UPDATE champion_patches SET updatetime = NEW.updatetime
+    WHERE champion_id = NEW.champion_id AND patch_name = NEW.patch_name;
+END;
+"""
+
+UPSERT_SNAPSHOT = """
+INSERT INTO champion_patches (champion_id, patch_name, updatetime, seq)
+SELECT ?1, ?2, ?3, (SELECT COUNT(*) FROM champion_patches WHERE champion_id = ?1)
+WHERE true
+ON CONFLICT (champion_id, patch_name) DO NOTHING
+"""
+
+UPSERT_STAT = """
+INSERT INTO stats (champion_id, patch_name, lane, rank, winrate, pickrate, banrate, updatetime, seq)
+SELECT ?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8,
+       (SELECT COUNT(*) FROM stats WHERE champion_id = ?1 AND patch_name = ?2)
+WHERE true
+ON CONFLICT (champion_id, patch_name, lane, rank) DO UPDATE SET
+    winrate = excluded.winrate,
+    pickrate = excluded.pickrate,
+    banrate = excluded.banrate,
+    updatetime = excluded.updatetime
+WHERE winrate IS NOT excluded.winrate
+   OR pickrate IS NOT excluded.pickrate
+   OR banrate IS NOT excluded.banrate
+"""
+
+
+def connect(path=SQLITE_DB):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    # 以前の patch_notes（link が主キーで重複リンクが落ちる）は作り直す。import_patches で毎回入れ直す表なので失うものはない
+    columns = {name: pk for _, name, _, _, _, pk in conn.execute("PRAGMA table_info(patch_notes)")}
+    if columns and not columns.get("seq"):
+        conn.execute("DROP TABLE patch_notes")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+# ---- 取り込み ----
+
+def import_champions(conn, champions):
+    conn.execute("DELETE FROM champions")
+    conn.executemany(
+        "INSERT INTO champions (id, name_ja, name_cn, seq, doc) VALUES (?, ?, ?, ?, ?)",
+        [
+            (c["id"], c.get("name_ja"), c.get("name_cn"), i, json.dumps(c, ensure_ascii=False))
+            for i, c in enumerate(champions)
+        ],
+    )
+
+
+def import_patches(conn, patch_notes, patch_contents):
+    conn.execute("DELETE FROM patch_notes")
+    conn.execute("DELETE FROM patches")
+    conn.execute("DELETE FROM patch_changes")
+    conn.executemany(
+        "INSERT INTO patch_notes (link, patch_name, seq) VALUES (?, ?, ?)",
+        [(patch.get("patch_link", ""), patch.get("patch_name", ""), i) for i, patch in enumerate(patch_notes)],
+    )
+    conn.executemany(
+        "INSERT INTO patches (name, update_date, seq) VALUES (?, ?, ?)",
+        [(name, info.get("update_date"), i) for i, (name, info) in enumerate(patch_contents.items())],
+    )
+    conn.executemany(
+        "INSERT INTO patch_changes VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (name, champ_name, champ_seq, seq, change.get("ability_title"), change.get("change_details"))
+            for name, info in patch_contents.items()
+            for champ_seq, (champ_name, changes) in enumerate(info.get("champions", {}).items())
+            for seq, change in enumerate(changes)
+        ],
+    )
+
+
+def import_champion_data(conn, champ_datas):
+    for champ_data in champ_datas:
+        champ_id = champ_data["id"]
+        doc = {k: (None if k == "patches" else v) for k, v in champ_data.items()}
+        conn.execute(
+            "INSERT OR REPLACE INTO champion_files (champion_id, doc) VALUES (?, ?)",
+            (champ_id, json.dumps(doc, ensure_ascii=False)),
+        )
+        conn.execute("DELETE FROM champion_patches WHERE champion_id = ?", (champ_id,))
+        conn.execute("DELETE FROM stats WHERE champion_id = ?", (champ_id,))
+        conn.executemany(
+            "INSERT OR IGNORE INTO champion_patches VALUES (?, ?, ?, ?)",
+            [(champ_id, s["patch_name"], s["updatetime"], i) for i, s in enumerate(champ_data.get("patches", []))],
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO stats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (champ_id, s["patch_name"], e["lane"], e["rank"], e["winrate"], e["pickrate"], e["banrate"], s["updatetime"], i)
+                for s in champ_data.get("patches", [])
+                for i, e in enumerate(s["data"])
+            ],
+        )
+
+
+def import_json(conn, data_dir=DATA_DIR):
+    # 既存の JSON 一式を1トランザクションで取り込む
+    champion_dir = os.path.join(data_dir, 'champion_data')
+    champ_datas = []
+    if os.path.isdir(champion_dir):
+        for file_name in sorted(os.listdir(champion_dir)):
+            if file_name.endswith(".json"):
+                champ_data = load_json(os.path.join(champion_dir, file_name))
+                if champ_data:
+                    champ_data.setdefault("id", file_name[:-len(".json")])
+                    champ_datas.append(champ_data)
+
+    with conn:
+        import_champions(conn, load_json(os.path.join(data_dir, 'champions.json')))
+        import_patches(
+            conn,
+            load_json(os.path.join(data_dir, 'patch_notes.json')),
+            load_json(os.path.join(data_dir, 'patch_contents.json')) or {},
+        )
+        import_champion_data(conn, champ_datas)
+
+
+def upsert_stats(conn, patch_name, rows_by_champ, names_ja=None):
+    # championdata_scraper.group_rank_rows() の結果をまとめて反映する（ファイル全体の書き直しはしない）
+    names_ja = names_ja or {}
+    with conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO champion_files (champion_id, doc) VALUES (?, ?)",
+            [
+                (champ_id, json.dumps({"id": champ_id, "name_ja": names_ja.get(champ_id), "patches": None}, ensure_ascii=False))
+                for champ_id in rows_by_champ
+            ],
+        )
+        conn.executemany(
+            UPSERT_SNAPSHOT,
+            [(champ_id, patch_name, rows[0]["updatetime"]) for champ_id, rows in rows_by_champ.items() if rows],
+        )
+        conn.executemany(
+            UPSERT_STAT,
+            [
+                (champ_id, patch_name, row["lane"], row["rank"], row["winrate"], row["pickrate"], row["banrate"], row["updatetime"])
+                for champ_id, rows in rows_by_champ.items()
+                for row in rows
+            ],
+        )
+
+
+# ---- 書き出し（フロントエンドが読む JSON） ----
+
+def champion_json(conn, champion_id):
+    (doc,) = conn.execute("SELECT doc FROM champion_files WHERE champion_id = ?", (champion_id,)).fetchone()
+    doc = json.loads(doc)
+
+    patches = []
+    snapshots = {}
+    for patch_name, updatetime in conn.execute(
+        "SELECT patch_name, updatetime FROM champion_patches WHERE champion_id = ? ORDER BY seq", (champion_id,)
+    ):
+        snapshot = {"patch_name": patch_name, "updatetime": updatetime, "data": []}
+        snapshots[patch_name] = snapshot
+        patches.append(snapshot)
+
+    for patch_name, lane, rank, winrate, pickrate, banrate in conn.execute(
+        "SELECT patch_name, lane, rank, winrate, pickrate, banrate FROM stats WHERE champion_id = ? ORDER BY patch_name, seq",
+        (champion_id,),
+    ):
+        snapshots[patch_name]["data"].append({
+            "lane": lane,
+            "rank": rank,
+            "winrate": winrate,
+            "pickrate": pickrate,
+            "banrate": banrate,
+        })
+
+    champ_data = {k: (patches if k == "patches" else v) for k, v in doc.items()}
+    champ_data.setdefault("patches", patches)
+    return champ_data
+
+
+def export_json(conn, data_dir=DATA_DIR, champion_ids=None):
+    # DB から JSON 一式を書き出す。champion_ids を渡すとそのチャンピオンのファイルだけ書き出す
+    champions = [json.loads(doc) for (doc,) in conn.execute("SELECT doc FROM champions ORDER BY seq")]
+    save_json(os.path.join(data_dir, 'champions.json'), champions)
+
+    patch_notes = [
+        {"patch_name": name, "patch_link": link}
+        for name, link in conn.execute("SELECT patch_name, link FROM patch_notes ORDER BY seq")
+    ]
+    save_json(os.path.join(data_dir, 'patch_notes.json'), patch_notes)
+
+    patch_contents = {}
+    for name, update_date in conn.execute("SELECT name, update_date FROM patches ORDER BY seq"):
+        patch_contents[name] = {"update_date": update_date, "champions": {}}
+    for patch_name, champ_name, ability_title, change_details in conn.execute(
+        "SELECT patch_name, champion_name, ability_title, change_details FROM patch_changes ORDER BY patch_name, champion_seq, seq"
+    ):
+        patch_contents[patch_name]["champions"].setdefault(champ_name, []).append({
+            "ability_title": ability_title,
+            "change_details": change_details,
+        })
+    save_json(os.path.join(data_dir, 'patch_contents.json'), patch_contents)
+
+    champion_dir = os.path.join(data_dir, 'champion_data')
+    os.makedirs(champion_dir, exist_ok=True)
+    if champion_ids is None:
+        champion_ids = [cid for (cid,) in conn.execute("SELECT champion_id FROM champion_files ORDER BY champion_id")]
+    for champion_id in champion_ids:
+        save_json(os.path.join(champion_dir, f"{champion_id}.json"), champion_json(conn, champion_id))
+
+
+def export_all_champion_data(conn, patch_name, output=ALL_CHAMPIONS_DATA_JSON):
+    # 指定パッチの全チャンピオン × レーン × ランク（all_champion_data.json の形式）
+    all_champions_data = {}
+    for champion_id, doc, updatetime, lane, rank, winrate, pickrate, banrate in conn.execute(
+        """
+        SELECT s.champion_id, f.doc, s.updatetime, s.lane, s.rank, s.winrate, s.pickrate, s.banrate
+        FROM stats s JOIN champion_files f ON f.champion_id = s.champion_id
+        WHERE s.patch_name = ?
+        ORDER BY s.champion_id, s.seq
+        """,
+        (patch_name,),
+    ):
+        champ = all_champions_data.setdefault(champion_id, {
+            "id": champion_id,
+            "name_ja": json.loads(doc).get("name_ja"),
+            "data": []
+        })
+        champ["data"].append({
+            "updatetime": updatetime,
+            "lane": lane,
+            "rank": rank,
+            "winrate": winrate,
+            "pickrate": pickrate,
+            "banrate": banrate
+        })
+    save_json(output, list(all_champions_data.values()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON と SQLite ストアの取り込み / 書き出し")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("--db", default=SQLITE_DB)
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    try:
+        if args.command == "import":
+            import_json(conn)
+            print(f"JSON を {args.db} に取り込みました")
+        else:
+            export_json(conn)
+            print(f"{args.db} から JSON を書き出しました")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
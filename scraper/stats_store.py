@@ -0,0 +1,240 @@
+import os
+import numpy as np
+import make_ai_input
+from modeule import load_json, save_json
+from patch_timeline import load_patch_timeline
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__)) #githubactionsでの実行を考慮して、絶対パスを取得
+DATA_DIR = os.path.join(BASE_DIR, '..', 'wrgg-frontend/public/data')
+
+CHAMPION_DIR = os.path.join(DATA_DIR, 'champion_data')    # チャンピオン個別のディレクトリ
+PATCH_CONTENTS_JSON = os.path.join(DATA_DIR, 'patch_contents.json')
+
+LANES = ["MID", "TOP", "ADC", "SUP", "JG"]
+RANKS = ["Emerald", "Diamond", "Master", "Challenger", "Legendary_rank"]
+METRICS = ["winrate", "pickrate", "banrate"]
+
+WIN, PICK, BAN = 0, 1, 2
+
+
+def date_key(updatetime):
+    # "YYYY/MM/DD" → YYYYMMDD の整数（並べ替え用）
+    return int(updatetime.replace("/", "")) if updatetime else 0
+
+
+class StatsStore:
+    # champion_data/*.json を NumPy 配列にまとめた列指向ストア
+    # values の軸は (champion, patch, lane, rank, metric)、データが無い所は NaN
+    # 元の JSON に戻せるように、ファイル内の並び順（patch_seq / entry_seq）も保持する
+    # パイプラインには組み込んでいない（NumPy は requirements-dev.txt でだけ入れる）
+
+    def __init__(self, champ_docs, patch_names, lanes, ranks):
+        C, P, L, R = len(champ_docs), len(patch_names), len(lanes), len(ranks)
+        self.champ_ids = [doc["id"] for doc in champ_docs]
+        self.champ_docs = champ_docs  # patches 以外のトップレベル（キー順も保持）
+        self.patch_names = patch_names
+        self.lanes = lanes
+        self.ranks = ranks
+        self.champ_index = {champ_id: i for i, champ_id in enumerate(self.champ_ids)}
+        self.patch_index = {name: i for i, name in enumerate(patch_names)}
+        self.lane_index = {lane: i for i, lane in enumerate(lanes)}
+        self.rank_index = {rank: i for i, rank in enumerate(ranks)}
+
+        self.values = np.full((C, P, L, R, len(METRICS)), np.nan)
+        self.updatetimes = np.full((C, P), "", dtype=object)
+        self.update_keys = np.full((C, P), -1, dtype=np.int64)     # updatetime の YYYYMMDD（無い所は -1）
+        self.patch_seq = np.full((C, P), -1, dtype=np.int32)      # ファイル内の patches の並び
+        self.entry_seq = np.full((C, P, L, R), -1, dtype=np.int32)  # スナップショット内の data の並び
+
+    # ---- 読み込み / 書き出し ----
+
+    @classmethod
+    def from_champion_data(cls, champ_datas, timeline=None):
+        # champion_data の dict のリストから作る
+        lanes = list(LANES)
+        ranks = list(RANKS)
+        seen_patches = []
+        for champ_data in champ_datas:
+            for snapshot in champ_data.get("patches", []):
+                seen_patches.append(snapshot["patch_name"])
+                for entry in snapshot["data"]:
+                    if entry["lane"] not in lanes:
+                        lanes.append(entry["lane"])
+                    if entry["rank"] not in ranks:
+                        ranks.append(entry["rank"])
+
+        # パッチ軸は公開順（patch_contents.json に無いパッチは最初に出てきた順で後ろ）
+        unique = list(dict.fromkeys(seen_patches))
+        if timeline is not None:
+            known = sorted((p for p in unique if timeline.position(p) >= 0), key=timeline.position)
+            unique = known + [p for p in unique if timeline.position(p) < 0]
+
+        docs = [
+            {k: (None if k == "patches" else v) for k, v in champ_data.items()}
+            for champ_data in champ_datas
+        ]
+        store = cls(docs, unique, lanes, ranks)
+
+        for c, champ_data in enumerate(champ_datas):
+            for seq, snapshot in enumerate(champ_data.get("patches", [])):
+                p = store.patch_index[snapshot["patch_name"]]
+                if store.patch_seq[c, p] >= 0:
+                    continue  # 同じ patch_name は先頭だけ使う
+                store.patch_seq[c, p] = seq
+                store.updatetimes[c, p] = snapshot["updatetime"]
+                store.update_keys[c, p] = date_key(snapshot["updatetime"])
+                for entry_seq, entry in enumerate(snapshot["data"]):
+                    l = store.lane_index[entry["lane"]]
+                    r = store.rank_index[entry["rank"]]
+                    if store.entry_seq[c, p, l, r] >= 0:
+                        continue
+                    store.entry_seq[c, p, l, r] = entry_seq
+                    store.values[c, p, l, r] = [entry[m] for m in METRICS]
+        return store
+
+    @classmethod
+    def load(cls, champion_dir=CHAMPION_DIR, patch_contents_path=PATCH_CONTENTS_JSON):
+        champ_datas = []
+        for file_name in sorted(os.listdir(champion_dir)):
+            if not file_name.endswith(".json"):
+                continue
+            champ_data = load_json(os.path.join(champion_dir, file_name))
+            if not champ_data:
+                continue
+            champ_data.setdefault("id", file_name[:-len(".json")])
+            champ_datas.append(champ_data)
+        return cls.from_champion_data(champ_datas, load_patch_timeline(patch_contents_path))
+
+    def to_champion_json(self, champ_id):
+        # 1チャンピオン分を元の JSON 形式に戻す
+        c = self.champ_index[champ_id]
+        patches = []
+        for p in np.argsort(self.patch_seq[c], kind="stable"):
+            if self.patch_seq[c, p] < 0:
+                continue
+            present = np.argwhere(self.entry_seq[c, p] >= 0)
+            present = sorted(present, key=lambda lr: self.entry_seq[c, p, lr[0], lr[1]])
+            data = []
+            for l, r in present:
+                entry = {"lane": self.lanes[l], "rank": self.ranks[r]}
+                for m, metric in enumerate(METRICS):
+                    entry[metric] = float(self.values[c, p, l, r, m])
+                data.append(entry)
+            patches.append({
+                "patch_name": self.patch_names[p],
+                "updatetime": self.updatetimes[c, p],
+                "data": data,
+            })
+
+        doc = self.champ_docs[c]
+        champ_data = {k: (patches if k == "patches" else v) for k, v in doc.items()}
+        if "patches" not in champ_data:
+            champ_data["patches"] = patches
+        return champ_data
+
+    def save(self, champion_dir=CHAMPION_DIR):
+        os.makedirs(champion_dir, exist_ok=True)
+        for champ_id in self.champ_ids:
+            save_json(os.path.join(champion_dir, f"{champ_id}.json"), self.to_champion_json(champ_id))
+
+    # ---- 一括計算 ----
+
+    def latest_two(self):
+        # チャンピオンごとに (1つ前, 最新) のパッチ位置と、2つ以上あるかのマスクを返す
+        # 並び順は make_ai_input と同じ (updatetime, ファイル内の順)
+        present = self.patch_seq >= 0
+        upd = self.update_keys
+        order = np.lexsort((self.patch_seq, upd), axis=-1)
+
+        C = len(self.champ_ids)
+        if order.shape[1] < 2:
+            empty = np.zeros(C, dtype=np.int64)
+            return empty, empty, np.zeros(C, dtype=bool)
+        valid = present.sum(axis=1) >= 2
+        return order[:, -2], order[:, -1], valid
+
+    def diff(self, rank_weight, threshold_win, threshold):
+        # 最新パッチ - 1つ前のパッチの win/pick/ban 差分、score、閾値マスクをまとめて計算する
+        prev_p, latest_p, valid = self.latest_two()
+        c = np.arange(len(self.champ_ids))
+        latest = self.values[c, latest_p]  # (C, L, R, M)
+        prev = self.values[c, prev_p]
+        diffs = latest - prev
+
+        weight = np.array([rank_weight.get(rank, 1) for rank in self.ranks], dtype=np.float64)[None, None, :]
+        abs_diffs = np.abs(diffs)
+        # win/pick/ban の重みは make_ai_input.diff_weight と共通（同じ score・順位になるように）
+        diff_weight = make_ai_input.diff_weight
+        score = (abs_diffs[..., WIN]*weight*diff_weight["win"] + abs_diffs[..., PICK]*weight*diff_weight["pick"]
+                 + abs_diffs[..., BAN]*weight*diff_weight["ban"])
+
+        has_pair = valid[:, None, None] & (self.entry_seq[c, latest_p] >= 0) & (self.entry_seq[c, prev_p] >= 0)
+        selected = has_pair & (
+            (abs_diffs[..., WIN] >= threshold_win) |
+            (abs_diffs[..., PICK] >= threshold) |
+            (abs_diffs[..., BAN] >= threshold)
+        )
+        return {
+            "prev_patch": prev_p,
+            "latest_patch": latest_p,
+            "latest": latest,
+            "diffs": diffs,
+            "score": score,
+            "selected": selected,
+        }
+
+    def top_n(self, score, selected, n):
+        # 閾値を通った中から score 上位 n 件の (champion, lane, rank) を score 降順で返す
+        flat = np.where(selected, score, -np.inf).ravel()
+        n = min(n, int(selected.sum()))
+        if n <= 0:
+            return []
+        idx = np.argpartition(-flat, n - 1)[:n]
+        idx = idx[np.argsort(-flat[idx], kind="stable")]
+        return [tuple(int(i) for i in np.unravel_index(i, score.shape)) for i in idx]
+
+    def diff_input(self, rank_weight, threshold_win, threshold):
+        # make_ai_input.build_diff_input と同じ形式の dict を作る
+        result = self.diff(rank_weight, threshold_win, threshold)
+        latest_p = result["latest_patch"]
+        diff_input = {}
+
+        for c in np.flatnonzero(result["selected"].any(axis=(1, 2))):
+            p = latest_p[c]
+            champ_id = self.champ_ids[c]
+            name_ja = self.champ_docs[c].get("name_ja", champ_id)
+            cells = np.argwhere(result["selected"][c])
+            cells = sorted(cells, key=lambda lr: self.entry_seq[c, p, lr[0], lr[1]])
+
+            champ_diff = []
+            for l, r in cells:
+                win_diff, pick_diff, ban_diff = (float(v) for v in result["diffs"][c, l, r])
+                latest = result["latest"][c, l, r]
+                champ_diff.append({
+                    "name_ja": name_ja,
+                    "lane": self.lanes[l],
+                    "rank": self.ranks[r],
+                    "winrate": float(latest[WIN]),
+                    "pickrate": float(latest[PICK]),
+                    "banrate": float(latest[BAN]),
+                    "win_diff": round(win_diff, 3),
+                    "pick_diff": round(pick_diff, 3),
+                    "ban_diff": round(ban_diff, 3),
+                    "score": round(float(result["score"][c, l, r]), 2),
+                    "trend": f"win{'↑' if win_diff>0 else '↓'} pick{'↑' if pick_diff>0 else '↓'} ban{'↑' if ban_diff>0 else '↓'}"
+                })
+
+            diff_input[champ_id] = {
+                "patch_name": self.patch_names[p],
+                "updatetime": self.updatetimes[c, p],
+                "diff_data": champ_diff
+            }
+        return diff_input
+
+    def lanes_by_champion(self):
+        # チャンピオンごとにデータがあるレーン（champion_lane と同じくソート済み）
+        has_lane = np.any(~np.isnan(self.values[..., WIN]), axis=(1, 3))  # (C, L)
+        return {
+            champ_id: sorted(self.lanes[l] for l in np.flatnonzero(has_lane[c]))
+            for c, champ_id in enumerate(self.champ_ids)
+        }